@@ -1,11 +1,32 @@
 import re
-from typing import Any, Dict, Optional
-from anthropic import Anthropic # Client for interacting with Claude AI
+from typing import Any, Dict, List, Optional
+from anthropic import Anthropic, APIConnectionError # Client for interacting with Claude AI
+from concurrent.futures import ThreadPoolExecutor, as_completed # Bounded concurrent customer processing
 from agent.config import agentSettings # Application configuration
-from agent.utils import api_request # Helper for making API calls
+from agent.utils import api_request, api_get_all_pages, api_get_order_histories # Helpers for making API calls
+from agent.http_client import APIError, endpoint_stats # API failures and per-endpoint latency counters
+from agent.rfm import score_customers, classify, HIGH, LOW # Local vectorized RFM scoring
+from agent.ratelimit import TokenBucket, backoff_delay, is_retryable_status # Claude rate limiting and backoff
+from agent.cache import AnalysisCache # Persistent cache of Claude analyses
+from agent.watermark import WatermarkStore # Watermark for incremental runs
+from agent.worker import LeaseWorker # Sharded full passes over leased CustomerID ranges
+from agent.events import EventConsumer # Debounced analysis of customers with new orders
+from agent.batch import BatchAnalyzer, REQUEST_SPECIFIC_STATUSES # Multi-customer structured-output requests
+from agent.fake_claude import FakeClaude # Offline Claude stand-in
+from agent.prompt import PromptStats, build_customer_prompt # Compact, token-budgeted analyze_customer prompt
 import time
 from datetime import datetime, timedelta
 
+# Bump when the analyze_customer prompt changes - invalidates cached analyses
+PROMPT_VERSION = "2"
+# Bump when _calculate_priority changes - invalidates cached analyses
+RULES_VERSION = "1"
+
+
+def analysis_version_tag() -> str:
+    """Identifies the prompt, rules and model that produced a cached analysis"""
+    return f"prompt{PROMPT_VERSION}:rules{RULES_VERSION}:{agentSettings.CLAUDE_MODEL}"
+
 
 def parse_rfm_response(response_text: str) -> Optional[Dict[str, Any]]:
     """
@@ -71,15 +92,81 @@ class MCPAgent:
     """Main agent class for customer RFM analysis and follow-up actions"""
 
     def __init__(self):
-        # Initialize Claude client with API key from settings
-        self.claude = Anthropic(api_key=agentSettings.CLAUDE_API_KEY)
+        # Initialize Claude client with API key from settings, or the offline fake
+        # SDK retries are disabled so our own backoff is the only retry policy
+        if agentSettings.CLAUDE_FAKE:
+            self.claude = FakeClaude(latency=agentSettings.CLAUDE_FAKE_LATENCY)
+        else:
+            self.claude = Anthropic(api_key=agentSettings.CLAUDE_API_KEY, max_retries=0)
+        # One limiter shared by every worker thread
+        self.rate_limiter = TokenBucket(
+            rate=agentSettings.CLAUDE_REQUESTS_PER_MINUTE / 60,
+            capacity=agentSettings.CLAUDE_BURST
+        )
+        # On-disk cache of Claude analyses, keyed by order-history fingerprint
+        self.cache = None
+        if agentSettings.ANALYSIS_CACHE_ENABLED:
+            self.cache = AnalysisCache(
+                agentSettings.ANALYSIS_CACHE_PATH,
+                analysis_version_tag(),
+                ttl_seconds=agentSettings.ANALYSIS_CACHE_TTL,
+                max_entries=agentSettings.ANALYSIS_CACHE_MAX_ENTRIES
+            )
+        # Estimated order-data tokens of analyze_customer prompts, reset every process_customers run
+        self.prompt_stats = PromptStats()
+        # The Message Batches API needs a recent anthropic SDK; without it batches are sent synchronously
+        self.use_message_batches = agentSettings.CLAUDE_USE_MESSAGE_BATCHES
+        if self.use_message_batches and not BatchAnalyzer(self._create_message, self.claude).supports_message_batches():
+            print("Warning: the installed anthropic SDK has no Message Batches API; CLAUDE_USE_MESSAGE_BATCHES is ignored")
+            self.use_message_batches = False
+
+    def _cached_analysis(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Returns a cached analysis with recency shifted to today and priority re-evaluated, or None"""
+        cached = self.cache.get(cache_key)
+        if not cached:
+            return None
+        rfm_data = dict(cached["rfm"])
+        # Recency was computed on the cached reference date; the orders are unchanged so it simply grows
+        rfm_data["recency"] += (datetime.now().date() - cached["reference_date"]).days
+        priority = self._calculate_priority(rfm_data)
+        rfm_data["priority"] = priority
+        return {
+            "rfm": rfm_data,
+            "priority": priority,
+            "status": "success",
+            "source": "cache",
+            "message": f"Reused cached analysis - Priority: {priority}"
+        }
+
+    def _create_message(self, prompt: str, max_tokens: int = 300, prefill: Optional[str] = None):
+        """
+            Sends one prompt to Claude once a rate-limit token is available and feeds the response headers back to the limiter.
+            prefill starts the assistant turn, e.g. to force a JSON answer.
+        """
+        messages = [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+        if prefill:
+            messages.append({"role": "assistant", "content": prefill})
+        self.rate_limiter.acquire()
+        raw = self.claude.messages.with_raw_response.create(
+            model=agentSettings.CLAUDE_MODEL,
+            max_tokens=max_tokens,  # Limit response length
+            temperature=0.1,   # Low value = less random responses
+            messages=messages
+        )
+        self.rate_limiter.update_from_headers(raw.headers)
+        return raw.parse()
 
-    def analyze_customer(self, CustomerID: int) -> Dict[str, Any]:
+    def analyze_customer(self, CustomerID: int, orders: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
             Analyzes customer order history to calculate RFM scores and priority.
             
             Steps:
-            1. Fetch customer orders via API
+            1. Fetch customer orders via API (skipped when the caller already has them)
             2. Generate prompt for Claude AI
             3. Handle API retries and errors
             4. Parse and validate response
@@ -89,7 +176,8 @@ class MCPAgent:
         """
         try:
             # Step 1: Get customer order history
-            orders = api_request("GET", f"orders/customer/{CustomerID}")
+            if orders is None:
+                orders = api_request("GET", f"orders/customer/{CustomerID}")
 
             # Handle customers with no orders
             if not orders:
@@ -99,41 +187,26 @@ class MCPAgent:
                     "message": "Customer has no order history"
                 }
 
+            # Reuse a previous analysis if this exact order history was already sent to Claude
+            cache_key = self.cache.key(CustomerID, orders) if self.cache else None
+            if cache_key:
+                cached = self._cached_analysis(cache_key)
+                if cached:
+                    return cached
+
             # Get current date for recency calculation
             reference_date = datetime.now().strftime("%Y-%m-%d")
             
-            # Step 2: Create AI prompt with clear instructions - HERE I WILL SUGGEST MODIFYING THE PROMPT WITH LESS INFORMATION AND CLARITY, FOR EXAMPLE DON'T SHARE A REFERENCE DATE
-            prompt = f"""Analyze the order history for CustomerID {CustomerID}.
-                Reference date: {reference_date}
-                High-priority criteria: Recency < 30 days AND Frequency >= 3 orders AND Monetary > $5000
-
-                Calculate:
-                - Recency: Days between {reference_date} and customer's most recent order
-                - Frequency: Total number of orders for this customer  
-                - Monetary: Sum of all TotalDue amounts for this customer
-                - Priority: High if meets criteria, otherwise Low
+            # Step 2: Create AI prompt; orders go in as compact CSV, summarized beyond the token budget
+            prompt, prompt_info = build_customer_prompt(CustomerID, orders, reference_date)
+            self.prompt_stats.record(prompt_info)
 
-                Return EXACTLY in this format:
-                Recency: X days, Frequency: Y orders, Monetary: $Z, Priority: High/Low
-
-                Order data: {orders}"""
-            
             # Step 3: Call Claude API with retry mechanism
-            max_retries = 3
+            max_retries = agentSettings.CLAUDE_MAX_RETRIES
             for attempt in range(max_retries):
                 try:
-                    # Send prompt to Claude
-                    response = self.claude.messages.create(
-                        model="claude-3-5-sonnet-20241022",
-                        max_tokens=300,  # Limit response length
-                        temperature=0.1,   # Low value = less random responses
-                        messages=[
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ]
-                    )
+                    # Send prompt to Claude (waits for the shared rate limiter)
+                    response = self._create_message(prompt)
                     
                     # Extract text from API response
                     response_text = response.content[0].text
@@ -151,6 +224,10 @@ class MCPAgent:
                             print(f"Priority discrepancy for Customer {CustomerID}: Claude={rfm_data.get('priority')}, Calculated={calculated_priority}")
                             rfm_data["priority"] = calculated_priority  # Override with correct value
                         
+                        # Remember the analysis for future runs with the same order history
+                        if cache_key:
+                            self.cache.put(cache_key, CustomerID, rfm_data, calculated_priority, datetime.now().date())
+
                         # Return successful analysis
                         return {
                             "rfm": rfm_data,
@@ -176,13 +253,19 @@ class MCPAgent:
                 except Exception as claude_error:
                     # Handle API errors
                     print(f"Claude API error on attempt {attempt + 1}: {str(claude_error)}")
-                    if attempt == max_retries - 1:  # Final attempt failed
+                    status_code = getattr(claude_error, "status_code", None)
+                    retryable = is_retryable_status(status_code) or isinstance(claude_error, APIConnectionError)
+                    if not retryable or attempt == max_retries - 1:  # Final attempt failed or retrying cannot help
                         return {
                             "status": "api_error",
                             "priority": "Low", 
-                            "message": f"Claude API error after {max_retries} attempts: {str(claude_error)}"
+                            "message": f"Claude API error after {attempt + 1} attempts: {str(claude_error)}"
                         }
-                    time.sleep(1)  # Wait before retrying
+                    # Respect retry-after / reset headers, then back off exponentially with jitter
+                    error_response = getattr(claude_error, "response", None)
+                    if error_response is not None:
+                        self.rate_limiter.update_from_headers(error_response.headers)
+                    time.sleep(backoff_delay(attempt, agentSettings.CLAUDE_BACKOFF_BASE, agentSettings.CLAUDE_BACKOFF_MAX))
                         
         except Exception as e:
             # Catch-all for unexpected errors
@@ -193,12 +276,142 @@ class MCPAgent:
             }
 
 
+    # AI AGENT flags high-priority customers and creates their follow-up tasks in bulk
+    def apply_follow_ups(self, customer_ids: List[int], chunk_size: int = 1000):
+        """
+            Sets LeadStatus and creates a follow-up task for every customer, a chunk at a time.
+            Returns (customers fully handled, error messages).
+        """
+        handled = 0
+        errors = []
+        due_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+        for start in range(0, len(customer_ids), chunk_size):
+            chunk = customer_ids[start:start + chunk_size]
+            # One request updates the whole chunk's LeadStatus; per-item results report unknown customers
+            try:
+                results = api_request("PUT", "customers/bulk/lead-status/", {
+                    "updates": [{"CustomerID": CustomerID, "LeadStatus": "High Priority"} for CustomerID in chunk]
+                })
+            except APIError as e:
+                errors.append(f"Bulk LeadStatus update failed for {len(chunk)} customers: {e}")
+                continue
+            updated = [r["CustomerID"] for r in results if r["status"] == "updated"]
+            errors.extend(f"Customer {r['CustomerID']}: not found" for r in results if r["status"] != "updated")
+            if not updated:
+                continue
+            # One request creates the tasks for every updated customer
+            try:
+                tasks = api_request("POST", "tasks/bulk/", {
+                    "tasks": [
+                        {
+                            "CustomerID": CustomerID,
+                            "TaskDescription": f"Follow up with customer #{CustomerID} about new products",
+                            "AssignedTo": "SalesRep1",
+                            "DueDate": due_date
+                        }
+                        for CustomerID in updated
+                    ]
+                })
+                handled += len(tasks)
+            except APIError as e:
+                errors.append(f"Bulk task creation failed for {len(updated)} customers: {e}")
+        return handled, errors
+
+
+    # Local fast path - score every customer at once and only keep the ambiguous ones for Claude
+    def triage_customers(self, orders: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+            Runs the vectorized RFM scorer over all orders and returns a ready-made
+            analysis for every customer that is clearly High or clearly Low.
+            Customers missing from the result are borderline and need Claude.
+        """
+        scores = score_customers(orders)
+        labels = classify(scores)
+
+        decided = {}
+        for index, CustomerID in enumerate(scores.customer_ids.tolist()):
+            label = labels[index]
+            # Borderline customers, and High ones when a narrative is wanted, go to Claude
+            if label == HIGH and agentSettings.RFM_NARRATIVE_FOR_HIGH:
+                continue
+            if label not in (HIGH, LOW):
+                continue
+            rfm_data = scores.record(index)
+            rfm_data["priority"] = label
+            decided[CustomerID] = {
+                "rfm": rfm_data,
+                "priority": label,
+                "status": "success",
+                "source": "local",
+                "message": f"Scored locally - Priority: {label}"
+            }
+        return decided
+
+
+    # Batched Claude analysis - many customers per request with a validated JSON answer
+    def analyze_in_batches(self, orders_by_customer: Dict[int, List[Dict[str, Any]]]) -> Dict[int, Dict[str, Any]]:
+        """
+            Analyzes customers in multi-customer requests (cached ones are reused).
+            Returns an analysis for every customer Claude answered validly; the rest
+            are left for analyze_customer, unless Claude rejected the batch in a way
+            single-customer requests would repeat (then they come back as api_error).
+        """
+        analyses = {}
+        pending = {}
+        cache_keys = {}
+        for CustomerID, orders in orders_by_customer.items():
+            cache_key = self.cache.key(CustomerID, orders) if self.cache else None
+            cached = self._cached_analysis(cache_key) if cache_key else None
+            if cached:
+                analyses[CustomerID] = cached
+            else:
+                pending[CustomerID] = orders
+                cache_keys[CustomerID] = cache_key
+        if not pending:
+            return analyses
+
+        analyzer = BatchAnalyzer(self._create_message, self.claude)
+        if self.use_message_batches and len(pending) >= agentSettings.CLAUDE_MESSAGE_BATCH_MIN:
+            results = analyzer.submit_message_batch(pending)
+            # Retry only the customers whose items were missing or invalid, synchronously
+            results.update(analyzer.analyze({c: o for c, o in pending.items() if c not in results}))
+        else:
+            results = analyzer.analyze(pending)
+        print(f"Batch analysis: {len(results)}/{len(pending)} customers answered in {analyzer.requests} requests")
+
+        # Auth or model errors would fail every single-customer request too; report the rest as failed instead
+        rejected_status = getattr(analyzer.rejected, "status_code", None)
+        if analyzer.rejected is not None and rejected_status not in REQUEST_SPECIFIC_STATUSES:
+            for CustomerID in pending:
+                if CustomerID not in results:
+                    analyses[CustomerID] = {
+                        "status": "api_error",
+                        "priority": "Low",
+                        "message": f"Claude API error in batch analysis: {str(analyzer.rejected)}"
+                    }
+
+        for CustomerID, rfm_data in results.items():
+            # Apply business rules to determine priority, exactly as for single-customer answers
+            calculated_priority = self._calculate_priority(rfm_data)
+            rfm_data["priority"] = calculated_priority
+            if cache_keys.get(CustomerID):
+                self.cache.put(cache_keys[CustomerID], CustomerID, rfm_data, calculated_priority, datetime.now().date())
+            analyses[CustomerID] = {
+                "rfm": rfm_data,
+                "priority": calculated_priority,
+                "status": "success",
+                "source": "claude_batch",
+                "message": f"Successfully analyzed customer in batch - Priority: {calculated_priority}"
+            }
+        return analyses
+
+
     # Custom business rule - Here is where you can override the response from the AI model
     def _calculate_priority(self, rfm_data: Dict[str, Any]) -> str:
         """
             Applies business rules to determine customer priority.
             
-            Rules (different from prompt!):
+            Rules (different from prompt!), thresholds from agentSettings:
             - Recency < 365 days (1 year)
             - Frequency >= 3 orders
             - Monetary > $5000
@@ -206,9 +419,9 @@ class MCPAgent:
             Returns 'High' only if ALL conditions are met, otherwise 'Low'
         """
         is_high_priority = (
-            rfm_data["recency"] < 365 and 
-            rfm_data["frequency"] >= 3 and 
-            rfm_data["monetary"] > 5000
+            rfm_data["recency"] < agentSettings.HIGH_MAX_RECENCY_DAYS and 
+            rfm_data["frequency"] >= agentSettings.HIGH_MIN_FREQUENCY and 
+            rfm_data["monetary"] > agentSettings.HIGH_MIN_MONETARY
         )
         return "High" if is_high_priority else "Low"
 
@@ -224,75 +437,245 @@ class MCPAgent:
             "DueDate": (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
         }
         # POST to tasks endpoint
-        response = api_request("POST", "tasks/", task_data)
-        return bool(response)  # True if successful
+        try:
+            api_request("POST", "tasks/", task_data)
+            return True
+        except APIError as e:
+            print(f"API request failed: {e}")
+            return False
 
 
     # AI AGENT updates customer lead status via API
     # Update the LeadStatus for each HIGH PRIORITY customer by calling a FastAPI endpoint
     def update_customer_status(self, CustomerID: int, lead_status: str) -> bool:
         # PUT to customers endpoint
-        response = api_request("PUT", f"customers/{CustomerID}/?lead_status={lead_status}", None)
-        return bool(response)  # True if successful
+        try:
+            api_request("PUT", f"customers/{CustomerID}/?lead_status={lead_status}", None)
+            return True
+        except APIError as e:
+            print(f"API request failed: {e}")
+            return False
 
 
-    def run(self):
-            """Main execution loop for processing customers"""
-            # Note: Continuous execution is commented out for testing
-#        while True:
-            print(f"Running agent at {datetime.now()}")
+    def process_customer(self, CustomerID: int, local_analysis: Optional[Dict[str, Any]] = None,
+                         orders: Optional[List[Dict[str, Any]]] = None):
+        """
+            Analyzes one customer. Runs on a worker thread.
+            Returns (analysis, used_claude).
+        """
+        # Step 1: Analyze customer - locally if clear-cut, otherwise with Claude
+        if local_analysis is not None:
+            analysis = local_analysis
+        else:
+            # Pass the batch-fetched orders; None makes analyze_customer fetch them itself
+            analysis = self.analyze_customer(CustomerID, orders)
+        # Customers without orders or with a cached analysis are answered before Claude is called
+        used_claude = local_analysis is None and analysis["status"] != "No_orders" and analysis.get("source") != "cache"
 
-            # Retrieve all customers from API
-            customers = api_request("GET", "customers/")
+        # Display RFM values if successful
+        if analysis and analysis["status"] == "success" and "rfm" in analysis:
+            rfm_data = analysis["rfm"]
+            print(f"CustomerID: {CustomerID} | R: {rfm_data['recency']} | F: {rfm_data['frequency']} | M: ${rfm_data['monetary']:.2f} | Priority: {analysis['priority']}")
 
-            total_customers = len(customers)
-            processed_count = 0
-            high_priority_count = 0
-            errors = []
+        # Step 2: High-priority follow-ups are applied in bulk by the caller (see apply_follow_ups)
+        return analysis, used_claude
 
-            print(f"Processing {total_customers} customers...")
 
-            # Process each customer
-            for customer in customers:
-                CustomerID = customer["CustomerID"]
-                try:
-                    # Step 1: Analyze customer
-                    analysis = self.analyze_customer(CustomerID)
+    def process_customers(self, customer_ids: List[int]) -> Dict[str, Any]:
+        """
+            Analyzes the given customers and applies follow-up actions.
+            Returns a summary with processed/high-priority/Claude-call counts and errors.
+        """
+        total_customers = len(customer_ids)
+        processed_count = 0
+        high_priority_count = 0
+        claude_count = 0
+        high_priority_ids = []
+        errors = []
+        self.prompt_stats.reset()
+
+        # Fetch every order history in a few batch requests and decide the clear-cut customers locally
+        orders_by_customer = api_get_order_histories(customer_ids)
+        decided = {}
+        if agentSettings.RFM_FAST_PATH:
+            all_orders = [order for orders in orders_by_customer.values() for order in orders]
+            decided = self.triage_customers(all_orders)
+            print(f"Scored {len(decided)} customers locally, {total_customers - len(decided)} left for Claude")
 
-                    # Display RFM values if successful
-                    if analysis and analysis["status"] == "success" and "rfm" in analysis:
-                        rfm_data = analysis["rfm"]
-                        print(f"CustomerID: {CustomerID} | R: {rfm_data['recency']} | F: {rfm_data['frequency']} | M: ${rfm_data['monetary']:.2f} | Priority: {analysis['priority']}")
+        # Send the remaining customers to Claude several at a time; whatever fails falls back to one call each
+        if agentSettings.CLAUDE_BATCH_SIZE > 1:
+            undecided = {
+                CustomerID: orders_by_customer[CustomerID] for CustomerID in customer_ids
+                if CustomerID not in decided and orders_by_customer.get(CustomerID)
+            }
+            batch_results = self.analyze_in_batches(undecided)
+            decided.update(batch_results)
+            claude_count += sum(1 for analysis in batch_results.values() if analysis["status"] == "success")
 
-                    # Step 2: Handle high-priority customers
+        print(f"Processing {total_customers} customers...")
+
+        # Process customers concurrently; the shared rate limiter keeps Claude calls within budget
+        with ThreadPoolExecutor(max_workers=agentSettings.AGENT_CONCURRENCY) as pool:
+            futures = {
+                pool.submit(
+                    self.process_customer,
+                    CustomerID,
+                    decided.get(CustomerID),
+                    orders_by_customer.get(CustomerID)
+                ): CustomerID
+                for CustomerID in customer_ids
+            }
+            for future in as_completed(futures):
+                CustomerID = futures[future]
+                try:
+                    analysis, used_claude = future.result()
+                    if used_claude:
+                        claude_count += 1
                     if analysis and analysis["priority"] == "High":
-                        # Update customer status
-                        self.update_customer_status(CustomerID, "High Priority")
-                        # Create follow-up task
-                        self.create_task(CustomerID, f"Follow up with customer #{CustomerID} about new products")
-                        high_priority_count += 1
+                        high_priority_ids.append(CustomerID)
+                    # API and Claude failures must not pass for "no orders"; report them so the watermark holds
+                    if analysis and analysis["status"] in ("error", "api_error", "parse_error"):
+                        errors.append(f"Customer {CustomerID}: {analysis['message']}")
                     processed_count += 1
-                    
                 except Exception as e:
                     # Collect errors for batch reporting
                     error_msg = f"Customer {CustomerID}: {str(e)}"
                     errors.append(error_msg)
                     print(f"Error: {error_msg}")
 
-            # Print summary report
-            print(f"Completed: {processed_count}/{total_customers} customers")
-            print(f"High priority customers found: {high_priority_count}")
-            if errors:
-                print(f"Errors: {len(errors)}")
-                for error in errors[:5]:  # Show first 5 errors
-                    print(f"  - {error}")
+        # Step 2: Flag all high-priority customers and create their tasks in a few bulk requests
+        high_priority_count, follow_up_errors = self.apply_follow_ups(high_priority_ids)
+        errors.extend(follow_up_errors)
+
+        # Print summary report
+        print(f"Completed: {processed_count}/{total_customers} customers")
+        print(f"High priority customers found: {high_priority_count}")
+        print(f"Claude calls: {claude_count}")
+        prompt_stats = self.prompt_stats.snapshot()
+        if prompt_stats["prompts"]:
+            print(f"Single-customer prompts: {prompt_stats['prompts']}, ~{prompt_stats['order_tokens']} order-data tokens, "
+                  f"~{prompt_stats['tokens_saved']} saved vs. repr encoding, {prompt_stats['truncated']} histories summarized")
+        if self.cache:
+            self.cache.evict()
+            print(f"Analysis cache: {self.cache.stats()}")
+        for label, stats in sorted(endpoint_stats.snapshot().items()):
+            print(f"API {label}: {stats['requests']} requests, {stats['errors']} errors, avg {stats['avg_seconds'] * 1000:.1f} ms")
+        if errors:
+            print(f"Errors: {len(errors)}")
+            for error in errors[:5]:  # Show first 5 errors
+                print(f"  - {error}")
+
+        return {
+            "processed": processed_count,
+            "high_priority": high_priority_count,
+            "claude_calls": claude_count,
+            "prompt_tokens_saved": prompt_stats["tokens_saved"],
+            "errors": errors
+        }
+
+
+    def run(self):
+            """Single full pass over every customer"""
+            print(f"Running agent at {datetime.now()}")
+
+            # Retrieve all customers from API, following the pagination cursors
+            customers = api_get_all_pages("customers/")
+            summary = self.process_customers([customer["CustomerID"] for customer in customers])
 
             print(f"Agent completed at {datetime.now()}")
             print("Agent execution finished. Exiting...")
-            # Note: Continuous execution would sleep here
-#            time.sleep(agentSettings.AGENT_INTERVAL)  
+            return summary
+
+
+    def run_cycle(self, store: WatermarkStore, handled: Optional[Dict[int, int]] = None) -> Optional[Dict[str, Any]]:
+        """
+            One incremental cycle: only customers with orders added or modified since the
+            saved watermark are analyzed; without a watermark it is a full pass.
+            handled maps CustomerID -> SalesOrderID for customers already analyzed up to that
+            order (by the event path); they are left out unless they have a later order, so
+            their LeadStatus and follow-up task are not written twice.
+            Returns the summary, or None if the service was unreachable.
+        """
+        watermark = store.load()
+        try:
+            # Take the watermark before reading any customers so orders placed while the cycle runs are picked up next cycle
+            new_watermark = api_request("GET", "orders/watermark/")
+            if watermark is None:
+                summary = self.run()
+            else:
+                print(f"Running incremental cycle at {datetime.now()} since {watermark}")
+                # Bounded by the snapshot: an order added mid-paging on a page already read must not
+                # move the watermark past itself through a higher SalesOrderID on a later page
+                params = {"since_order_id": watermark["LastSalesOrderID"], "until_order_id": new_watermark["LastSalesOrderID"]}
+                if watermark.get("LastModifiedDate"):
+                    params["modified_since"] = watermark["LastModifiedDate"]
+                changes = api_get_all_pages("customers/changed/", params)
+                handled = handled or {}
+                changed_ids = [
+                    change["CustomerID"] for change in changes
+                    if change["LastSalesOrderID"] is None or change["LastSalesOrderID"] > handled.get(change["CustomerID"], 0)
+                ]
+                if len(changed_ids) < len(changes):
+                    print(f"Skipping {len(changes) - len(changed_ids)} customers already analyzed from order events")
+                summary = self.process_customers(changed_ids)
+
+            # Only move forward when every customer succeeded, so failures are retried next cycle
+            if not summary["errors"]:
+                store.save(new_watermark)
+            return summary
+        except APIError as e:
+            # The service is unreachable; keep the watermark and try again next cycle
+            print(f"Cycle skipped: {e}")
+            return None
+
+
+    def run_continuous(self):
+        """
+            Incremental mode: an incremental cycle (see run_cycle) every AGENT_INTERVAL seconds.
+            The first cycle (no watermark yet) is a full pass.
+        """
+        store = WatermarkStore(agentSettings.WATERMARK_PATH)
+        while True:
+            self.run_cycle(store)
+            time.sleep(agentSettings.AGENT_INTERVAL)
+
+
+    def run_events(self):
+        """
+            Event-driven mode: customers are analyzed a few seconds after a new order shows up
+            on the API's event feed (see agent/events.py). An incremental cycle still runs every
+            AGENT_INTERVAL seconds to catch modified orders and anything the feed missed.
+        """
+        EventConsumer(self, WatermarkStore(agentSettings.WATERMARK_PATH)).run()
+
+
+    def run_worker(self, run_id: str, worker_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+            Sharded full pass: this process is one of several workers leasing chunks of
+            customers for the same run_id (see agent/worker.py). Returns once every chunk is done.
+        """
+        return LeaseWorker(self, run_id, worker_id).run()
 
 if __name__ == "__main__":
-    # Entry point: Create agent and run
+    # Entry point: Create agent and run once, keep running incrementally with --continuous or --events, or share a pass with --worker
+    import argparse
+    parser = argparse.ArgumentParser(description="RFM analysis agent")
+    parser.add_argument("--continuous", action="store_true", help="Run incremental cycles every AGENT_INTERVAL seconds")
+    parser.add_argument("--events", action="store_true", help="Analyze customers seconds after new orders, with an incremental sweep every AGENT_INTERVAL seconds")
+    parser.add_argument("--reset-watermark", action="store_true", help="Forget the saved watermark and start with a full pass")
+    parser.add_argument("--worker", action="store_true", help="Share a full pass with other --worker processes through leased chunks of customers")
+    parser.add_argument("--run-id", default=f"run-{datetime.now().date()}", help="Run the --worker processes join (default: today's date)")
+    parser.add_argument("--worker-id", help="Lease owner name (default: host name and process ID)")
+    args = parser.parse_args()
+
     agent = MCPAgent()
-    agent.run()
\ No newline at end of file
+    if args.reset_watermark:
+        WatermarkStore(agentSettings.WATERMARK_PATH).reset()
+    if args.worker:
+        agent.run_worker(args.run_id, args.worker_id)
+    elif args.events:
+        agent.run_events()
+    elif args.continuous:
+        agent.run_continuous()
+    else:
+        agent.run()
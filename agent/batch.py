@@ -0,0 +1,216 @@
+# Multi-customer Claude requests with structured JSON output
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from agent.config import agentSettings # Batch sizes, retry limits and model name
+from agent.ratelimit import backoff_delay, is_retryable_status # Shared backoff policy
+
+# JSON schema every per-customer result must satisfy; also shown to Claude in the prompt
+RFM_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "CustomerID": {"type": "integer"},
+        "recency": {"type": "integer", "minimum": 0},
+        "frequency": {"type": "integer", "minimum": 1},
+        "monetary": {"type": "number", "minimum": 0},
+        "priority": {"type": "string", "enum": ["High", "Low"]}
+    },
+    "required": ["CustomerID", "recency", "frequency", "monetary", "priority"]
+}
+
+# Prefill for the assistant turn so the answer starts as the expected JSON object
+JSON_PREFILL = '{"customers": ['
+
+# Rejections caused by the request itself (e.g. prompt too large); smaller single-customer requests may still succeed.
+# Other non-retryable statuses (401/403 auth, 404 unknown model) fail every request the same way.
+REQUEST_SPECIFIC_STATUSES = (400, 413)
+
+
+def build_batch_prompt(orders_by_customer: Dict[int, List[Dict[str, Any]]], reference_date: str) -> str:
+    """One prompt for many customers; orders are sent compactly as [OrderDate, TotalDue] pairs"""
+    payload = {
+        str(CustomerID): [[str(o["OrderDate"])[:10], float(o["TotalDue"])] for o in orders]
+        for CustomerID, orders in orders_by_customer.items()
+    }
+    return f"""Analyze the order history of each customer below.
+Reference date: {reference_date}
+High-priority criteria: Recency < 30 days AND Frequency >= 3 orders AND Monetary > $5000
+
+For every customer calculate:
+- recency: days between {reference_date} and the customer's most recent order
+- frequency: total number of orders
+- monetary: sum of all order amounts
+- priority: High if the criteria are met, otherwise Low
+
+Orders are a JSON object mapping CustomerID to a list of [OrderDate, TotalDue] pairs.
+<orders>{json.dumps(payload, separators=(",", ":"))}</orders>
+
+Reply with JSON only, shaped as {{"customers": [item, ...]}} with one item per customer.
+Each item must match this JSON schema:
+{json.dumps(RFM_ITEM_SCHEMA, separators=(",", ":"))}"""
+
+
+def validate_item(item: Any) -> Optional[Dict[str, Any]]:
+    """Returns a normalized rfm_data dict if item satisfies RFM_ITEM_SCHEMA, otherwise None"""
+    if not isinstance(item, dict):
+        return None
+    try:
+        CustomerID = item["CustomerID"]
+        recency, frequency, monetary = item["recency"], item["frequency"], item["monetary"]
+        priority = item["priority"]
+    except KeyError:
+        return None
+    numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (CustomerID, recency, frequency, monetary))
+    if not numeric or priority not in ("High", "Low") or recency < 0 or frequency < 1 or monetary < 0:
+        return None
+    return {
+        "CustomerID": int(CustomerID),
+        "recency": int(recency),
+        "frequency": int(frequency),
+        "monetary": float(monetary),
+        "priority": priority
+    }
+
+
+def parse_batch_response(text: str) -> Dict[int, Dict[str, Any]]:
+    """Parses the (prefill-completed) JSON answer into {CustomerID: rfm_data}, keeping only valid items"""
+    data = None
+    # The answer normally continues the prefill; accept a complete object as well
+    for candidate in (JSON_PREFILL + text, text):
+        try:
+            data = json.loads(candidate)
+            break
+        except json.JSONDecodeError:
+            continue
+    items = data.get("customers", []) if isinstance(data, dict) else []
+    results = {}
+    for item in items:
+        rfm_data = validate_item(item)
+        if rfm_data:
+            results[rfm_data.pop("CustomerID")] = rfm_data
+    return results
+
+
+class BatchAnalyzer:
+    """
+    Packs customers into multi-customer requests and retries only the customers
+    whose items were missing or invalid in the answer.
+
+    Args:
+        send: Callable(prompt, max_tokens, prefill) returning an Anthropic Message,
+              normally MCPAgent._create_message so the shared rate limiter applies
+        claude: Anthropic client, only needed for submit_message_batch()
+
+    A non-retryable Claude error (see is_retryable_status) stops the analysis; it is kept
+    in `rejected` so the caller can decide whether single-customer requests are worth trying.
+    """
+
+    def __init__(self, send: Callable[..., Any], claude=None):
+        self.send = send
+        self.claude = claude
+        self.requests = 0
+        self.rejected: Optional[Exception] = None
+
+    def analyze(self, orders_by_customer: Dict[int, List[Dict[str, Any]]]) -> Dict[int, Dict[str, Any]]:
+        """Returns {CustomerID: rfm_data} for every customer Claude answered validly"""
+        reference_date = datetime.now().strftime("%Y-%m-%d")
+        results: Dict[int, Dict[str, Any]] = {}
+        pending = [CustomerID for CustomerID, orders in orders_by_customer.items() if orders]
+
+        for attempt in range(agentSettings.CLAUDE_MAX_RETRIES):
+            if not pending:
+                break
+            failed = []
+            # Halve the chunk size on every retry so one bad item cannot sink a large chunk again
+            chunk_size = max(1, agentSettings.CLAUDE_BATCH_SIZE >> attempt)
+            for chunk in _chunks(pending, chunk_size):
+                answered = self._send_chunk({c: orders_by_customer[c] for c in chunk}, reference_date, attempt)
+                if self.rejected is not None:
+                    # Retrying or splitting cannot help; leave the rest to the caller
+                    print(f"Batch analysis stopped: Claude rejected the request with status {getattr(self.rejected, 'status_code', None)}")
+                    return results
+                results.update(answered)
+                failed.extend(c for c in chunk if c not in answered)
+            if failed:
+                print(f"Batch attempt {attempt + 1}: {len(failed)} customers missing or invalid, retrying them")
+            pending = failed
+        return results
+
+    def _send_chunk(self, chunk_orders: Dict[int, List[Dict[str, Any]]], reference_date: str, attempt: int) -> Dict[int, Dict[str, Any]]:
+        prompt = build_batch_prompt(chunk_orders, reference_date)
+        try:
+            self.requests += 1
+            response = self.send(prompt, max_tokens=_max_tokens_for(len(chunk_orders)), prefill=JSON_PREFILL)
+        except Exception as claude_error:
+            print(f"Claude API error on batch attempt {attempt + 1}: {str(claude_error)}")
+            status_code = getattr(claude_error, "status_code", None)
+            if status_code is not None and not is_retryable_status(status_code):
+                self.rejected = claude_error
+            elif status_code is not None:
+                time.sleep(backoff_delay(attempt, agentSettings.CLAUDE_BACKOFF_BASE, agentSettings.CLAUDE_BACKOFF_MAX))
+            return {}
+        answered = parse_batch_response(response.content[0].text)
+        # Ignore items for customers that were not asked about
+        return {c: rfm for c, rfm in answered.items() if c in chunk_orders}
+
+    def supports_message_batches(self) -> bool:
+        return _message_batches_api(self.claude) is not None
+
+    def submit_message_batch(self, orders_by_customer: Dict[int, List[Dict[str, Any]]], poll_interval: float = 30.0) -> Dict[int, Dict[str, Any]]:
+        """
+        Sends all chunks through the asynchronous Message Batches API and waits for the results.
+        Intended for very large runs where latency does not matter; customers whose items
+        fail validation should be passed to analyze() afterwards.
+        """
+        batches_api = _message_batches_api(self.claude)
+        if batches_api is None:
+            raise RuntimeError("The installed anthropic SDK does not support the Message Batches API")
+        reference_date = datetime.now().strftime("%Y-%m-%d")
+        customer_ids = [CustomerID for CustomerID, orders in orders_by_customer.items() if orders]
+        requests = []
+        for index, chunk in enumerate(_chunks(customer_ids, agentSettings.CLAUDE_BATCH_SIZE)):
+            chunk_orders = {c: orders_by_customer[c] for c in chunk}
+            requests.append({
+                "custom_id": f"chunk-{index}",
+                "params": {
+                    "model": agentSettings.CLAUDE_MODEL,
+                    "max_tokens": _max_tokens_for(len(chunk)),
+                    "temperature": 0.1,
+                    "messages": [
+                        {"role": "user", "content": build_batch_prompt(chunk_orders, reference_date)},
+                        {"role": "assistant", "content": JSON_PREFILL}
+                    ]
+                }
+            })
+
+        batch = batches_api.create(requests=requests)
+        self.requests += 1
+        while batch.processing_status != "ended":
+            time.sleep(poll_interval)
+            batch = batches_api.retrieve(batch.id)
+
+        results: Dict[int, Dict[str, Any]] = {}
+        for entry in batches_api.results(batch.id):
+            if entry.result.type == "succeeded":
+                results.update(parse_batch_response(entry.result.message.content[0].text))
+        return {c: rfm for c, rfm in results.items() if c in orders_by_customer}
+
+
+def _chunks(items: List[int], size: int):
+    for start in range(0, len(items), max(1, size)):
+        yield items[start:start + size]
+
+
+def _max_tokens_for(customer_count: int) -> int:
+    # Roughly 40 output tokens per customer item plus some headroom
+    return min(8192, 100 + 40 * customer_count)
+
+
+def _message_batches_api(claude):
+    """Finds the Message Batches API on the installed SDK (GA or beta namespace), None if it has neither"""
+    batches = getattr(getattr(claude, "messages", None), "batches", None)
+    if batches is None:
+        batches = getattr(getattr(getattr(claude, "beta", None), "messages", None), "batches", None)
+    return batches
@@ -0,0 +1,150 @@
+# Persistent on-disk cache of Claude RFM analyses
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+
+class AnalysisCache:
+    """
+    SQLite-backed cache keyed by a fingerprint of a customer's orders plus the
+    prompt version, business-rule version and model name.
+
+    - Entries older than ttl_seconds are ignored and purged
+    - When more than max_entries are stored, the least recently used are evicted
+    - Entries written under a different version tag are dropped on open, so
+      bumping PROMPT_VERSION / RULES_VERSION invalidates everything at once
+    """
+
+    def __init__(self, path: str, version_tag: str, ttl_seconds: float = 7 * 86400, max_entries: int = 100000):
+        self.path = path
+        self.version_tag = version_tag
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # Create the folder for the cache file if needed
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " cache_key TEXT PRIMARY KEY,"
+            " customer_id INTEGER NOT NULL,"
+            " version_tag TEXT NOT NULL,"
+            " reference_date TEXT NOT NULL,"
+            " rfm_json TEXT NOT NULL,"
+            " priority TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_analyses_last_access ON analyses(last_access)")
+        self._conn.commit()
+        self.invalidate(keep_version=version_tag)
+
+    @staticmethod
+    def fingerprint(CustomerID: int, orders: List[Dict[str, Any]], version_tag: str) -> str:
+        """Stable hash of the order history, independent of row order and key order"""
+        canonical = sorted(
+            (str(o["SalesOrderID"]), str(o["OrderDate"])[:10], f"{float(o['TotalDue']):.2f}") for o in orders
+        )
+        payload = json.dumps([CustomerID, version_tag, canonical], separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def key(self, CustomerID: int, orders: List[Dict[str, Any]]) -> str:
+        return self.fingerprint(CustomerID, orders, self.version_tag)
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns {"rfm": ..., "priority": ..., "reference_date": date} or None.
+        Recency is stored as of reference_date; callers shift it to today.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rfm_json, priority, reference_date, created_at FROM analyses WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+            if row is None or now - row[3] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE analyses SET last_access = ? WHERE cache_key = ?", (now, cache_key))
+            self._conn.commit()
+            self.hits += 1
+        return {"rfm": json.loads(row[0]), "priority": row[1], "reference_date": date.fromisoformat(row[2])}
+
+    def put(self, cache_key: str, CustomerID: int, rfm_data: Dict[str, Any], priority: str, reference_date: date):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key, CustomerID, self.version_tag, reference_date.isoformat(),
+                 json.dumps(rfm_data), priority, now, now)
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """Drops expired entries, then the least recently used ones above max_entries. Returns rows removed"""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM analyses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+            overflow = self._count_locked() - self.max_entries
+            if overflow > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM analyses WHERE cache_key IN "
+                    "(SELECT cache_key FROM analyses ORDER BY last_access LIMIT ?)", (overflow,)
+                ).rowcount
+            self._conn.commit()
+        return removed
+
+    def invalidate(self, keep_version: Optional[str] = None) -> int:
+        """Removes every entry, or only those not written under keep_version"""
+        with self._lock:
+            if keep_version is None:
+                removed = self._conn.execute("DELETE FROM analyses").rowcount
+            else:
+                removed = self._conn.execute(
+                    "DELETE FROM analyses WHERE version_tag <> ?", (keep_version,)
+                ).rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._count_locked()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _count_locked(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+
+if __name__ == "__main__":
+    # Maintenance entry point: python -m agent.cache [--clear]
+    import sys
+    from agent.config import agentSettings
+    from agent.aiagent import analysis_version_tag
+
+    cache = AnalysisCache(agentSettings.ANALYSIS_CACHE_PATH, analysis_version_tag())
+    if "--clear" in sys.argv:
+        print(f"Removed {cache.invalidate()} cached analyses")
+    else:
+        print(f"Removed {cache.evict()} expired/overflow entries")
+    print(cache.stats())
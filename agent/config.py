@@ -7,5 +7,64 @@ class AgentSettings:
     CLAUDE_API_KEY: str = os.getenv("CLAUDE_API_KEY", "")
     FASTAPI_URL: str = os.getenv("FASTAPI_URL", "http://localhost:8000/api")
     AGENT_INTERVAL: int = int(os.getenv("AGENT_INTERVAL", 3600))  # Run every hour (in seconds)
+    WATERMARK_PATH: str = os.getenv("WATERMARK_PATH", ".agent_cache/watermark.json")  # Used by --continuous and --events
+    CLAUDE_MODEL: str = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
+
+    # Event-driven mode with --events (see agent/events.py); AGENT_INTERVAL becomes the safety-net sweep
+    AGENT_EVENT_DEBOUNCE: float = float(os.getenv("AGENT_EVENT_DEBOUNCE", 2))  # seconds without new orders before a customer is analyzed
+    AGENT_EVENT_MAX_DELAY: float = float(os.getenv("AGENT_EVENT_MAX_DELAY", 15))  # seconds; analyze anyway this long after the first order
+    AGENT_EVENT_WAIT: float = float(os.getenv("AGENT_EVENT_WAIT", 25))  # seconds per long-poll of the event feed
+
+    # Sharded full passes with --worker (see agent/worker.py): workers lease CustomerID ranges through the API
+    AGENT_LEASE_SECONDS: int = int(os.getenv("AGENT_LEASE_SECONDS", 300))  # A crashed worker's chunk is reclaimed after this; at most 86400
+    AGENT_LEASE_CHUNK_SIZE: int = int(os.getenv("AGENT_LEASE_CHUNK_SIZE", 1000))  # Customers per chunk, used by the worker that creates the run
+    AGENT_CHECKPOINT_SIZE: int = int(os.getenv("AGENT_CHECKPOINT_SIZE", 100))  # Customers analyzed between checkpoints
+    AGENT_LEASE_POLL_SECONDS: float = float(os.getenv("AGENT_LEASE_POLL_SECONDS", 10))  # Wait while the remaining chunks are leased by other workers
+
+    # HTTP client for the FastAPI service (see agent/http_client.py)
+    AGENT_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("AGENT_HTTP_CONNECT_TIMEOUT", 5))  # seconds
+    AGENT_HTTP_READ_TIMEOUT: float = float(os.getenv("AGENT_HTTP_READ_TIMEOUT", 120))  # seconds; bulk and batch calls can be slow
+    AGENT_HTTP_MAX_RETRIES: int = int(os.getenv("AGENT_HTTP_MAX_RETRIES", 3))  # Idempotent calls only
+    AGENT_HTTP_BACKOFF_BASE: float = float(os.getenv("AGENT_HTTP_BACKOFF_BASE", 0.5))  # seconds
+    AGENT_HTTP_BACKOFF_MAX: float = float(os.getenv("AGENT_HTTP_BACKOFF_MAX", 10))  # seconds
+
+    # Concurrency and Claude rate limiting (see agent/ratelimit.py)
+    AGENT_CONCURRENCY: int = int(os.getenv("AGENT_CONCURRENCY", 8))  # Customers processed in parallel
+    AGENT_HTTP_POOL_SIZE: int = int(os.getenv("AGENT_HTTP_POOL_SIZE", AGENT_CONCURRENCY))  # Keep-alive connections to the FastAPI service
+    CLAUDE_REQUESTS_PER_MINUTE: float = float(os.getenv("CLAUDE_REQUESTS_PER_MINUTE", 50))
+    CLAUDE_BURST: float = float(os.getenv("CLAUDE_BURST", 5))  # Token bucket capacity
+    CLAUDE_MAX_RETRIES: int = int(os.getenv("CLAUDE_MAX_RETRIES", 5))
+    CLAUDE_BACKOFF_BASE: float = float(os.getenv("CLAUDE_BACKOFF_BASE", 1))  # seconds
+    CLAUDE_BACKOFF_MAX: float = float(os.getenv("CLAUDE_BACKOFF_MAX", 30))  # seconds
+
+    # Batched Claude requests (see agent/batch.py); 1 disables batching
+    CLAUDE_BATCH_SIZE: int = int(os.getenv("CLAUDE_BATCH_SIZE", 20))  # Customers per request
+    CLAUDE_USE_MESSAGE_BATCHES: bool = os.getenv("CLAUDE_USE_MESSAGE_BATCHES", "false").lower() in ("1", "true", "yes")
+    CLAUDE_MESSAGE_BATCH_MIN: int = int(os.getenv("CLAUDE_MESSAGE_BATCH_MIN", 1000))  # Only use the async batch API above this many customers
+
+    # Single-customer prompt (see agent/prompt.py)
+    CLAUDE_PROMPT_ORDER_TOKENS: int = int(os.getenv("CLAUDE_PROMPT_ORDER_TOKENS", 1000))  # Order rows beyond this estimate are summarized in one line
+
+    # Offline fake Claude client (see agent/fake_claude.py)
+    CLAUDE_FAKE: bool = os.getenv("CLAUDE_FAKE", "false").lower() in ("1", "true", "yes")
+    CLAUDE_FAKE_LATENCY: float = float(os.getenv("CLAUDE_FAKE_LATENCY", 0))  # seconds per simulated call
+
+    # High-priority business rules (used by MCPAgent._calculate_priority and agent/rfm.py)
+    HIGH_MAX_RECENCY_DAYS: int = int(os.getenv("HIGH_MAX_RECENCY_DAYS", 365))
+    HIGH_MIN_FREQUENCY: int = int(os.getenv("HIGH_MIN_FREQUENCY", 3))
+    HIGH_MIN_MONETARY: float = float(os.getenv("HIGH_MIN_MONETARY", 5000))
+
+    # Local RFM fast path: only customers within these margins of a threshold are sent to Claude
+    RFM_FAST_PATH: bool = os.getenv("RFM_FAST_PATH", "true").lower() in ("1", "true", "yes")
+    RFM_RECENCY_MARGIN_DAYS: int = int(os.getenv("RFM_RECENCY_MARGIN_DAYS", 30))
+    RFM_FREQUENCY_MARGIN: int = int(os.getenv("RFM_FREQUENCY_MARGIN", 0))
+    RFM_MONETARY_MARGIN: float = float(os.getenv("RFM_MONETARY_MARGIN", 0.1))  # Fraction of HIGH_MIN_MONETARY
+    RFM_NARRATIVE_FOR_HIGH: bool = os.getenv("RFM_NARRATIVE_FOR_HIGH", "false").lower() in ("1", "true", "yes")  # Still ask Claude about clear High customers
+
+    # Persistent cache of Claude analyses (see agent/cache.py)
+    ANALYSIS_CACHE_ENABLED: bool = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    ANALYSIS_CACHE_PATH: str = os.getenv("ANALYSIS_CACHE_PATH", ".agent_cache/analyses.sqlite")
+    ANALYSIS_CACHE_TTL: float = float(os.getenv("ANALYSIS_CACHE_TTL", 7 * 86400))  # seconds
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 100000))
 
 agentSettings = AgentSettings()
\ No newline at end of file
@@ -0,0 +1,122 @@
+# Event-driven mode: customers are analyzed seconds after a new order instead of at the next interval
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from agent.config import agentSettings
+from agent.http_client import APIError
+from agent.utils import api_request
+
+
+class Debouncer:
+    """
+    Collects customers from order events. A customer is due once no new event for it has
+    arrived for `quiet` seconds, or `max_delay` seconds after its first event, so a burst
+    of orders from one customer leads to one analysis.
+    """
+
+    def __init__(self, quiet: float, max_delay: float):
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self.pending: Dict[int, Tuple[float, float]] = {}  # CustomerID -> (first event, last event)
+
+    def add(self, CustomerID: int, now: float):
+        first, _ = self.pending.get(CustomerID, (now, now))
+        self.pending[CustomerID] = (first, now)
+
+    def _due_at(self, first: float, last: float) -> float:
+        return min(last + self.quiet, first + self.max_delay)
+
+    def pop_due(self, now: float) -> List[int]:
+        due = [CustomerID for CustomerID, (first, last) in self.pending.items() if self._due_at(first, last) <= now]
+        for CustomerID in due:
+            del self.pending[CustomerID]
+        return due
+
+    def next_due_in(self, now: float) -> Optional[float]:
+        """Seconds until the next customer is due, or None when nothing is pending"""
+        if not self.pending:
+            return None
+        return max(0.0, min(self._due_at(first, last) for first, last in self.pending.values()) - now)
+
+
+class EventConsumer:
+    """
+    Long-polls the API's event feed (GET events/) and analyzes the customers of new orders.
+
+    - The feed position is taken before the catch-up cycle at startup, so orders placed while
+      it runs arrive as events rather than being missed.
+    - When the feed reports a gap (the consumer fell behind its buffer, or the API restarted),
+      an incremental cycle from the saved watermark covers the missed events.
+    - The incremental cycle also runs every AGENT_INTERVAL seconds as a safety net: it picks up
+      modified orders (the feed only carries new ones) and customers whose analysis failed.
+      Only that cycle moves the watermark. Customers the event path analyzed successfully are
+      left out of it unless they have a later order, so their follow-ups are not created twice.
+    """
+
+    def __init__(self, agent, store):
+        self.agent = agent
+        self.store = store
+        self.debouncer = Debouncer(agentSettings.AGENT_EVENT_DEBOUNCE, agentSettings.AGENT_EVENT_MAX_DELAY)
+        self.position: Optional[Dict[str, object]] = None  # {"feed", "next"} of the event feed
+        self.last_sweep = 0.0
+        self.event_orders: Dict[int, int] = {}  # CustomerID -> highest SalesOrderID among its pending events
+        self.handled: Dict[int, int] = {}  # CustomerID -> SalesOrderID analyzed by the event path, for the next sweep
+
+    def _sweep(self):
+        self.agent.run_cycle(self.store, self.handled)
+        self.last_sweep = time.monotonic()
+        # Orders at or below the saved watermark will not come up in a sweep again
+        watermark = self.store.load()
+        if watermark:
+            self.handled = {c: order_id for c, order_id in self.handled.items() if order_id > watermark["LastSalesOrderID"]}
+
+    def _poll(self, wait: float) -> List[dict]:
+        """Next events from the feed; re-syncs through an incremental cycle on a gap"""
+        if self.position is None:
+            page = api_request("GET", "events/")
+            self.position = {"feed": page["feed"], "next": page["next"]}
+            self._sweep()
+            return []
+        page = api_request("GET", "events/", {"after": self.position["next"], "feed": self.position["feed"], "wait": wait})
+        self.position = {"feed": page["feed"], "next": page["next"]}
+        if page["gap"]:
+            print(f"Event feed gap at {datetime.now()}; running an incremental cycle")
+            self._sweep()
+            return []
+        return page["events"]
+
+    def run(self):
+        print(f"Waiting for order events at {datetime.now()}")
+        while True:
+            now = time.monotonic()
+            # Long-poll until the next debounced customer or sweep is due
+            next_sweep_in = max(0.0, self.last_sweep + agentSettings.AGENT_INTERVAL - now)
+            next_due_in = self.debouncer.next_due_in(now)
+            wait = min(agentSettings.AGENT_EVENT_WAIT, next_sweep_in, next_due_in if next_due_in is not None else agentSettings.AGENT_EVENT_WAIT)
+            try:
+                for event in self._poll(wait):
+                    if event["type"] == "order":
+                        self.debouncer.add(event["CustomerID"], time.monotonic())
+                        CustomerID = event["CustomerID"]
+                        self.event_orders[CustomerID] = max(self.event_orders.get(CustomerID, 0), event["SalesOrderID"])
+            except APIError as e:
+                # The service is unreachable; pending customers wait, the feed reports a gap if it restarted
+                print(f"Event poll failed: {e}")
+                time.sleep(agentSettings.AGENT_EVENT_WAIT)
+                continue
+
+            due = self.debouncer.pop_due(time.monotonic())
+            if due:
+                print(f"Analyzing {len(due)} customers with new orders at {datetime.now()}")
+                orders = {CustomerID: self.event_orders.pop(CustomerID) for CustomerID in due}
+                try:
+                    summary = self.agent.process_customers(due)
+                    # Errors are not tied to customers reliably, so any error leaves the whole group to the sweep
+                    if not summary["errors"]:
+                        self.handled.update(orders)
+                except APIError as e:
+                    # Their orders are past the watermark, so the next incremental cycle retries them
+                    print(f"Event-driven analysis failed: {e}")
+            if time.monotonic() - self.last_sweep >= agentSettings.AGENT_INTERVAL:
+                self._sweep()
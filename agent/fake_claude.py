@@ -0,0 +1,129 @@
+# Offline stand-in for the Anthropic client, for tests and benchmarks without an API key
+import json
+import random
+import re
+import threading
+import time
+from datetime import date
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+
+class FakeAPIError(Exception):
+    """Mimics anthropic.APIStatusError closely enough for the agent's retry logic"""
+
+    def __init__(self, status_code: int, message: str = "Simulated API error"):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={"retry-after": "0"})
+
+
+class FakeClaude:
+    """
+    Answers RFM prompts by actually computing the values from the order data in the prompt.
+
+    Args:
+        latency: Seconds each call sleeps, to simulate network and generation time
+        error_rate: Probability of raising a retryable 529 error
+        malformed_rate: Probability of returning text the parsers must reject
+        seed: Seed for the random failure injection
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, malformed_rate: float = 0.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.messages = _FakeMessages(self)
+
+    def _respond(self, params: Dict[str, Any]):
+        with self._lock:
+            self.calls += 1
+            roll_error = self._random.random() < self.error_rate
+            roll_malformed = self._random.random() < self.malformed_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if roll_error:
+            raise FakeAPIError(529, "Overloaded")
+
+        messages = params["messages"]
+        prompt = next(m["content"] for m in messages if m["role"] == "user")
+        # A trailing assistant message is a prefill; the real API continues after it
+        prefill = messages[-1]["content"] if messages[-1]["role"] == "assistant" else ""
+
+        if roll_malformed:
+            text = "I'm not sure how to answer that."
+        elif "<orders>" in prompt:
+            text = _answer_batch(prompt)
+        else:
+            text = _answer_single(prompt)
+        if prefill and text.startswith(prefill):
+            text = text[len(prefill):]
+
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(input_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+        )
+
+
+class _FakeMessages:
+    def __init__(self, client: FakeClaude):
+        self._client = client
+        self.with_raw_response = _FakeRawMessages(client)
+
+    def create(self, **params):
+        return self._client._respond(params)
+
+
+class _FakeRawMessages:
+    def __init__(self, client: FakeClaude):
+        self._client = client
+
+    def create(self, **params):
+        message = self._client._respond(params)
+        return SimpleNamespace(headers={}, parse=lambda: message)
+
+
+def _reference_date(prompt: str) -> date:
+    match = re.search(r"Reference date:\s*(\d{4}-\d{2}-\d{2})", prompt)
+    return date.fromisoformat(match.group(1)) if match else date.today()
+
+
+def _rfm(orders: List[Dict[str, Any]], reference: date) -> Dict[str, Any]:
+    last_order = max(date.fromisoformat(str(o["OrderDate"])[:10]) for o in orders)
+    recency = (reference - last_order).days
+    frequency = len(orders)
+    monetary = round(sum(float(o["TotalDue"]) for o in orders), 2)
+    priority = "High" if recency < 365 and frequency >= 3 and monetary > 5000 else "Low"
+    return {"recency": recency, "frequency": frequency, "monetary": monetary, "priority": priority}
+
+
+def _answer_single(prompt: str) -> str:
+    # Single prompts send "date,amount" CSV rows, most recent first, plus an optional summary of older orders
+    orders = [
+        {"OrderDate": m.group(1), "TotalDue": float(m.group(2))}
+        for m in re.finditer(r"^(\d{4}-\d{2}-\d{2}),([0-9.]+)$", prompt, re.M)
+    ]
+    if not orders:
+        return "No orders found."
+    rfm = _rfm(orders, _reference_date(prompt))
+    earlier = re.search(r"Earlier orders not listed: count=(\d+), total=([0-9.]+)", prompt)
+    if earlier:
+        rfm["frequency"] += int(earlier.group(1))
+        rfm["monetary"] = round(rfm["monetary"] + float(earlier.group(2)), 2)
+        rfm["priority"] = "High" if rfm["recency"] < 365 and rfm["frequency"] >= 3 and rfm["monetary"] > 5000 else "Low"
+    return (f"Recency: {rfm['recency']} days, Frequency: {rfm['frequency']} orders, "
+            f"Monetary: ${rfm['monetary']:.2f}, Priority: {rfm['priority']}")
+
+
+def _answer_batch(prompt: str) -> str:
+    payload = json.loads(re.search(r"<orders>(.*?)</orders>", prompt, re.S).group(1))
+    reference = _reference_date(prompt)
+    results = []
+    for customer_id, rows in payload.items():
+        # Batch prompts send each order as [OrderDate, TotalDue]
+        orders = [{"OrderDate": row[0], "TotalDue": row[1]} for row in rows]
+        results.append(dict(CustomerID=int(customer_id), **_rfm(orders, reference)))
+    return json.dumps({"customers": results})
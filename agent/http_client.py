@@ -0,0 +1,173 @@
+# Pooled, retrying HTTP clients for the FastAPI service
+import asyncio
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx # Async client (already installed as a dependency of anthropic)
+import requests # Sync client
+from requests.adapters import HTTPAdapter
+
+from agent.config import agentSettings # Base URL, timeouts, retry policy and pool size
+from agent.ratelimit import backoff_delay, is_retryable_status # Shared backoff policy
+
+# Only these methods are retried; repeating a POST could create duplicate tasks
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class APIError(Exception):
+    """Raised when a call to the FastAPI service fails after all retries"""
+
+    def __init__(self, method: str, endpoint: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"{method} {endpoint} failed: {message}")
+        self.method = method
+        self.endpoint = endpoint
+        self.status_code = status_code
+
+
+class EndpointStats:
+    """Thread-safe per-endpoint request, error, retry and latency counters"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, label: str, seconds: float, error: bool = False, retried: bool = False):
+        with self._lock:
+            entry = self._stats.setdefault(label, {"requests": 0, "errors": 0, "retries": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["requests"] += 1
+            entry["errors"] += int(error)
+            entry["retries"] += int(retried)
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                label: dict(entry, avg_seconds=entry["total_seconds"] / entry["requests"])
+                for label, entry in self._stats.items()
+            }
+
+
+# Shared by the sync and async clients so one report covers every call the agent made
+endpoint_stats = EndpointStats()
+
+
+def endpoint_label(method: str, endpoint: str) -> str:
+    """Groups calls by route, e.g. "GET orders/customer/{id}", to keep the number of counters small"""
+    path = endpoint.split("?", 1)[0].strip("/")
+    return f"{method} " + re.sub(r"(?<=/)\d+(?=/|$)", "{id}", path)
+
+
+def _timeout() -> tuple:
+    return (agentSettings.AGENT_HTTP_CONNECT_TIMEOUT, agentSettings.AGENT_HTTP_READ_TIMEOUT)
+
+
+class ApiClient:
+    """
+    Blocking client with one keep-alive connection pool shared by all worker threads.
+
+    Args:
+        base_url: FastAPI base URL, e.g. http://localhost:8000/api
+        max_retries: Extra attempts for idempotent calls on connection errors, timeouts, 429 and 5xx
+        pool_size: Connections kept open to the service
+    """
+
+    def __init__(self, base_url: str = None, max_retries: int = None, pool_size: int = None):
+        self.base_url = (base_url or agentSettings.FASTAPI_URL).rstrip("/")
+        self.max_retries = agentSettings.AGENT_HTTP_MAX_RETRIES if max_retries is None else max_retries
+        pool_size = pool_size or agentSettings.AGENT_HTTP_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, endpoint: str, data: Any = None, params: Dict[str, Any] = None,
+                stream: bool = False) -> requests.Response:
+        """Sends the request and returns the response; raises APIError once retries are exhausted"""
+        url = f"{self.base_url}/{endpoint}"
+        label = endpoint_label(method, endpoint)
+        attempts = 1 + (self.max_retries if method in IDEMPOTENT_METHODS else 0)
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            status_code = None
+            try:
+                response = self.session.request(method, url, json=data, params=params, timeout=_timeout(), stream=stream)
+                status_code = response.status_code
+                response.raise_for_status()
+                endpoint_stats.record(label, time.perf_counter() - started, retried=attempt > 0)
+                return response
+            except requests.RequestException as e:
+                endpoint_stats.record(label, time.perf_counter() - started, error=True, retried=attempt > 0)
+                # HTTP errors other than 429/5xx (e.g. 404, 422) will not change on retry
+                retryable = status_code is None or is_retryable_status(status_code)
+                if not retryable or attempt == attempts - 1:
+                    raise APIError(method, endpoint, str(e), status_code) from e
+                time.sleep(backoff_delay(attempt, agentSettings.AGENT_HTTP_BACKOFF_BASE, agentSettings.AGENT_HTTP_BACKOFF_MAX))
+
+    def request_json(self, method: str, endpoint: str, data: Any = None, params: Dict[str, Any] = None) -> Any:
+        return self.request(method, endpoint, data, params).json()
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncApiClient:
+    """
+    asyncio counterpart of ApiClient, for fanning many calls out from one thread.
+    Use as `async with AsyncApiClient() as client:`; the client is bound to the running event loop.
+    """
+
+    def __init__(self, base_url: str = None, max_retries: int = None, pool_size: int = None):
+        self.base_url = (base_url or agentSettings.FASTAPI_URL).rstrip("/")
+        self.max_retries = agentSettings.AGENT_HTTP_MAX_RETRIES if max_retries is None else max_retries
+        pool_size = pool_size or agentSettings.AGENT_HTTP_POOL_SIZE
+        connect_timeout, read_timeout = _timeout()
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+
+    async def request(self, method: str, endpoint: str, data: Any = None, params: Dict[str, Any] = None) -> httpx.Response:
+        """Sends the request and returns the fully read response; raises APIError once retries are exhausted"""
+        url = f"{self.base_url}/{endpoint}"
+        label = endpoint_label(method, endpoint)
+        attempts = 1 + (self.max_retries if method in IDEMPOTENT_METHODS else 0)
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            status_code = None
+            try:
+                response = await self.client.request(method, url, json=data, params=params)
+                status_code = response.status_code
+                response.raise_for_status()
+                endpoint_stats.record(label, time.perf_counter() - started, retried=attempt > 0)
+                return response
+            except httpx.HTTPError as e:
+                endpoint_stats.record(label, time.perf_counter() - started, error=True, retried=attempt > 0)
+                retryable = status_code is None or is_retryable_status(status_code)
+                if not retryable or attempt == attempts - 1:
+                    raise APIError(method, endpoint, str(e), status_code) from e
+                await asyncio.sleep(backoff_delay(attempt, agentSettings.AGENT_HTTP_BACKOFF_BASE, agentSettings.AGENT_HTTP_BACKOFF_MAX))
+
+    async def request_json(self, method: str, endpoint: str, data: Any = None, params: Dict[str, Any] = None) -> Any:
+        return (await self.request(method, endpoint, data, params)).json()
+
+
+_client: Optional[ApiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ApiClient:
+    """Process-wide ApiClient, created on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApiClient()
+        return _client
@@ -0,0 +1,113 @@
+# Compact, token-budgeted prompt for single-customer RFM analysis
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.config import agentSettings # Order-history token budget
+
+# Rough size of a token for English text and numbers; close enough for budgeting and reporting
+CHARS_PER_TOKEN = 4
+
+# Column header of the order rows; only what RFM needs (CustomerID is in the prompt, SalesOrderID is unused)
+ORDER_COLUMNS = "OrderDate,TotalDue"
+
+# Reserved for the "Earlier orders" summary line when the history does not fit the budget
+SUMMARY_RESERVE_TOKENS = 30
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def encode_orders(orders: List[Dict[str, Any]], budget_tokens: int) -> Tuple[str, bool]:
+    """
+    Encodes orders as a header row plus one "date,amount" CSV row each, most recent first.
+    Rows that do not fit budget_tokens are folded into one pre-aggregated summary line
+    (count, total, date range), so Frequency and Monetary stay exact while Recency
+    only needs the newest row, which is always kept.
+    Returns (text, truncated).
+    """
+    rows = sorted(((str(o["OrderDate"])[:10], float(o["TotalDue"])) for o in orders), reverse=True)
+    row_lines = [f"{order_date},{total_due:.2f}" for order_date, total_due in rows]
+    budget_chars = budget_tokens * CHARS_PER_TOKEN
+    used = len(ORDER_COLUMNS)
+    if used + sum(len(line) + 1 for line in row_lines) > budget_chars:
+        # The full history does not fit; leave room for the summary line
+        budget_chars -= SUMMARY_RESERVE_TOKENS * CHARS_PER_TOKEN
+    kept = 0
+    for line in row_lines:
+        if kept and used + len(line) + 1 > budget_chars:
+            break
+        used += len(line) + 1
+        kept += 1
+    lines = [ORDER_COLUMNS] + row_lines[:kept]
+
+    rest = rows[kept:]
+    if rest:
+        lines.append(
+            f"Earlier orders not listed: count={len(rest)}, total={sum(t for _, t in rest):.2f}, "
+            f"first={rest[-1][0]}, last={rest[0][0]}"
+        )
+    return "\n".join(lines), bool(rest)
+
+
+def build_customer_prompt(CustomerID: int, orders: List[Dict[str, Any]], reference_date: str,
+                          budget_tokens: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    The analyze_customer prompt. Returns (prompt, info) where info holds the estimated
+    order-data tokens of this encoding and of the former Python-repr encoding.
+    """
+    if budget_tokens is None:
+        budget_tokens = agentSettings.CLAUDE_PROMPT_ORDER_TOKENS
+    order_data, truncated = encode_orders(orders, budget_tokens)
+    prompt = f"""Analyze the order history for CustomerID {CustomerID}.
+Reference date: {reference_date}
+High-priority criteria: Recency < 30 days AND Frequency >= 3 orders AND Monetary > $5000
+
+Calculate:
+- Recency: Days between {reference_date} and the customer's most recent order
+- Frequency: Total number of orders, including the count of any "Earlier orders" line
+- Monetary: Sum of all TotalDue amounts, including the total of any "Earlier orders" line
+- Priority: High if meets criteria, otherwise Low
+
+Return EXACTLY in this format:
+Recency: X days, Frequency: Y orders, Monetary: $Z, Priority: High/Low
+
+Order data (CSV, most recent first):
+{order_data}"""
+    info = {
+        "order_tokens": estimate_tokens(order_data),
+        "repr_tokens": estimate_tokens(str(orders)),
+        "truncated": truncated,
+    }
+    return prompt, info
+
+
+class PromptStats:
+    """Thread-safe totals of estimated order-data tokens sent versus the repr encoding"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._prompts = 0
+            self._order_tokens = 0
+            self._repr_tokens = 0
+            self._truncated = 0
+
+    def record(self, info: Dict[str, Any]):
+        with self._lock:
+            self._prompts += 1
+            self._order_tokens += info["order_tokens"]
+            self._repr_tokens += info["repr_tokens"]
+            self._truncated += int(info["truncated"])
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "prompts": self._prompts,
+                "order_tokens": self._order_tokens,
+                "tokens_saved": self._repr_tokens - self._order_tokens,
+                "truncated": self._truncated,
+            }
@@ -0,0 +1,89 @@
+# Client-side rate limiting and retry helpers for the Claude API
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Mapping, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by all worker threads.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. When
+    Claude's rate-limit headers say the server-side budget is exhausted, the
+    bucket is paused until the advertised reset time.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Blocks until a token is available. Returns the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # Refill based on elapsed time
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                # Sleep until the pause ends or one token has refilled
+                delay = max(self._paused_until - now, (1 - self._tokens) / self.rate if self.rate > 0 else 1.0)
+            time.sleep(delay)
+            waited += delay
+
+    def pause_for(self, seconds: float):
+        """Stops handing out tokens for the given number of seconds"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, Any]):
+        """
+        Adjusts the bucket from Claude's rate-limit response headers:
+        - retry-after: seconds to back off (sent with 429s)
+        - anthropic-ratelimit-requests-remaining / -reset: pause until reset when nothing is left
+        """
+        if not headers:
+            return
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                self.pause_for(float(retry_after))
+            except ValueError:
+                pass
+        remaining = headers.get("anthropic-ratelimit-requests-remaining")
+        reset = headers.get("anthropic-ratelimit-requests-reset")
+        if remaining is not None and reset:
+            try:
+                if int(remaining) <= 0:
+                    self.pause_for(_seconds_until(reset))
+                else:
+                    # Never hold more local tokens than the server says are left
+                    with self._lock:
+                        self._tokens = min(self._tokens, float(remaining))
+            except ValueError:
+                pass
+
+
+def _seconds_until(timestamp: str) -> float:
+    # Reset headers are RFC 3339 timestamps, e.g. 2024-05-01T12:00:30Z
+    reset_at = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_retryable_status(status_code: Optional[int]) -> bool:
+    """429 (rate limited), 529 (overloaded) and other 5xx responses are worth retrying"""
+    return status_code is not None and (status_code == 429 or status_code >= 500)
@@ -0,0 +1,117 @@
+# Vectorized RFM (Recency, Frequency, Monetary) scoring for all customers at once
+import numpy as np
+from datetime import date
+from typing import Any, Dict, Iterable, Optional
+
+from agent.config import agentSettings # Thresholds and borderline margins
+
+# Labels returned by classify()
+HIGH = "High"
+LOW = "Low"
+BORDERLINE = "Borderline"
+
+
+class RFMScores:
+    """Column-oriented RFM results; every attribute is a NumPy array aligned on customer_ids"""
+
+    def __init__(self, customer_ids, recency, frequency, monetary):
+        self.customer_ids = customer_ids
+        self.recency = recency # Days since last order
+        self.frequency = frequency # Number of orders
+        self.monetary = monetary # Sum of TotalDue
+        # Quintile scores, 5 = best. Lower recency is better, so its ranking is reversed
+        self.r_score = quantile_scores(-recency)
+        self.f_score = quantile_scores(frequency)
+        self.m_score = quantile_scores(monetary)
+
+    def __len__(self):
+        return len(self.customer_ids)
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Return one customer's values in the same shape parse_rfm_response produces"""
+        return {
+            "recency": int(self.recency[index]),
+            "frequency": int(self.frequency[index]),
+            "monetary": round(float(self.monetary[index]), 2),
+            "r_score": int(self.r_score[index]),
+            "f_score": int(self.f_score[index]),
+            "m_score": int(self.m_score[index]),
+        }
+
+
+def quantile_scores(values: np.ndarray, buckets: int = 5) -> np.ndarray:
+    """Map each value to a 1..buckets score by its rank; tied values share their average rank"""
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int8)
+    # Rank via sorted position of each value, so equal values get equal scores
+    sorted_values = np.sort(values)
+    first = np.searchsorted(sorted_values, values, side="left")
+    last = np.searchsorted(sorted_values, values, side="right") - 1
+    ranks = (first + last) / 2
+    return (1 + np.floor(ranks * buckets / len(values))).astype(np.int8)
+
+
+def score_customers(orders: Iterable[Dict[str, Any]], reference_date: Optional[date] = None) -> RFMScores:
+    """
+    Computes R/F/M for every customer present in a flat list of order dicts
+    (SalesOrderID, CustomerID, OrderDate, TotalDue) in a handful of array operations.
+    """
+    orders = list(orders)
+    reference = np.datetime64(reference_date or date.today(), "D")
+
+    if not orders:
+        empty = np.zeros(0)
+        return RFMScores(np.zeros(0, dtype=np.int64), empty, empty, empty)
+
+    customer_col = np.fromiter((o["CustomerID"] for o in orders), dtype=np.int64, count=len(orders))
+    # OrderDate arrives as "YYYY-MM-DD" or an ISO datetime string; keep the date part only
+    date_col = np.array([str(o["OrderDate"])[:10] for o in orders], dtype="datetime64[D]")
+    total_col = np.fromiter((float(o["TotalDue"]) for o in orders), dtype=np.float64, count=len(orders))
+
+    # Group orders by customer: unique ids plus the group index of every order
+    customer_ids, group = np.unique(customer_col, return_inverse=True)
+
+    frequency = np.bincount(group, minlength=len(customer_ids)).astype(np.int64)
+    monetary = np.bincount(group, weights=total_col, minlength=len(customer_ids))
+
+    # Most recent order per customer
+    last_order_days = np.full(len(customer_ids), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(last_order_days, group, date_col.astype(np.int64))
+    last_order = last_order_days.astype("datetime64[D]")
+    recency = (reference - last_order).astype(np.int64)
+
+    return RFMScores(customer_ids, recency, frequency, monetary)
+
+
+def classify(scores: RFMScores) -> np.ndarray:
+    """
+    Labels every customer High, Low or Borderline against the business rules in
+    MCPAgent._calculate_priority.
+
+    A customer is only "clearly" High or Low when every value is at least the
+    configured margin away from its threshold; anything closer is Borderline
+    and should be reviewed by Claude.
+    """
+    recency_limit = agentSettings.HIGH_MAX_RECENCY_DAYS
+    min_frequency = agentSettings.HIGH_MIN_FREQUENCY
+    min_monetary = agentSettings.HIGH_MIN_MONETARY
+    r_margin = agentSettings.RFM_RECENCY_MARGIN_DAYS
+    f_margin = agentSettings.RFM_FREQUENCY_MARGIN
+    m_margin = min_monetary * agentSettings.RFM_MONETARY_MARGIN
+
+    clearly_high = (
+        (scores.recency < recency_limit - r_margin) &
+        (scores.frequency >= min_frequency + f_margin) &
+        (scores.monetary > min_monetary + m_margin)
+    )
+    clearly_low = (
+        (scores.recency >= recency_limit + r_margin) |
+        (scores.frequency < min_frequency - f_margin) |
+        (scores.monetary <= min_monetary - m_margin)
+    )
+
+    labels = np.full(len(scores), BORDERLINE, dtype=object)
+    labels[clearly_low] = LOW
+    labels[clearly_high] = HIGH
+    return labels
+
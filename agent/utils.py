@@ -1,36 +1,71 @@
 # Import required modules
-import requests # Used for making HTTP requests to APIs
-from typing import Any, Dict  # Used for type hinting
+import asyncio # Used to fetch order-history chunks concurrently
+import json # Used to decode streamed NDJSON lines
+from typing import Any, Dict, List  # Used for type hinting
 
 # Import configuration settings (the base URL for your API, Claude key, Etc.)
-from agent.config import AgentSettings
+from agent.config import agentSettings
+# Pooled, retrying clients; failures raise APIError instead of looking like empty results
+from agent.http_client import APIError, AsyncApiClient, get_client
 
 # Define a function to make an API request using a given method, endpoint, and optional data
-def api_request(method: str, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
-    # Construct the full URL for the API call
-    url = f"{AgentSettings.FASTAPI_URL}/{endpoint}"
-    headers = {"Content-Type": "application/json"}
-    try:
-        # Choose the request method dynamically
-        if method == "GET":
-            response = requests.get(url, headers=headers, params=data)
-        elif method == "POST":
-            response = requests.post(url, json=data, headers=headers)
-        elif method == "PUT":
-            response = requests.put(url, json=data, headers=headers)
-        else:
-            # Raise an error if the method is not supported
-            raise ValueError(f"Unsupported method: {method}")
-        
+def api_request(method: str, endpoint: str, data: Dict[str, Any] = None) -> Any:
+    # Query parameters for GET, JSON body for everything else
+    if method not in ("GET", "POST", "PUT", "DELETE"):
         # Raise an error if the method is not supported
-        response.raise_for_status()
+        raise ValueError(f"Unsupported method: {method}")
+    if method == "GET":
+        return get_client().request_json(method, endpoint, params=data)
+    # Return the JSON response as Python data; raises APIError if the call failed after retries
+    return get_client().request_json(method, endpoint, data=data)
 
-         # Return the JSON response as a Python dictionary
-        return response.json()
-    except requests.RequestException as e:
-        # Print an error message if the request fails and return an empty dictionary
-        print(f"API request failed: {e}")
+# Define a function that walks a keyset-paginated list endpoint and returns every item
+def api_get_all_pages(endpoint: str, params: Dict[str, Any] = None, page_size: int = 500) -> List[Dict[str, Any]]:
+    items = []
+    cursor = None
+    while True:
+        # Ask for the next page, passing the opaque cursor from the previous one
+        query = dict(params or {}, limit=page_size)
+        if cursor:
+            query["cursor"] = cursor
+        page = api_request("GET", endpoint, query)
+        items.extend(page.get("items", []))
+        # Stop once the API reports there is nothing after this page
+        cursor = page.get("next")
+        if not cursor:
+            break
+    return items
+
+# Define a function that fetches order histories for many customers through the batch endpoint
+def api_get_order_histories(customer_ids: List[int], chunk_size: int = 5000) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Customers in a chunk that failed are left out of the result; callers fall back to
+    fetching those histories one customer at a time.
+    """
+    chunks = [customer_ids[start:start + chunk_size] for start in range(0, len(customer_ids), chunk_size)]
+    if not chunks:
         return {}
+    return asyncio.run(_get_order_histories(chunks))
+
+async def _get_order_histories(chunks: List[List[int]]) -> Dict[int, List[Dict[str, Any]]]:
+    histories = {}
+    # Send the chunks concurrently, at most AGENT_CONCURRENCY in flight
+    semaphore = asyncio.Semaphore(agentSettings.AGENT_CONCURRENCY)
+    async with AsyncApiClient() as client:
+        async def fetch(chunk):
+            async with semaphore:
+                try:
+                    response = await client.request("POST", "orders/batch/", {"customer_ids": chunk})
+                except APIError as e:
+                    print(f"API request failed: {e}")
+                    return
+            # The endpoint streams one JSON object per line, grouped by customer
+            for line in response.text.splitlines():
+                if line:
+                    entry = json.loads(line)
+                    histories[entry["CustomerID"]] = entry["orders"]
+        await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+    return histories
 
 # Define a function to extract RFM (Recency, Frequency, Monetary) values from a text response
 def parse_rfm_response(claude_response: str) -> Dict[str, float]:
@@ -0,0 +1,38 @@
+# Persistent watermark for incremental (continuous) agent runs
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+class WatermarkStore:
+    """
+    Keeps the newest SalesOrderID / ModifiedDate the agent has processed in a small JSON file.
+    Writes go to a temporary file first so a crash never leaves a half-written watermark.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Returns the saved watermark, or None if the agent has never completed a cycle"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, watermark: Dict[str, Any]):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(watermark, f)
+        # Atomic rename on both POSIX and Windows
+        os.replace(temp_path, self.path)
+
+    def reset(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,141 @@
+# Sharded full passes: several agent processes split one run through leases on CustomerID ranges
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from agent.config import agentSettings
+from agent.http_client import APIError
+from agent.utils import api_request
+
+
+def default_worker_id() -> str:
+    """Host name and process ID, unique among the workers sharing a run"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseLost(Exception):
+    """Raised when another worker has taken over a chunk after our lease expired"""
+
+
+class _Heartbeat:
+    """Renews one lease every lease_seconds / 3 in a daemon thread while a chunk is processed"""
+
+    def __init__(self, worker: "LeaseWorker", lease: Dict[str, Any]):
+        self.worker = worker
+        self.lease = lease
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="lease-heartbeat", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self):
+        while not self._stop.wait(self.worker.lease_seconds / 3):
+            try:
+                self.worker.renew(self.lease)
+            except LeaseLost:
+                self.lost = True
+                return
+            except APIError as e:
+                # Transient; the lease only runs out if every renewal before expiry fails
+                print(f"Lease heartbeat failed: {e}")
+
+
+class LeaseWorker:
+    """
+    Works through one run's chunks until none are left: claim a chunk, analyze its customers
+    in batches of checkpoint_size, mark it done, claim the next one.
+
+    - The first worker to start creates the run (AGENT_LEASE_CHUNK_SIZE customers per chunk);
+      the others join it by posting the same run_id.
+    - A heartbeat renews the lease while the chunk is processed. If the worker dies, the lease
+      expires and another worker claims the chunk.
+    - The checkpoint (last CustomerID of the finished batch) is saved after every batch, so
+      whoever claims the chunk next resumes after it instead of starting the chunk over.
+    - When every remaining chunk is leased by another worker, it waits and retries, which is
+      how chunks of crashed workers get picked up.
+
+    Customers that fail are reported in the summary; the checkpoint still moves past them,
+    so the next run (or a --continuous cycle) retries them rather than this one looping.
+    """
+
+    def __init__(self, agent, run_id: str, worker_id: Optional[str] = None):
+        self.agent = agent
+        self.run_id = run_id
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = agentSettings.AGENT_LEASE_SECONDS
+        self.checkpoint_size = agentSettings.AGENT_CHECKPOINT_SIZE
+
+    def renew(self, lease: Dict[str, Any], checkpoint: Optional[int] = None, done: bool = False):
+        """Extends the lease and saves the checkpoint; raises LeaseLost if another worker holds the chunk"""
+        data = {
+            "worker_id": self.worker_id,
+            "lease_seconds": self.lease_seconds,
+            "checkpoint_customer_id": checkpoint,
+            "done": done
+        }
+        try:
+            api_request("PUT", f"agent/runs/{self.run_id}/leases/{lease['ChunkID']}/", data)
+        except APIError as e:
+            if e.status_code == 409:
+                raise LeaseLost(f"Chunk {lease['ChunkID']} of run {self.run_id} was taken over") from e
+            raise
+
+    def run(self) -> Dict[str, Any]:
+        print(f"Worker {self.worker_id} joining run {self.run_id} at {datetime.now()}")
+        run = api_request("POST", "agent/runs/", {"run_id": self.run_id, "chunk_size": agentSettings.AGENT_LEASE_CHUNK_SIZE})
+        print(f"Run {self.run_id}: {run['chunks']} chunks, {run['chunks_by_status']}")
+
+        totals = {"chunks": 0, "processed": 0, "high_priority": 0, "claude_calls": 0, "errors": []}
+        while True:
+            try:
+                lease = api_request("POST", f"agent/runs/{self.run_id}/claim/", {"worker_id": self.worker_id, "lease_seconds": self.lease_seconds})
+                if lease is None:
+                    if api_request("GET", f"agent/runs/{self.run_id}/")["done"]:
+                        break
+                    # Everything left is leased; wait in case one of its workers has died
+                    time.sleep(agentSettings.AGENT_LEASE_POLL_SECONDS)
+                    continue
+                self._process_chunk(lease, totals)
+                totals["chunks"] += 1
+            except LeaseLost as e:
+                print(f"Abandoning chunk: {e}")
+            except APIError as e:
+                # The service is unreachable; an unfinished lease expires and is claimed again
+                print(f"Worker cycle failed: {e}")
+                time.sleep(agentSettings.AGENT_LEASE_POLL_SECONDS)
+
+        print(f"Worker {self.worker_id} finished at {datetime.now()}: {totals['chunks']} chunks, "
+              f"{totals['processed']} customers, {len(totals['errors'])} errors")
+        return totals
+
+    def _process_chunk(self, lease: Dict[str, Any], totals: Dict[str, Any]):
+        checkpoint = lease["CheckpointCustomerID"]
+        after = checkpoint if checkpoint is not None else lease["FirstCustomerID"] - 1
+        customer_ids: List[int] = api_request("GET", "agent/customer-ids/", {"after": after, "through": lease["LastCustomerID"]})
+        resumed = f", resuming after customer {checkpoint}" if checkpoint is not None else ""
+        print(f"Chunk {lease['ChunkID']} (attempt {lease['Attempts']}): {len(customer_ids)} customers{resumed}")
+
+        heartbeat = _Heartbeat(self, lease)
+        heartbeat.start()
+        try:
+            for start in range(0, len(customer_ids), self.checkpoint_size):
+                if heartbeat.lost:
+                    raise LeaseLost(f"Chunk {lease['ChunkID']} of run {self.run_id} was taken over")
+                batch = customer_ids[start:start + self.checkpoint_size]
+                summary = self.agent.process_customers(batch)
+                for key in ("processed", "high_priority", "claude_calls"):
+                    totals[key] += summary[key]
+                totals["errors"].extend(summary["errors"])
+                self.renew(lease, checkpoint=batch[-1])
+            self.renew(lease, done=True)
+        finally:
+            heartbeat.stop()
@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from app import database
+from app.config import settings
+from app.pool import PoolTimeoutError
+
+# Bounded worker pool for blocking database calls. DB_EXECUTOR_WORKERS defaults to
+# DB_POOL_MAX_SIZE so a worker never sits waiting on a connection checkout; with
+# more workers than connections, the extra ones wait up to DB_POOL_CHECKOUT_TIMEOUT.
+_executor = ThreadPoolExecutor(max_workers=settings.DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+
+def _query_timeout(timeout):
+    return timeout if timeout is not None else (settings.DB_QUERY_TIMEOUT or None)
+
+
+class DatabaseTimeoutError(Exception):
+    """Raised when a database call does not finish within its timeout."""
+
+
+async def run_in_db_executor(func, *args, timeout=None, **kwargs):
+    """
+    Run a blocking database function on the DB executor and await the result.
+
+    The timeout covers both the time spent queued for a worker and the call
+    itself. If it expires, queued work is cancelled before it starts; a call
+    already running is not interrupted (see _run_query for database helpers).
+    """
+    timeout = _query_timeout(timeout)
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        raise DatabaseTimeoutError(f"Database call exceeded {timeout}s")
+
+
+async def _run_query(func, *args, timeout=None):
+    """
+    run_in_db_executor for an app.database helper. The helper gets what is left of
+    the timeout once a worker picks it up, so the backend's query timeout aborts a
+    statement at the same deadline the caller stops waiting at.
+    """
+    timeout = _query_timeout(timeout)
+    if not timeout:
+        return await run_in_db_executor(func, *args, None, timeout=timeout)
+    deadline = time.monotonic() + timeout
+
+    def call():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DatabaseTimeoutError(f"Database call exceeded {timeout}s while queued")
+        return func(*args, remaining)
+
+    return await run_in_db_executor(call, timeout=timeout)
+
+
+async def execute_query(query, params=None, as_dict=True, timeout=None):
+    """Async counterpart of app.database.execute_query."""
+    return await _run_query(database.execute_query, query, params, as_dict, timeout=timeout)
+
+
+async def execute_query_columns(query, params=None, timeout=None):
+    """Async counterpart of app.database.execute_query_columns."""
+    return await _run_query(database.execute_query_columns, query, params, timeout=timeout)
+
+
+async def execute_command(query, params=None, timeout=None):
+    """Async counterpart of app.database.execute_command."""
+    return await _run_query(database.execute_command, query, params, timeout=timeout)
+
+
+async def execute_multi_query(query, params=None, timeout=None):
+    """Async counterpart of app.database.execute_multi_query."""
+    return await _run_query(database.execute_multi_query, query, params, timeout=timeout)
+
+
+async def execute_returning(query, params=None, timeout=None):
+    """Async counterpart of app.database.execute_returning."""
+    return await _run_query(database.execute_returning, query, params, timeout=timeout)
+
+
+async def execute_scalar(query, params=None, timeout=None):
+    """Async counterpart of app.database.execute_scalar."""
+    return await _run_query(database.execute_scalar, query, params, timeout=timeout)
+
+
+async def execute_insert_get_id(query, params=None, timeout=None):
+    """Async counterpart of app.database.execute_insert_get_id."""
+    return await _run_query(database.execute_insert_get_id, query, params, timeout=timeout)
+
+
+# Streamed responses keep a pooled connection checked out until the client has read
+# everything, so only DB_STREAM_MAX_CONCURRENT of them run at once.
+_stream_slots = asyncio.Semaphore(settings.DB_STREAM_MAX_CONCURRENT)
+
+
+def check_stream_slot():
+    """Raise PoolTimeoutError (503) up front when every stream slot is taken."""
+    if _stream_slots.locked():
+        raise PoolTimeoutError(f"All {settings.DB_STREAM_MAX_CONCURRENT} streaming slots are in use")
+
+
+async def _iterate_in_db_executor(iterator, timeout):
+    loop = asyncio.get_running_loop()
+    done = object()
+    step = None
+    try:
+        while True:
+            step = loop.run_in_executor(_executor, next, iterator, done)
+            try:
+                item = await asyncio.wait_for(asyncio.shield(step), timeout)
+            except asyncio.TimeoutError:
+                raise DatabaseTimeoutError(f"Database call exceeded {timeout}s")
+            if item is done:
+                return
+            yield item
+    finally:
+        if step is not None and not step.done():
+            # The generator is still running on a worker; close it once that step returns
+            step.add_done_callback(lambda _: loop.run_in_executor(_executor, iterator.close))
+        else:
+            await loop.run_in_executor(_executor, iterator.close)
+
+
+async def stream_in_db_executor(iterator, timeout=None):
+    """
+    Async iteration over a blocking generator that reads from the database (e.g. over
+    app.database.iter_batches), for StreamingResponse.
+
+    Every step runs on the DB executor within the query timeout instead of on the
+    unbounded threadpool, and the stream holds one of the DB_STREAM_MAX_CONCURRENT
+    slots until it ends. Call check_stream_slot() before starting the response so a
+    full server answers 503 rather than a stream that fails after its headers.
+    """
+    timeout = _query_timeout(timeout)
+    try:
+        await asyncio.wait_for(_stream_slots.acquire(), timeout)
+    except asyncio.TimeoutError:
+        iterator.close()
+        raise PoolTimeoutError(f"No streaming slot became free within {timeout}s")
+    try:
+        async with aclosing(_iterate_in_db_executor(iterator, timeout)) as items:
+            async for item in items:
+                yield item
+    finally:
+        _stream_slots.release()
+
+
+def shutdown():
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,15 @@
+from app.backends.base import DatabaseBackend
+
+
+def create_backend(config) -> DatabaseBackend:
+    """Backend for Settings.DB_BACKEND; driver modules are only imported for the backend in use."""
+    if config.DB_BACKEND == "postgres":
+        from app.backends.postgres import PostgresBackend
+        return PostgresBackend(config)
+    if config.DB_BACKEND == "sqlite":
+        from app.backends.sqlite import SqliteBackend
+        return SqliteBackend(config)
+    if config.DB_BACKEND == "mssql":
+        from app.backends.mssql import MssqlBackend
+        return MssqlBackend(config)
+    raise ValueError(f"Unknown DB_BACKEND: {config.DB_BACKEND!r}")
@@ -0,0 +1,55 @@
+from contextlib import closing
+
+
+class DatabaseBackend:
+    """
+    Driver-specific pieces behind the execute_* helpers in app/database.py.
+
+    Subclasses open connections and cover what DB-API leaves to each driver:
+    query timeouts, generated IDs, multiple result sets and streaming cursors.
+    The SQL itself comes from Settings, with per-backend overrides in app/dialects.py.
+    """
+
+    name = "base"
+    validation_query = "SELECT 1"
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        raise NotImplementedError
+
+    def set_timeout(self, conn, seconds):
+        """Abort statements on this checkout that run longer than the given seconds, per statement (None or 0 for no limit)."""
+
+    def clear_timeout(self, conn):
+        """Undo set_timeout before the connection goes back to the pool."""
+
+    def cursor(self, conn):
+        # Not every driver's cursor is a context manager (sqlite3's is not)
+        return closing(conn.cursor())
+
+    def stream_cursor(self, conn, batch_size):
+        """Cursor for reading a large result a batch at a time."""
+        return self.cursor(conn)
+
+    def insert_get_id(self, cursor, query, params):
+        """Run an INSERT and return the generated key of the new row."""
+        raise NotImplementedError
+
+    def execute_multi(self, cursor, query, params):
+        """
+        Run several SELECTs and return one list of rows (with column names) per result set.
+        Drivers without multiple result sets run the ;-separated statements one by one,
+        so params are only supported for a single statement there.
+        """
+        result_sets = []
+        statements = [statement for statement in query.split(";") if statement.strip()]
+        for statement in statements:
+            cursor.execute(statement, params if len(statements) == 1 else ())
+            columns = [column[0] for column in cursor.description]
+            result_sets.append((columns, cursor.fetchall()))
+        return result_sets
+
+    def execute_many(self, cursor, query, rows):
+        cursor.executemany(query, rows)
@@ -0,0 +1,52 @@
+import math
+import pyodbc
+from app.backends.base import DatabaseBackend
+
+
+class MssqlBackend(DatabaseBackend):
+    """SQL Server / Azure SQL through pyodbc; runs the T-SQL in Settings as is."""
+
+    name = "mssql"
+
+    def connect(self):
+        conn_str = (
+            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+            f"SERVER={self.config.DB_HOST};"
+            f"DATABASE={self.config.DB_NAME};"
+            f"UID={self.config.db_user};"
+            f"PWD={self.config.db_password};"
+            f"PORT={self.config.DB_PORT}"
+        )
+        return pyodbc.connect(conn_str)
+
+    def set_timeout(self, conn, seconds):
+        # ODBC query timeout: the driver aborts the statement server-side when exceeded
+        conn.timeout = math.ceil(seconds) if seconds else 0
+
+    def clear_timeout(self, conn):
+        conn.timeout = 0
+
+    def cursor(self, conn):
+        return conn.cursor()
+
+    def insert_get_id(self, cursor, query, params):
+        cursor.execute(query, params)
+        # Use SELECT SCOPE_IDENTITY() for SQL Server with pyodbc
+        cursor.execute("SELECT @@IDENTITY")
+        result = cursor.fetchone()
+        return int(result[0]) if result and result[0] is not None else None
+
+    def execute_multi(self, cursor, query, params):
+        cursor.execute(query, params)
+        result_sets = []
+        while True:
+            if cursor.description is not None:
+                columns = [column[0] for column in cursor.description]
+                result_sets.append((columns, cursor.fetchall()))
+            if not cursor.nextset():
+                return result_sets
+
+    def execute_many(self, cursor, query, rows):
+        # Sends the parameter arrays in bulk instead of one round trip per row
+        cursor.fast_executemany = True
+        cursor.executemany(query, rows)
@@ -0,0 +1,47 @@
+import itertools
+import psycopg2
+from psycopg2.extras import execute_values
+from app.backends.base import DatabaseBackend
+
+_cursor_ids = itertools.count(1)
+
+
+class PostgresBackend(DatabaseBackend):
+    """PostgreSQL through psycopg2; queries come from app/dialects.py POSTGRES_QUERIES."""
+
+    name = "postgres"
+
+    def connect(self):
+        return psycopg2.connect(
+            host=self.config.DB_HOST,
+            port=self.config.DB_PORT,
+            dbname=self.config.DB_NAME,
+            user=self.config.db_user,
+            password=self.config.db_password,
+            connect_timeout=int(self.config.DB_POOL_CHECKOUT_TIMEOUT),
+        )
+
+    def set_timeout(self, conn, seconds):
+        # SET LOCAL lasts until the transaction ends, so nothing needs resetting
+        if seconds:
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s", (int(seconds * 1000),))
+
+    def stream_cursor(self, conn, batch_size):
+        # Named cursors live on the server; fetchmany pulls one batch per round trip
+        cursor = conn.cursor(name=f"stream_{next(_cursor_ids)}")
+        cursor.itersize = batch_size
+        return cursor
+
+    def cursor(self, conn):
+        return conn.cursor()
+
+    def insert_get_id(self, cursor, query, params):
+        # Dialect INSERTs end in RETURNING <key>
+        cursor.execute(query, params)
+        result = cursor.fetchone()
+        return int(result[0]) if result and result[0] is not None else None
+
+    def execute_many(self, cursor, query, rows):
+        # query has a single VALUES %s placeholder; rows are sent as multi-row INSERTs
+        execute_values(cursor, query, rows, page_size=1000)
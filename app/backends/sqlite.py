@@ -0,0 +1,97 @@
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date, datetime
+from decimal import Decimal
+from app.backends.base import DatabaseBackend
+
+# Store dates as ISO text (the default adapters are deprecated since Python 3.12) and money as REAL
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(Decimal, float)
+
+
+class _StatementDeadline:
+    """Progress-handler deadline that the cursor restarts before every statement and fetch."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.restart()
+
+    def restart(self):
+        self.expires = time.monotonic() + self.seconds
+
+    def __call__(self):
+        return time.monotonic() > self.expires
+
+
+class _DeadlineCursor:
+    """Cursor proxy that gives each call its own timeout, as the ODBC and PostgreSQL timeouts do."""
+
+    def __init__(self, cursor, deadline):
+        self._cursor = cursor
+        self._deadline = deadline
+
+    def execute(self, query, params=()):
+        self._deadline.restart()
+        return self._cursor.execute(query, params)
+
+    def executemany(self, query, rows):
+        self._deadline.restart()
+        return self._cursor.executemany(query, rows)
+
+    def fetchall(self):
+        self._deadline.restart()
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        self._deadline.restart()
+        return self._cursor.fetchmany(size)
+
+    def fetchone(self):
+        self._deadline.restart()
+        return self._cursor.fetchone()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SqliteBackend(DatabaseBackend):
+    """
+    SQLite file database for local runs and tests without SQL Server;
+    queries come from app/dialects.py SQLITE_QUERIES.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._deadlines = {}  # connection -> _StatementDeadline while checked out with a timeout
+
+    def connect(self):
+        conn = sqlite3.connect(self.config.SQLITE_PATH, check_same_thread=False, timeout=self.config.DB_POOL_CHECKOUT_TIMEOUT)
+        # WAL lets the pooled connections read while one of them writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def set_timeout(self, conn, seconds):
+        # SQLite has no statement timeout; the progress handler interrupts the statement instead.
+        # Its deadline restarts on every cursor call, so time the caller spends between fetches does not count.
+        if seconds:
+            deadline = _StatementDeadline(seconds)
+            self._deadlines[conn] = deadline
+            conn.set_progress_handler(deadline, 10000)
+
+    def clear_timeout(self, conn):
+        self._deadlines.pop(conn, None)
+        conn.set_progress_handler(None, 0)
+
+    def cursor(self, conn):
+        deadline = self._deadlines.get(conn)
+        cursor = conn.cursor()
+        return closing(_DeadlineCursor(cursor, deadline) if deadline else cursor)
+
+    def insert_get_id(self, cursor, query, params):
+        cursor.execute(query, params)
+        return cursor.lastrowid
@@ -1,7 +1,7 @@
 import os
 from dotenv import load_dotenv
-from azure.identity import ClientSecretCredential
-from azure.keyvault.secrets import SecretClient
+from app.dialects import apply_dialect
+from app.secret_provider import SecretProvider, KeyVaultSecretBackend, StubSecretBackend
 
 load_dotenv()
 
@@ -10,45 +10,174 @@ class Settings:
     DB_HOST: str = os.getenv("DB_HOST", "")
     DB_PORT: int = int(os.getenv("DB_PORT", 1433))
     DB_NAME: str = os.getenv("DB_NAME", "")
-    
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "mssql")  # "mssql", "postgres" or "sqlite" (see app/backends/)
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "crm.sqlite3")  # database file when DB_BACKEND=sqlite
+
+    # Connection pool (see app/pool.py)
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+    DB_POOL_IDLE_TIMEOUT: float = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))  # seconds
+    DB_POOL_MAX_LIFETIME: float = float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))  # seconds
+    DB_POOL_CHECKOUT_TIMEOUT: float = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", 30))  # seconds
+    DB_POOL_VALIDATE: bool = os.getenv("DB_POOL_VALIDATE", "true").lower() in ("1", "true", "yes")
+
+    # Async data access (see app/async_db.py)
+    DB_EXECUTOR_WORKERS: int = int(os.getenv("DB_EXECUTOR_WORKERS", DB_POOL_MAX_SIZE))
+    DB_QUERY_TIMEOUT: float = float(os.getenv("DB_QUERY_TIMEOUT", 30))  # seconds, 0 disables
+    DB_STREAM_MAX_CONCURRENT: int = int(os.getenv("DB_STREAM_MAX_CONCURRENT", max(1, DB_POOL_MAX_SIZE // 2)))  # streamed responses holding a connection; the rest of the pool stays free
+
+    # Keyset pagination for list endpoints (see app/pagination.py)
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", 100))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", 1000))
+
+    # Streamed responses: POST /orders/batch/ and the exports (see app/export.py)
+    ORDERS_BATCH_MAX_IDS: int = int(os.getenv("ORDERS_BATCH_MAX_IDS", 5000))
+    STREAM_FETCH_SIZE: int = int(os.getenv("STREAM_FETCH_SIZE", 1000))  # rows per fetchmany when streaming
+    EXPORT_PARQUET_ROW_GROUP_SIZE: int = int(os.getenv("EXPORT_PARQUET_ROW_GROUP_SIZE", 65536))  # rows buffered per Parquet row group; bounds export memory
+
+    # Bulk write endpoints (customers/bulk/, tasks/bulk/)
+    BULK_MAX_ITEMS: int = int(os.getenv("BULK_MAX_ITEMS", 5000))  # per bulk write request
+
+    # In-memory lead report (see app/report_engine.py)
+    REPORT_CACHE_TTL: float = float(os.getenv("REPORT_CACHE_TTL", 300))  # seconds; safety net for writes made outside the API
+
+    # Server-side RFM tables (see app/rfm_engine.py)
+    RFM_CACHE_TTL: float = float(os.getenv("RFM_CACHE_TTL", 300))  # seconds an RFM table is reused for its reference date
+    RFM_CACHE_DATES: int = int(os.getenv("RFM_CACHE_DATES", 8))  # reference dates kept in memory
+    RFM_MAX_LOOKBACK_DAYS: int = int(os.getenv("RFM_MAX_LOOKBACK_DAYS", 3650))  # oldest reference_date accepted, in days before today
+
+    # Response cache with ETags for GET endpoints (see app/http_cache.py)
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 2048))
+    RESPONSE_CACHE_TTL_CUSTOMERS: float = float(os.getenv("RESPONSE_CACHE_TTL_CUSTOMERS", 60))  # seconds
+    RESPONSE_CACHE_TTL_ORDERS: float = float(os.getenv("RESPONSE_CACHE_TTL_ORDERS", 300))  # seconds; orders are not written through this API
+    RESPONSE_CACHE_TTL_TASKS: float = float(os.getenv("RESPONSE_CACHE_TTL_TASKS", 60))  # seconds
+
+    # JSON encoding of list responses (see app/serialization.py)
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")  # Encode list rows directly instead of through the response models
+
+    # Request and query metrics (see app/metrics.py)
+    SLOW_QUERY_LOG_MS: float = float(os.getenv("SLOW_QUERY_LOG_MS", 0))  # Log queries slower than this; 0 disables the slow-query log
+
+    # Change events for the agent's --events mode (see app/events.py)
+    EVENTS_POLL_INTERVAL: float = float(os.getenv("EVENTS_POLL_INTERVAL", 2))  # seconds between checks for new orders, once the feed has a reader
+    EVENTS_BUFFER_SIZE: int = int(os.getenv("EVENTS_BUFFER_SIZE", 10000))  # events kept for readers that fall behind
+    EVENTS_MAX_WAIT: float = float(os.getenv("EVENTS_MAX_WAIT", 30))  # seconds, longest long-poll
+
+    # Startup warm-up (see app/startup.py): secrets, DB_POOL_MIN_SIZE connections, read queries and the lead report
+    STARTUP_WARMUP: bool = os.getenv("STARTUP_WARMUP", "true").lower() in ("1", "true", "yes")  # python -m app.main --no-warmup turns it off
+
+    # Readiness checks (see app/readiness.py); probes only read their cached results
+    HEALTH_CHECK_INTERVAL: float = float(os.getenv("HEALTH_CHECK_INTERVAL", 10))  # seconds between background checks
+    HEALTH_CHECK_TIMEOUT: float = float(os.getenv("HEALTH_CHECK_TIMEOUT", 5))  # seconds, database check query timeout
+    HEALTH_CHECK_STALE_AFTER: float = float(os.getenv("HEALTH_CHECK_STALE_AFTER", 3 * HEALTH_CHECK_INTERVAL))  # seconds; older results count as not ready
+
+    # Secret store: "keyvault" (default) or "stub" for offline runs (see app/secret_provider.py)
+    SECRET_BACKEND: str = os.getenv("SECRET_BACKEND", "keyvault")
+    SECRET_TTL: float = float(os.getenv("SECRET_TTL", 900))  # seconds
+    SECRET_REFRESH_AHEAD: float = float(os.getenv("SECRET_REFRESH_AHEAD", 120))  # seconds
+
     @property
     def db_user(self) -> str:
-        credential = ClientSecretCredential(
-            tenant_id=os.getenv("AZURE_TENANT_ID", ""),
-            client_id=os.getenv("AZURE_CLIENT_ID", ""),
-            client_secret=os.getenv("AZURE_CLIENT_SECRET", "")
-        )
-        secret_client = SecretClient(vault_url=self.KEY_VAULT_URL, credential=credential)
-        return secret_client.get_secret("sqluseradmin").value
+        return secret_provider.get("sqluseradmin")
 
     @property
     def db_password(self) -> str:
-        credential = ClientSecretCredential(
-            tenant_id=os.getenv("AZURE_TENANT_ID", ""),
-            client_id=os.getenv("AZURE_CLIENT_ID", ""),
-            client_secret=os.getenv("AZURE_CLIENT_SECRET", "")
-        )
-        secret_client = SecretClient(vault_url=self.KEY_VAULT_URL, credential=credential)
-        return secret_client.get_secret("sqlpassword").value
+        return secret_provider.get("sqlpassword")
     
     # customers.py queries
-    GET_ALL_CUSTOMERS = "SELECT c.[CustomerID], p.[FirstName], p.[LastName], ea.[EmailAddress], ISNULL(c.[LeadStatus],'') AS LeadStatus FROM [Person].[Person] p INNER JOIN [Sales].[Customer] c ON c.[PersonID] = p.[BusinessEntityID] LEFT OUTER JOIN [Person].[EmailAddress] ea ON ea.[BusinessEntityID] = p.[BusinessEntityID] WHERE c.StoreID IS NULL AND c.[CustomerID] IN (12632, 13581, 14429, 15691, 27842, 22435, 27748, 21113)"
+    # Keyset pages: TOP (?) takes limit + 1 and CustomerID > ? takes the cursor; {filters} is filled from the FILTER_* fragments
+    GET_CUSTOMERS_PAGE = "SELECT TOP (?) c.[CustomerID], p.[FirstName], p.[LastName], ea.[EmailAddress], ISNULL(c.[LeadStatus],'') AS LeadStatus FROM [Person].[Person] p INNER JOIN [Sales].[Customer] c ON c.[PersonID] = p.[BusinessEntityID] LEFT OUTER JOIN [Person].[EmailAddress] ea ON ea.[BusinessEntityID] = p.[BusinessEntityID] WHERE c.StoreID IS NULL AND c.[CustomerID] > ?{filters} ORDER BY c.[CustomerID]"
+    FILTER_CUSTOMERS_LEAD_STATUS = " AND ISNULL(c.[LeadStatus],'') = ?"
     GET_CUSTOMER_BY_ID = "SELECT c.[CustomerID], p.[FirstName], p.[LastName], ea.[EmailAddress], ISNULL(c.[LeadStatus],'') AS LeadStatus FROM [Person].[Person] p INNER JOIN [Sales].[Customer] c ON c.[PersonID] = p.[BusinessEntityID] LEFT OUTER JOIN [Person].[EmailAddress] ea ON ea.[BusinessEntityID] = p.[BusinessEntityID] WHERE c.[CustomerID] = ?"
     UPDATE_LeadStatus = "UPDATE Sales.Customer SET LeadStatus = ? WHERE CustomerID = ?"
+    # Takes a JSON array of {CustomerID, LeadStatus}; one UPDATE for the whole list
+    BULK_UPDATE_LeadStatus = "UPDATE c SET c.[LeadStatus] = j.[LeadStatus] OUTPUT INSERTED.[CustomerID] FROM [Sales].[Customer] c INNER JOIN OPENJSON(?) WITH ([CustomerID] INT '$.CustomerID', [LeadStatus] VARCHAR(MAX) '$.LeadStatus') j ON j.[CustomerID] = c.[CustomerID]"
+    # Customers with orders added (SalesOrderID above the watermark) or modified since a point in time
+    GET_CHANGED_CUSTOMERS_PAGE = "SELECT TOP (?) CustomerID, MAX(SalesOrderID) AS LastSalesOrderID, MAX(ModifiedDate) AS LastModifiedDate FROM Sales.SalesOrderHeader WHERE CustomerID > ?{filters} GROUP BY CustomerID ORDER BY CustomerID"
+    FILTER_CHANGED_SINCE_ORDER = " AND SalesOrderID > ?"
+    FILTER_CHANGED_SINCE_ORDER_OR_MODIFIED = " AND (SalesOrderID > ? OR ModifiedDate > ?)"
+    FILTER_CHANGED_UNTIL_ORDER = " AND SalesOrderID <= ?"
 
     # orders.py queries
-    GET_ALL_ORDERS = "SELECT SalesOrderID, CustomerID, OrderDate, TotalDue FROM Sales.SalesOrderHeader WHERE CustomerID IN (12632, 13581, 14429, 15691, 27842, 22435, 27748, 21113)"
+    GET_ORDERS_PAGE = "SELECT TOP (?) SalesOrderID, CustomerID, OrderDate, TotalDue FROM Sales.SalesOrderHeader WHERE SalesOrderID > ?{filters} ORDER BY SalesOrderID"
+    FILTER_ORDERS_DATE_FROM = " AND OrderDate >= ?"
+    FILTER_ORDERS_DATE_TO = " AND OrderDate <= ?"
+    GET_ORDERS_WATERMARK = "SELECT ISNULL(MAX(SalesOrderID), 0) AS LastSalesOrderID, MAX(ModifiedDate) AS LastModifiedDate FROM Sales.SalesOrderHeader"
     GET_ORDERS_BY_CUSTOMERID = "SELECT SalesOrderID, CustomerID, OrderDate, TotalDue FROM Sales.SalesOrderHeader WHERE CustomerID = ?"
+    # Takes a JSON array of CustomerIDs; ordered so rows can be grouped while streaming
+    GET_ORDERS_FOR_CUSTOMERS = "SELECT SalesOrderID, CustomerID, OrderDate, TotalDue FROM Sales.SalesOrderHeader WHERE CustomerID IN (SELECT CAST([value] AS INT) FROM OPENJSON(?)) ORDER BY CustomerID, SalesOrderID"
 
     # tasks.py queries
-    GET_ALL_TASKS = "SELECT TaskID, CustomerID, TaskDescription, AssignedTo, DueDate FROM Sales.LeadTasks"
+    GET_TASKS_PAGE = "SELECT TOP (?) TaskID, CustomerID, TaskDescription, AssignedTo, DueDate FROM Sales.LeadTasks WHERE TaskID > ?{filters} ORDER BY TaskID"
+    FILTER_TASKS_ASSIGNED_TO = " AND CAST(AssignedTo AS VARCHAR(8000)) = ?"  # AssignedTo is a TEXT column
+    FILTER_TASKS_DUE_FROM = " AND DueDate >= ?"
+    FILTER_TASKS_DUE_TO = " AND DueDate <= ?"
     GET_TASK_BY_ID = "SELECT TaskID, CustomerID, TaskDescription, AssignedTo, DueDate FROM Sales.LeadTasks WHERE TaskID = ?"
     CREATE_TASK = "INSERT INTO Sales.LeadTasks (CustomerID, TaskDescription, AssignedTo, DueDate) VALUES (?, ?, ?, ?)"
+    # Takes a JSON array of tasks; MERGE ... ON 1 = 0 inserts every row and lets OUTPUT return the array index next to the new TaskID
+    BULK_CREATE_TASKS = "MERGE Sales.LeadTasks AS t USING (SELECT CAST(a.[key] AS INT) AS ItemIndex, j.CustomerID, j.TaskDescription, j.AssignedTo, j.DueDate FROM OPENJSON(?) a CROSS APPLY OPENJSON(a.[value]) WITH (CustomerID INT, TaskDescription VARCHAR(MAX), AssignedTo VARCHAR(8000), DueDate DATE) j) AS s ON 1 = 0 WHEN NOT MATCHED THEN INSERT (CustomerID, TaskDescription, AssignedTo, DueDate) VALUES (s.CustomerID, s.TaskDescription, s.AssignedTo, s.DueDate) OUTPUT s.ItemIndex, INSERTED.TaskID;"
     UPDATE_TASK = "UPDATE Sales.LeadTasks SET CustomerID = ?, TaskDescription = ?, AssignedTo = ?, DueDate = ? WHERE TaskID = ?"
     DELETE_TASK = "DELETE FROM Sales.LeadTasks WHERE TaskID = ?"
 
+    # rfm.py
+    # Recency/Frequency/Monetary of every customer as of a reference date: takes the reference date, then the day after it
+    GET_RFM = "SELECT CustomerID, DATEDIFF(day, MAX(OrderDate), ?) AS Recency, COUNT(*) AS Frequency, SUM(TotalDue) AS Monetary FROM Sales.SalesOrderHeader WHERE OrderDate < ? GROUP BY CustomerID ORDER BY CustomerID"
+
+    # exports.py
+    # Streamed bulk exports: {columns} is filled from the client's pick of the EXPORT_*_COLUMNS expressions,
+    # the key > ? resumes after a key (0 for everything) and {filters} takes the list endpoints' FILTER_* fragments
+    EXPORT_ORDERS = "SELECT {columns} FROM Sales.SalesOrderHeader WHERE SalesOrderID > ?{filters} ORDER BY SalesOrderID"
+    EXPORT_ORDERS_COLUMNS = {"SalesOrderID": "SalesOrderID", "CustomerID": "CustomerID", "OrderDate": "OrderDate", "TotalDue": "TotalDue", "ModifiedDate": "ModifiedDate"}
+    EXPORT_CUSTOMERS = "SELECT {columns} FROM [Person].[Person] p INNER JOIN [Sales].[Customer] c ON c.[PersonID] = p.[BusinessEntityID] LEFT OUTER JOIN [Person].[EmailAddress] ea ON ea.[BusinessEntityID] = p.[BusinessEntityID] WHERE c.StoreID IS NULL AND c.[CustomerID] > ?{filters} ORDER BY c.[CustomerID]"
+    EXPORT_CUSTOMERS_COLUMNS = {"CustomerID": "c.[CustomerID]", "FirstName": "p.[FirstName]", "LastName": "p.[LastName]", "EmailAddress": "ea.[EmailAddress]", "LeadStatus": "ISNULL(c.[LeadStatus],'') AS LeadStatus"}
+    EXPORT_TASKS = "SELECT {columns} FROM Sales.LeadTasks WHERE TaskID > ?{filters} ORDER BY TaskID"
+    EXPORT_TASKS_COLUMNS = {"TaskID": "TaskID", "CustomerID": "CustomerID", "TaskDescription": "TaskDescription", "AssignedTo": "AssignedTo", "DueDate": "DueDate"}
+
+    # agent_runs.py
+    # Sharded agent passes: a run splits the customers into CustomerID ranges (chunks) in Sales.AgentLeases
+    # and each worker leases one chunk at a time. Expiry uses the database clock (UTC), so workers on
+    # different hosts agree on it.
+    GET_CUSTOMER_IDS = "SELECT CustomerID FROM Sales.Customer WHERE StoreID IS NULL ORDER BY CustomerID"
+    GET_CUSTOMER_IDS_RANGE = "SELECT CustomerID FROM Sales.Customer WHERE StoreID IS NULL AND CustomerID > ? AND CustomerID <= ? ORDER BY CustomerID"
+    # Takes the RunID and a JSON array of {ChunkID, FirstCustomerID, LastCustomerID}
+    CREATE_AGENT_RUN = "INSERT INTO Sales.AgentLeases (RunID, ChunkID, FirstCustomerID, LastCustomerID, Status, Attempts) SELECT ?, j.ChunkID, j.FirstCustomerID, j.LastCustomerID, 'pending', 0 FROM OPENJSON(?) WITH (ChunkID INT, FirstCustomerID INT, LastCustomerID INT) j"
+    GET_AGENT_RUN = "SELECT RunID, ChunkID, FirstCustomerID, LastCustomerID, CheckpointCustomerID, Owner, LeaseExpires, CASE WHEN Status = 'leased' AND LeaseExpires < SYSUTCDATETIME() THEN 'expired' ELSE Status END AS Status, Attempts FROM Sales.AgentLeases WHERE RunID = ? ORDER BY ChunkID"
+    # Takes the worker, the lease length in seconds and the RunID; pending and expired chunks can be claimed.
+    # READPAST skips rows another claim has locked, so concurrent workers never wait on each other.
+    CLAIM_AGENT_LEASE = "UPDATE TOP (1) Sales.AgentLeases WITH (UPDLOCK, READPAST, ROWLOCK) SET Owner = ?, LeaseExpires = DATEADD(second, ?, SYSUTCDATETIME()), Status = 'leased', Attempts = Attempts + 1 OUTPUT INSERTED.RunID, INSERTED.ChunkID, INSERTED.FirstCustomerID, INSERTED.LastCustomerID, INSERTED.CheckpointCustomerID, INSERTED.Owner, INSERTED.LeaseExpires, INSERTED.Status, INSERTED.Attempts WHERE RunID = ? AND (Status = 'pending' OR (Status = 'leased' AND LeaseExpires < SYSUTCDATETIME()))"
+    # Heartbeat, checkpoint and completion: takes the checkpoint (NULL keeps it), lease seconds, new Status ('leased' or 'done'),
+    # RunID, ChunkID and worker. No row is updated once another worker has taken the chunk over.
+    RENEW_AGENT_LEASE = "UPDATE Sales.AgentLeases SET CheckpointCustomerID = COALESCE(?, CheckpointCustomerID), LeaseExpires = DATEADD(second, ?, SYSUTCDATETIME()), Status = ? WHERE RunID = ? AND ChunkID = ? AND Owner = ? AND Status = 'leased'"
+
     # reports.py
-    LEAD_QUERY = "SELECT COUNT(*) FROM Sales.Customer WHERE LeadStatus = 'High Priority'"
-    TASK_QUERY = "SELECT COUNT(*) FROM Sales.LeadTasks"
+    # Three result sets in one round trip: customers per LeadStatus, tasks per AssignedTo, tasks per due-date bucket
+    # Bucket boundaries must match app/report_engine.py due_bucket()
+    LEAD_REPORT_QUERY = (
+        "SELECT ISNULL(LeadStatus, '') AS LeadStatus, COUNT(*) AS Total FROM Sales.Customer GROUP BY ISNULL(LeadStatus, ''); "
+        "SELECT CAST(AssignedTo AS VARCHAR(8000)) AS AssignedTo, COUNT(*) AS Total FROM Sales.LeadTasks GROUP BY CAST(AssignedTo AS VARCHAR(8000)); "
+        "SELECT Bucket, COUNT(*) AS Total FROM (SELECT CASE "
+        "WHEN DueDate < CAST(GETDATE() AS DATE) THEN 'overdue' "
+        "WHEN DueDate = CAST(GETDATE() AS DATE) THEN 'today' "
+        "WHEN DueDate <= DATEADD(day, 7, CAST(GETDATE() AS DATE)) THEN 'next_7_days' "
+        "WHEN DueDate <= DATEADD(day, 30, CAST(GETDATE() AS DATE)) THEN 'next_30_days' "
+        "ELSE 'later' END AS Bucket FROM Sales.LeadTasks) b GROUP BY Bucket"
+    )
+
+# Swap in the PostgreSQL / SQLite versions of the queries above when DB_BACKEND selects them
+apply_dialect(Settings, Settings.DB_BACKEND)
 
 settings = Settings()
+
+def build_secret_provider(config: Settings) -> SecretProvider:
+    if config.SECRET_BACKEND == "stub":
+        backend = StubSecretBackend()
+    else:
+        backend = KeyVaultSecretBackend(
+            vault_url=config.KEY_VAULT_URL,
+            tenant_id=os.getenv("AZURE_TENANT_ID", ""),
+            client_id=os.getenv("AZURE_CLIENT_ID", ""),
+            client_secret=os.getenv("AZURE_CLIENT_SECRET", "")
+        )
+    return SecretProvider(backend, ttl=config.SECRET_TTL, refresh_ahead=config.SECRET_REFRESH_AHEAD)
+
+secret_provider = build_secret_provider(settings)
\ No newline at end of file
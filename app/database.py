@@ -1,28 +1,107 @@
-import pyodbc
+import time
 from contextlib import contextmanager
+from app.backends import create_backend
 from app.config import settings
+from app.metrics import QueryTimer, query_label
+from app.pool import ConnectionPool
+
+# Driver for Settings.DB_BACKEND: SQL Server (default), PostgreSQL or SQLite
+backend = create_backend(settings)
+
+# Shared by every execute_* helper; connections are opened lazily on first use
+pool = ConnectionPool(
+    backend.connect,
+    min_size=settings.DB_POOL_MIN_SIZE,
+    max_size=settings.DB_POOL_MAX_SIZE,
+    idle_timeout=settings.DB_POOL_IDLE_TIMEOUT,
+    max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+    checkout_timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+    validate_on_checkout=settings.DB_POOL_VALIDATE,
+    validation_query=backend.validation_query,
+)
+
+@contextmanager
+def get_db_connection(timeout=None, timer=None):
+    """
+    Borrow a pooled connection. Commits on success; on error the pool
+    rolls back and only drops the connection if it is unusable.
+
+    timeout sets the query timeout (seconds) for statements run on this
+    checkout, so they are aborted when exceeded (see backend.set_timeout).
+    timer, if given, records the checkout as the query's connect phase.
+    """
+    started = time.perf_counter()
+    with pool.connection() as conn:
+        if timer:
+            timer.record("connect", time.perf_counter() - started)
+        backend.set_timeout(conn, timeout)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            backend.clear_timeout(conn)
+
+class _TimedCursor:
+    """Cursor proxy that times execute and fetch calls and counts fetched rows."""
+
+    def __init__(self, cursor, timer):
+        self._cursor = cursor
+        self._timer = timer
+
+    def execute(self, query, params=()):
+        with self._timer.phase("execute"):
+            self._cursor.execute(query, params)
+        return self
+
+    def fetchall(self):
+        with self._timer.phase("fetch"):
+            rows = self._cursor.fetchall()
+        self._timer.rows += len(rows)
+        return rows
+
+    def fetchmany(self, size):
+        with self._timer.phase("fetch"):
+            rows = self._cursor.fetchmany(size)
+        self._timer.rows += len(rows)
+        return rows
+
+    def fetchone(self):
+        with self._timer.phase("fetch"):
+            row = self._cursor.fetchone()
+        self._timer.rows += row is not None
+        return row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
 
 @contextmanager
-def get_db_connection():
-    conn_str = (
-        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-        f"SERVER={settings.DB_HOST};"
-        f"DATABASE={settings.DB_NAME};"
-        f"UID={settings.db_user};"
-        f"PWD={settings.db_password};"
-        f"PORT={settings.DB_PORT}"
-    )
-    conn = pyodbc.connect(conn_str)
+def _query_cursor(query, timeout=None, stream_batch_size=None):
+    """
+    Connection and cursor for one statement, with connect/execute/fetch
+    times and row counts recorded under the query's Settings name.
+    stream_batch_size asks the backend for a streaming (server-side) cursor.
+    """
+    timer = QueryTimer(query_label(query))
+    failed = False
     try:
-        yield conn
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
+        with get_db_connection(timeout, timer) as conn:
+            if stream_batch_size:
+                cursor_cm = backend.stream_cursor(conn, stream_batch_size)
+            else:
+                cursor_cm = backend.cursor(conn)
+            with cursor_cm as cursor:
+                yield conn, _TimedCursor(cursor, timer)
+    except Exception:
+        failed = True
+        raise
     finally:
-        conn.close()
+        timer.finish(failed)
+
+def get_pool_stats():
+    """Checkout/wait counters and open/idle/in-use sizes of the shared pool."""
+    return pool.stats()
 
-def execute_query(query, params=None, as_dict=True):
+def execute_query(query, params=None, as_dict=True, timeout=None):
     """
     Execute a SELECT query and return results.
     
@@ -30,54 +109,119 @@ def execute_query(query, params=None, as_dict=True):
         query: SQL query string
         params: Query parameters
         as_dict: If True, return results as list of dictionaries
+        timeout: Optional query timeout in seconds
     
     Returns:
-        List of dictionaries (if as_dict=True) or list of pyodbc.Row objects
-    """
-    with get_db_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute(query, params or ())
-            
-            if as_dict:
-                # Get column names
+        List of dictionaries (if as_dict=True) or list of driver row tuples
+    """
+    with _query_cursor(query, timeout) as (conn, cursor):
+        cursor.execute(query, params or ())
+        
+        if as_dict:
+            # Get column names
+            columns = [column[0] for column in cursor.description]
+            # Convert rows to dictionaries
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        else:
+            return cursor.fetchall()
+
+def execute_query_columns(query, params=None, timeout=None):
+    """
+    Execute a SELECT query and return (column names, raw rows), for
+    callers that map columns once instead of building a dict per row.
+    """
+    with _query_cursor(query, timeout) as (conn, cursor):
+        cursor.execute(query, params or ())
+        columns = [column[0] for column in cursor.description]
+        return columns, cursor.fetchall()
+
+def iter_batches(query, params=None, batch_size=1000, timeout=None):
+    """
+    Execute a SELECT query and yield (columns, rows) for every batch_size
+    rows fetched, rows as tuples. The connection stays checked out until
+    the generator is exhausted or closed.
+    """
+    with _query_cursor(query, timeout, stream_batch_size=batch_size) as (conn, cursor):
+        cursor.execute(query, params or ())
+        columns = None
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if columns is None:
+                # Server-side cursors only describe their columns after the first fetch
                 columns = [column[0] for column in cursor.description]
-                # Convert rows to dictionaries
-                return [dict(zip(columns, row)) for row in cursor.fetchall()]
-            else:
-                return cursor.fetchall()
+            yield columns, rows
+
+def iter_query(query, params=None, batch_size=1000, timeout=None):
+    """
+    Execute a SELECT query and yield rows as dictionaries, fetching
+    batch_size rows at a time (see iter_batches).
+    """
+    batches = iter_batches(query, params, batch_size, timeout)
+    try:
+        for columns, rows in batches:
+            for row in rows:
+                yield dict(zip(columns, row))
+    finally:
+        batches.close()
 
-def execute_command(query, params=None):
+def execute_command(query, params=None, timeout=None):
     """
     Execute an INSERT, UPDATE, or DELETE command.
     Returns the number of affected rows.
     """
-    with get_db_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute(query, params or ())
-            affected_rows = cursor.rowcount
-            conn.commit()
-            return affected_rows
+    with _query_cursor(query, timeout) as (conn, cursor):
+        cursor.execute(query, params or ())
+        affected_rows = cursor.rowcount
+        conn.commit()
+        return affected_rows
 
-def execute_scalar(query, params=None):
+def execute_multi_query(query, params=None, timeout=None):
+    """
+    Execute a batch of SELECT statements in one round trip.
+    Returns one list of dictionaries per result set, in order.
+    """
+    with _query_cursor(query, timeout) as (conn, cursor):
+        result_sets = backend.execute_multi(cursor, query, params or ())
+        return [[dict(zip(columns, row)) for row in rows] for columns, rows in result_sets]
+
+def execute_returning(query, params=None, timeout=None):
+    """
+    Execute a write statement with an OUTPUT (or RETURNING) clause in one transaction
+    and return the output rows as dictionaries.
+    """
+    with _query_cursor(query, timeout) as (conn, cursor):
+        cursor.execute(query, params or ())
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        conn.commit()
+        return rows
+
+def execute_scalar(query, params=None, timeout=None):
     """
     Execute a query that returns a single value.
     """
-    with get_db_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute(query, params or ())
-            result = cursor.fetchone()
-            return result[0] if result else None
+    with _query_cursor(query, timeout) as (conn, cursor):
+        cursor.execute(query, params or ())
+        result = cursor.fetchone()
+        return result[0] if result else None
         
-def execute_insert_get_id(query, params=None):
+def execute_insert_get_id(query, params=None, timeout=None):
     """
     Execute an INSERT command and return the ID of the newly created record.
     """
-    with get_db_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute(query, params or ())
-            # Use SELECT SCOPE_IDENTITY() for SQL Server with pyodbc
-            cursor.execute("SELECT @@IDENTITY")
-            result = cursor.fetchone()
-            last_id = int(result[0]) if result and result[0] is not None else None
-            conn.commit()
-            return last_id
\ No newline at end of file
+    with _query_cursor(query, timeout) as (conn, cursor):
+        last_id = backend.insert_get_id(cursor, query, params or ())
+        conn.commit()
+        return last_id
+
+def execute_many(query, rows, timeout=None):
+    """
+    Execute an INSERT for many parameter rows with the backend's bulk path
+    (fast_executemany on SQL Server, execute_values on PostgreSQL).
+    On PostgreSQL the query takes a single VALUES %s placeholder.
+    """
+    with _query_cursor(query, timeout) as (conn, cursor):
+        backend.execute_many(cursor, query, rows)
+        conn.commit()
\ No newline at end of file
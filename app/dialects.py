@@ -0,0 +1,222 @@
+# Per-backend versions of the named queries in Settings, which are written in T-SQL for SQL Server.
+# apply_dialect() swaps them in at import time, so routes keep using Settings.<NAME> whatever DB_BACKEND is.
+#
+# Contracts every version keeps:
+# - Keyset pages take (limit + 1, cursor key, *filter values) in that order; the limit is bound
+#   first through a one-row CTE because LIMIT comes last in these dialects.
+# - Bulk statements take one JSON array parameter.
+# - Column names match the API models' field names.
+
+_PG_CUSTOMER = (
+    "SELECT c.customerid AS \"CustomerID\", p.firstname AS \"FirstName\", p.lastname AS \"LastName\", "
+    "ea.emailaddress AS \"EmailAddress\", COALESCE(c.leadstatus, '') AS \"LeadStatus\" "
+    "FROM person.person p INNER JOIN sales.customer c ON c.personid = p.businessentityid "
+    "LEFT OUTER JOIN person.emailaddress ea ON ea.businessentityid = p.businessentityid"
+)
+_PG_ORDER = "SELECT salesorderid AS \"SalesOrderID\", customerid AS \"CustomerID\", orderdate AS \"OrderDate\", totaldue AS \"TotalDue\" FROM sales.salesorderheader"
+_PG_TASK = "SELECT taskid AS \"TaskID\", customerid AS \"CustomerID\", taskdescription AS \"TaskDescription\", assignedto AS \"AssignedTo\", duedate AS \"DueDate\" FROM sales.leadtasks"
+_PG_PAGE = "WITH page (n) AS (SELECT %s::int) "
+_PG_LEASE_COLUMNS = (
+    "runid AS \"RunID\", chunkid AS \"ChunkID\", firstcustomerid AS \"FirstCustomerID\", lastcustomerid AS \"LastCustomerID\", "
+    "checkpointcustomerid AS \"CheckpointCustomerID\", owner AS \"Owner\", leaseexpires AS \"LeaseExpires\", status AS \"Status\", attempts AS \"Attempts\""
+)
+
+POSTGRES_QUERIES = {
+    "GET_CUSTOMERS_PAGE": _PG_PAGE + _PG_CUSTOMER + " WHERE c.storeid IS NULL AND c.customerid > %s{filters} ORDER BY c.customerid LIMIT (SELECT n FROM page)",
+    "FILTER_CUSTOMERS_LEAD_STATUS": " AND COALESCE(c.leadstatus, '') = %s",
+    "GET_CUSTOMER_BY_ID": _PG_CUSTOMER + " WHERE c.customerid = %s",
+    "UPDATE_LeadStatus": "UPDATE sales.customer SET leadstatus = %s WHERE customerid = %s",
+    "BULK_UPDATE_LeadStatus": "UPDATE sales.customer c SET leadstatus = j.\"LeadStatus\" FROM json_to_recordset(%s::json) AS j (\"CustomerID\" int, \"LeadStatus\" text) WHERE c.customerid = j.\"CustomerID\" RETURNING c.customerid AS \"CustomerID\"",
+    "GET_CHANGED_CUSTOMERS_PAGE": _PG_PAGE + "SELECT customerid AS \"CustomerID\", MAX(salesorderid) AS \"LastSalesOrderID\", MAX(modifieddate) AS \"LastModifiedDate\" FROM sales.salesorderheader WHERE customerid > %s{filters} GROUP BY customerid ORDER BY customerid LIMIT (SELECT n FROM page)",
+    "FILTER_CHANGED_SINCE_ORDER": " AND salesorderid > %s",
+    "FILTER_CHANGED_SINCE_ORDER_OR_MODIFIED": " AND (salesorderid > %s OR modifieddate > %s)",
+    "FILTER_CHANGED_UNTIL_ORDER": " AND salesorderid <= %s",
+
+    "GET_ORDERS_PAGE": _PG_PAGE + _PG_ORDER + " WHERE salesorderid > %s{filters} ORDER BY salesorderid LIMIT (SELECT n FROM page)",
+    "FILTER_ORDERS_DATE_FROM": " AND orderdate >= %s",
+    "FILTER_ORDERS_DATE_TO": " AND orderdate <= %s",
+    "GET_ORDERS_WATERMARK": "SELECT COALESCE(MAX(salesorderid), 0) AS \"LastSalesOrderID\", MAX(modifieddate) AS \"LastModifiedDate\" FROM sales.salesorderheader",
+    "GET_ORDERS_BY_CUSTOMERID": _PG_ORDER + " WHERE customerid = %s",
+    "GET_ORDERS_FOR_CUSTOMERS": _PG_ORDER + " WHERE customerid IN (SELECT value::int FROM json_array_elements_text(%s::json)) ORDER BY customerid, salesorderid",
+
+    "GET_TASKS_PAGE": _PG_PAGE + _PG_TASK + " WHERE taskid > %s{filters} ORDER BY taskid LIMIT (SELECT n FROM page)",
+    "FILTER_TASKS_ASSIGNED_TO": " AND assignedto = %s",
+    "FILTER_TASKS_DUE_FROM": " AND duedate >= %s",
+    "FILTER_TASKS_DUE_TO": " AND duedate <= %s",
+    "GET_TASK_BY_ID": _PG_TASK + " WHERE taskid = %s",
+    "CREATE_TASK": "INSERT INTO sales.leadtasks (customerid, taskdescription, assignedto, duedate) VALUES (%s, %s, %s, %s) RETURNING taskid",
+    # Rows are inserted in array order, so ascending TaskIDs follow the request order (see tasks.bulk_create_tasks)
+    "BULK_CREATE_TASKS": "INSERT INTO sales.leadtasks (customerid, taskdescription, assignedto, duedate) SELECT (e.value->>'CustomerID')::int, e.value->>'TaskDescription', e.value->>'AssignedTo', (e.value->>'DueDate')::date FROM json_array_elements(%s::json) WITH ORDINALITY AS e (value, ord) ORDER BY e.ord RETURNING taskid AS \"TaskID\"",
+    "UPDATE_TASK": "UPDATE sales.leadtasks SET customerid = %s, taskdescription = %s, assignedto = %s, duedate = %s WHERE taskid = %s",
+    "DELETE_TASK": "DELETE FROM sales.leadtasks WHERE taskid = %s",
+
+    "EXPORT_ORDERS": "SELECT {columns} FROM sales.salesorderheader WHERE salesorderid > %s{filters} ORDER BY salesorderid",
+    "EXPORT_ORDERS_COLUMNS": {
+        "SalesOrderID": "salesorderid AS \"SalesOrderID\"", "CustomerID": "customerid AS \"CustomerID\"", "OrderDate": "orderdate AS \"OrderDate\"",
+        "TotalDue": "totaldue AS \"TotalDue\"", "ModifiedDate": "modifieddate AS \"ModifiedDate\"",
+    },
+    "EXPORT_CUSTOMERS": "SELECT {columns} FROM person.person p INNER JOIN sales.customer c ON c.personid = p.businessentityid LEFT OUTER JOIN person.emailaddress ea ON ea.businessentityid = p.businessentityid WHERE c.storeid IS NULL AND c.customerid > %s{filters} ORDER BY c.customerid",
+    "EXPORT_CUSTOMERS_COLUMNS": {
+        "CustomerID": "c.customerid AS \"CustomerID\"", "FirstName": "p.firstname AS \"FirstName\"", "LastName": "p.lastname AS \"LastName\"",
+        "EmailAddress": "ea.emailaddress AS \"EmailAddress\"", "LeadStatus": "COALESCE(c.leadstatus, '') AS \"LeadStatus\"",
+    },
+    "EXPORT_TASKS": "SELECT {columns} FROM sales.leadtasks WHERE taskid > %s{filters} ORDER BY taskid",
+    "EXPORT_TASKS_COLUMNS": {
+        "TaskID": "taskid AS \"TaskID\"", "CustomerID": "customerid AS \"CustomerID\"", "TaskDescription": "taskdescription AS \"TaskDescription\"",
+        "AssignedTo": "assignedto AS \"AssignedTo\"", "DueDate": "duedate AS \"DueDate\"",
+    },
+
+    "GET_CUSTOMER_IDS": "SELECT customerid AS \"CustomerID\" FROM sales.customer WHERE storeid IS NULL ORDER BY customerid",
+    "GET_CUSTOMER_IDS_RANGE": "SELECT customerid AS \"CustomerID\" FROM sales.customer WHERE storeid IS NULL AND customerid > %s AND customerid <= %s ORDER BY customerid",
+    "CREATE_AGENT_RUN": "INSERT INTO sales.agentleases (runid, chunkid, firstcustomerid, lastcustomerid, status, attempts) SELECT %s, j.\"ChunkID\", j.\"FirstCustomerID\", j.\"LastCustomerID\", 'pending', 0 FROM json_to_recordset(%s::json) AS j (\"ChunkID\" int, \"FirstCustomerID\" int, \"LastCustomerID\" int)",
+    "GET_AGENT_RUN": "SELECT " + _PG_LEASE_COLUMNS.replace("status AS", "CASE WHEN status = 'leased' AND leaseexpires < timezone('utc', now()) THEN 'expired' ELSE status END AS") + " FROM sales.agentleases WHERE runid = %s ORDER BY chunkid",
+    # SKIP LOCKED is the READPAST of the T-SQL version
+    "CLAIM_AGENT_LEASE": "UPDATE sales.agentleases SET owner = %s, leaseexpires = timezone('utc', now()) + make_interval(secs => %s), status = 'leased', attempts = attempts + 1 WHERE (runid, chunkid) = (SELECT runid, chunkid FROM sales.agentleases WHERE runid = %s AND (status = 'pending' OR (status = 'leased' AND leaseexpires < timezone('utc', now()))) ORDER BY chunkid LIMIT 1 FOR UPDATE SKIP LOCKED) RETURNING " + _PG_LEASE_COLUMNS,
+    "RENEW_AGENT_LEASE": "UPDATE sales.agentleases SET checkpointcustomerid = COALESCE(%s, checkpointcustomerid), leaseexpires = timezone('utc', now()) + make_interval(secs => %s), status = %s WHERE runid = %s AND chunkid = %s AND owner = %s AND status = 'leased'",
+
+    "GET_RFM": "SELECT customerid AS \"CustomerID\", %s::date - MAX(orderdate)::date AS \"Recency\", COUNT(*) AS \"Frequency\", SUM(totaldue) AS \"Monetary\" FROM sales.salesorderheader WHERE orderdate < %s GROUP BY customerid ORDER BY customerid",
+
+    "LEAD_REPORT_QUERY": (
+        "SELECT COALESCE(leadstatus, '') AS \"LeadStatus\", COUNT(*) AS \"Total\" FROM sales.customer GROUP BY COALESCE(leadstatus, ''); "
+        "SELECT assignedto AS \"AssignedTo\", COUNT(*) AS \"Total\" FROM sales.leadtasks GROUP BY assignedto; "
+        "SELECT \"Bucket\", COUNT(*) AS \"Total\" FROM (SELECT CASE "
+        "WHEN duedate < CURRENT_DATE THEN 'overdue' "
+        "WHEN duedate = CURRENT_DATE THEN 'today' "
+        "WHEN duedate <= CURRENT_DATE + 7 THEN 'next_7_days' "
+        "WHEN duedate <= CURRENT_DATE + 30 THEN 'next_30_days' "
+        "ELSE 'later' END AS \"Bucket\" FROM sales.leadtasks) b GROUP BY \"Bucket\""
+    ),
+}
+
+_SQLITE_CUSTOMER = (
+    "SELECT c.CustomerID, p.FirstName, p.LastName, ea.EmailAddress, IFNULL(c.LeadStatus, '') AS LeadStatus "
+    "FROM Person p INNER JOIN Customer c ON c.PersonID = p.BusinessEntityID "
+    "LEFT OUTER JOIN EmailAddress ea ON ea.BusinessEntityID = p.BusinessEntityID"
+)
+# OrderDate is stored as 'YYYY-MM-DD HH:MM:SS' text; date() trims it to what the Order model expects
+_SQLITE_ORDER = "SELECT SalesOrderID, CustomerID, date(OrderDate) AS OrderDate, TotalDue FROM SalesOrderHeader"
+_SQLITE_TASK = "SELECT TaskID, CustomerID, TaskDescription, AssignedTo, DueDate FROM LeadTasks"
+_SQLITE_PAGE = "WITH page (n) AS (SELECT ?) "
+_SQLITE_LEASE_COLUMNS = "RunID, ChunkID, FirstCustomerID, LastCustomerID, CheckpointCustomerID, Owner, LeaseExpires, Status, Attempts"
+
+SQLITE_QUERIES = {
+    "GET_CUSTOMERS_PAGE": _SQLITE_PAGE + _SQLITE_CUSTOMER + " WHERE c.StoreID IS NULL AND c.CustomerID > ?{filters} ORDER BY c.CustomerID LIMIT (SELECT n FROM page)",
+    "FILTER_CUSTOMERS_LEAD_STATUS": " AND IFNULL(c.LeadStatus, '') = ?",
+    "GET_CUSTOMER_BY_ID": _SQLITE_CUSTOMER + " WHERE c.CustomerID = ?",
+    "UPDATE_LeadStatus": "UPDATE Customer SET LeadStatus = ? WHERE CustomerID = ?",
+    "BULK_UPDATE_LeadStatus": "UPDATE Customer SET LeadStatus = j.LeadStatus FROM (SELECT json_extract(value, '$.CustomerID') AS CustomerID, json_extract(value, '$.LeadStatus') AS LeadStatus FROM json_each(?)) AS j WHERE Customer.CustomerID = j.CustomerID RETURNING CustomerID",
+    "GET_CHANGED_CUSTOMERS_PAGE": _SQLITE_PAGE + "SELECT CustomerID, MAX(SalesOrderID) AS LastSalesOrderID, MAX(ModifiedDate) AS LastModifiedDate FROM SalesOrderHeader WHERE CustomerID > ?{filters} GROUP BY CustomerID ORDER BY CustomerID LIMIT (SELECT n FROM page)",
+    "FILTER_CHANGED_SINCE_ORDER": " AND SalesOrderID > ?",
+    "FILTER_CHANGED_SINCE_ORDER_OR_MODIFIED": " AND (SalesOrderID > ? OR ModifiedDate > ?)",
+    "FILTER_CHANGED_UNTIL_ORDER": " AND SalesOrderID <= ?",
+
+    "GET_ORDERS_PAGE": _SQLITE_PAGE + _SQLITE_ORDER + " WHERE SalesOrderID > ?{filters} ORDER BY SalesOrderID LIMIT (SELECT n FROM page)",
+    "FILTER_ORDERS_DATE_FROM": " AND OrderDate >= ?",
+    "FILTER_ORDERS_DATE_TO": " AND date(OrderDate) <= ?",
+    "GET_ORDERS_WATERMARK": "SELECT IFNULL(MAX(SalesOrderID), 0) AS LastSalesOrderID, MAX(ModifiedDate) AS LastModifiedDate FROM SalesOrderHeader",
+    "GET_ORDERS_BY_CUSTOMERID": _SQLITE_ORDER + " WHERE CustomerID = ?",
+    "GET_ORDERS_FOR_CUSTOMERS": _SQLITE_ORDER + " WHERE CustomerID IN (SELECT value FROM json_each(?)) ORDER BY CustomerID, SalesOrderID",
+
+    "GET_TASKS_PAGE": _SQLITE_PAGE + _SQLITE_TASK + " WHERE TaskID > ?{filters} ORDER BY TaskID LIMIT (SELECT n FROM page)",
+    "FILTER_TASKS_ASSIGNED_TO": " AND AssignedTo = ?",
+    "FILTER_TASKS_DUE_FROM": " AND DueDate >= ?",
+    "FILTER_TASKS_DUE_TO": " AND DueDate <= ?",
+    "GET_TASK_BY_ID": _SQLITE_TASK + " WHERE TaskID = ?",
+    "CREATE_TASK": "INSERT INTO LeadTasks (CustomerID, TaskDescription, AssignedTo, DueDate) VALUES (?, ?, ?, ?)",
+    # Rows are inserted in array order, so ascending TaskIDs follow the request order (see tasks.bulk_create_tasks)
+    "BULK_CREATE_TASKS": "INSERT INTO LeadTasks (CustomerID, TaskDescription, AssignedTo, DueDate) SELECT json_extract(value, '$.CustomerID'), json_extract(value, '$.TaskDescription'), json_extract(value, '$.AssignedTo'), json_extract(value, '$.DueDate') FROM json_each(?) ORDER BY key RETURNING TaskID",
+    "UPDATE_TASK": "UPDATE LeadTasks SET CustomerID = ?, TaskDescription = ?, AssignedTo = ?, DueDate = ? WHERE TaskID = ?",
+    "DELETE_TASK": "DELETE FROM LeadTasks WHERE TaskID = ?",
+
+    "EXPORT_ORDERS": "SELECT {columns} FROM SalesOrderHeader WHERE SalesOrderID > ?{filters} ORDER BY SalesOrderID",
+    "EXPORT_CUSTOMERS": "SELECT {columns} FROM Person p INNER JOIN Customer c ON c.PersonID = p.BusinessEntityID LEFT OUTER JOIN EmailAddress ea ON ea.BusinessEntityID = p.BusinessEntityID WHERE c.StoreID IS NULL AND c.CustomerID > ?{filters} ORDER BY c.CustomerID",
+    "EXPORT_CUSTOMERS_COLUMNS": {
+        "CustomerID": "c.CustomerID", "FirstName": "p.FirstName", "LastName": "p.LastName",
+        "EmailAddress": "ea.EmailAddress", "LeadStatus": "IFNULL(c.LeadStatus, '') AS LeadStatus",
+    },
+    "EXPORT_TASKS": "SELECT {columns} FROM LeadTasks WHERE TaskID > ?{filters} ORDER BY TaskID",
+
+    "GET_CUSTOMER_IDS": "SELECT CustomerID FROM Customer WHERE StoreID IS NULL ORDER BY CustomerID",
+    "GET_CUSTOMER_IDS_RANGE": "SELECT CustomerID FROM Customer WHERE StoreID IS NULL AND CustomerID > ? AND CustomerID <= ? ORDER BY CustomerID",
+    "CREATE_AGENT_RUN": "INSERT INTO AgentLeases (RunID, ChunkID, FirstCustomerID, LastCustomerID, Status, Attempts) SELECT ?, json_extract(value, '$.ChunkID'), json_extract(value, '$.FirstCustomerID'), json_extract(value, '$.LastCustomerID'), 'pending', 0 FROM json_each(?)",
+    "GET_AGENT_RUN": "SELECT " + _SQLITE_LEASE_COLUMNS.replace("Status,", "CASE WHEN Status = 'leased' AND LeaseExpires < datetime('now') THEN 'expired' ELSE Status END AS Status,") + " FROM AgentLeases WHERE RunID = ? ORDER BY ChunkID",
+    # SQLite runs one writer at a time, so the UPDATE alone makes the claim atomic; datetime('now') is UTC
+    "CLAIM_AGENT_LEASE": "UPDATE AgentLeases SET Owner = ?, LeaseExpires = datetime('now', '+' || ? || ' seconds'), Status = 'leased', Attempts = Attempts + 1 WHERE (RunID, ChunkID) = (SELECT RunID, ChunkID FROM AgentLeases WHERE RunID = ? AND (Status = 'pending' OR (Status = 'leased' AND LeaseExpires < datetime('now'))) ORDER BY ChunkID LIMIT 1) RETURNING " + _SQLITE_LEASE_COLUMNS,
+    "RENEW_AGENT_LEASE": "UPDATE AgentLeases SET CheckpointCustomerID = COALESCE(?, CheckpointCustomerID), LeaseExpires = datetime('now', '+' || ? || ' seconds'), Status = ? WHERE RunID = ? AND ChunkID = ? AND Owner = ? AND Status = 'leased'",
+
+    "GET_RFM": "SELECT CustomerID, CAST(julianday(?) - julianday(date(MAX(OrderDate))) AS INTEGER) AS Recency, COUNT(*) AS Frequency, SUM(TotalDue) AS Monetary FROM SalesOrderHeader WHERE OrderDate < ? GROUP BY CustomerID ORDER BY CustomerID",
+
+    "LEAD_REPORT_QUERY": (
+        "SELECT IFNULL(LeadStatus, '') AS LeadStatus, COUNT(*) AS Total FROM Customer GROUP BY IFNULL(LeadStatus, ''); "
+        "SELECT AssignedTo, COUNT(*) AS Total FROM LeadTasks GROUP BY AssignedTo; "
+        "SELECT Bucket, COUNT(*) AS Total FROM (SELECT CASE "
+        "WHEN DueDate < date('now', 'localtime') THEN 'overdue' "
+        "WHEN DueDate = date('now', 'localtime') THEN 'today' "
+        "WHEN DueDate <= date('now', 'localtime', '+7 days') THEN 'next_7_days' "
+        "WHEN DueDate <= date('now', 'localtime', '+30 days') THEN 'next_30_days' "
+        "ELSE 'later' END AS Bucket FROM LeadTasks) b GROUP BY Bucket"
+    ),
+}
+
+# Tables and columns the queries above use, for stand-in databases (benchmarks/seed.py and local runs).
+# The SQL Server shape follows AdventureWorks plus the lab's LeadTasks and AgentLeases tables from README.md.
+SCHEMAS = {
+    "mssql": [
+        "CREATE SCHEMA Person",
+        "CREATE SCHEMA Sales",
+        "CREATE TABLE Person.Person (BusinessEntityID INT NOT NULL PRIMARY KEY, FirstName NVARCHAR(50) NOT NULL, LastName NVARCHAR(50) NOT NULL)",
+        "CREATE TABLE Person.EmailAddress (BusinessEntityID INT NOT NULL PRIMARY KEY, EmailAddress NVARCHAR(50) NULL)",
+        "CREATE TABLE Sales.Customer (CustomerID INT NOT NULL PRIMARY KEY, PersonID INT NULL, StoreID INT NULL, LeadStatus VARCHAR(MAX) NULL)",
+        "CREATE TABLE Sales.SalesOrderHeader (SalesOrderID INT IDENTITY(1,1) NOT NULL PRIMARY KEY, CustomerID INT NOT NULL, OrderDate DATETIME NOT NULL, TotalDue MONEY NOT NULL, ModifiedDate DATETIME NOT NULL)",
+        "CREATE INDEX IX_SalesOrderHeader_CustomerID ON Sales.SalesOrderHeader (CustomerID)",
+        "CREATE TABLE Sales.LeadTasks (TaskID INT IDENTITY(1,1) NOT NULL PRIMARY KEY, CustomerID INT REFERENCES Sales.Customer(CustomerID) NOT NULL, TaskDescription TEXT NOT NULL, AssignedTo TEXT NOT NULL, DueDate DATE NOT NULL)",
+        "CREATE TABLE Sales.AgentLeases (RunID VARCHAR(64) NOT NULL, ChunkID INT NOT NULL, FirstCustomerID INT NOT NULL, LastCustomerID INT NOT NULL, CheckpointCustomerID INT NULL, Owner VARCHAR(128) NULL, LeaseExpires DATETIME2 NULL, Status VARCHAR(16) NOT NULL, Attempts INT NOT NULL, PRIMARY KEY (RunID, ChunkID))",
+    ],
+    "postgres": [
+        "CREATE SCHEMA person",
+        "CREATE SCHEMA sales",
+        "CREATE TABLE person.person (businessentityid INT PRIMARY KEY, firstname VARCHAR(50) NOT NULL, lastname VARCHAR(50) NOT NULL)",
+        "CREATE TABLE person.emailaddress (businessentityid INT PRIMARY KEY, emailaddress VARCHAR(50))",
+        "CREATE TABLE sales.customer (customerid INT PRIMARY KEY, personid INT, storeid INT, leadstatus TEXT)",
+        "CREATE TABLE sales.salesorderheader (salesorderid SERIAL PRIMARY KEY, customerid INT NOT NULL, orderdate TIMESTAMP NOT NULL, totaldue NUMERIC(19, 4) NOT NULL, modifieddate TIMESTAMP NOT NULL)",
+        "CREATE INDEX ix_salesorderheader_customerid ON sales.salesorderheader (customerid)",
+        "CREATE TABLE sales.leadtasks (taskid SERIAL PRIMARY KEY, customerid INT NOT NULL REFERENCES sales.customer (customerid), taskdescription TEXT NOT NULL, assignedto TEXT NOT NULL, duedate DATE NOT NULL)",
+        "CREATE TABLE sales.agentleases (runid VARCHAR(64) NOT NULL, chunkid INT NOT NULL, firstcustomerid INT NOT NULL, lastcustomerid INT NOT NULL, checkpointcustomerid INT, owner VARCHAR(128), leaseexpires TIMESTAMP, status VARCHAR(16) NOT NULL, attempts INT NOT NULL, PRIMARY KEY (runid, chunkid))",
+    ],
+    "sqlite": [
+        "CREATE TABLE Person (BusinessEntityID INTEGER PRIMARY KEY, FirstName TEXT NOT NULL, LastName TEXT NOT NULL)",
+        "CREATE TABLE EmailAddress (BusinessEntityID INTEGER PRIMARY KEY, EmailAddress TEXT)",
+        "CREATE TABLE Customer (CustomerID INTEGER PRIMARY KEY, PersonID INTEGER, StoreID INTEGER, LeadStatus TEXT)",
+        "CREATE TABLE SalesOrderHeader (SalesOrderID INTEGER PRIMARY KEY AUTOINCREMENT, CustomerID INTEGER NOT NULL, OrderDate TEXT NOT NULL, TotalDue REAL NOT NULL, ModifiedDate TEXT NOT NULL)",
+        "CREATE INDEX IX_SalesOrderHeader_CustomerID ON SalesOrderHeader (CustomerID)",
+        "CREATE TABLE LeadTasks (TaskID INTEGER PRIMARY KEY AUTOINCREMENT, CustomerID INTEGER NOT NULL REFERENCES Customer (CustomerID), TaskDescription TEXT NOT NULL, AssignedTo TEXT NOT NULL, DueDate TEXT NOT NULL)",
+        "CREATE TABLE AgentLeases (RunID TEXT NOT NULL, ChunkID INTEGER NOT NULL, FirstCustomerID INTEGER NOT NULL, LastCustomerID INTEGER NOT NULL, CheckpointCustomerID INTEGER, Owner TEXT, LeaseExpires TEXT, Status TEXT NOT NULL, Attempts INTEGER NOT NULL, PRIMARY KEY (RunID, ChunkID))",
+    ],
+}
+
+# Tables loaded by benchmarks/seed.py: (SQL Server name, PostgreSQL name, SQLite name, columns)
+_INSERT_COLUMNS = {
+    "person": ("Person.Person", "person.person", "Person", "BusinessEntityID, FirstName, LastName"),
+    "email": ("Person.EmailAddress", "person.emailaddress", "EmailAddress", "BusinessEntityID, EmailAddress"),
+    "customer": ("Sales.Customer", "sales.customer", "Customer", "CustomerID, PersonID, StoreID, LeadStatus"),
+    "order": ("Sales.SalesOrderHeader", "sales.salesorderheader", "SalesOrderHeader", "CustomerID, OrderDate, TotalDue, ModifiedDate"),
+    "task": ("Sales.LeadTasks", "sales.leadtasks", "LeadTasks", "CustomerID, TaskDescription, AssignedTo, DueDate"),
+}
+
+
+def insert_statement(backend, table):
+    """INSERT for loading rows into one of the stand-in tables with execute_many()."""
+    mssql_table, postgres_table, sqlite_table, columns = _INSERT_COLUMNS[table]
+    if backend == "postgres":
+        return f"INSERT INTO {postgres_table} ({columns.lower()}) VALUES %s"
+    placeholders = ", ".join("?" for _ in columns.split(","))
+    return f"INSERT INTO {mssql_table if backend == 'mssql' else sqlite_table} ({columns}) VALUES ({placeholders})"
+
+
+def apply_dialect(settings_class, backend):
+    """Replace the T-SQL queries on Settings with the given backend's versions."""
+    overrides = {"postgres": POSTGRES_QUERIES, "sqlite": SQLITE_QUERIES}.get(backend, {})
+    for name, query in overrides.items():
+        if not hasattr(settings_class, name):
+            raise AttributeError(f"Dialect query {name} has no counterpart in Settings")
+        setattr(settings_class, name, query)
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from datetime import datetime
+from app.async_db import execute_query, execute_scalar
+from app.config import Settings
+
+logger = logging.getLogger("app.events")
+
+
+class EventLog:
+    """
+    Bounded in-memory feed of change events, numbered 1, 2, 3, ... in publish order.
+
+    Readers long-poll with the last sequence number they have seen. The log keeps the
+    newest max_events events; a reader that falls further behind (or whose feed_id is
+    from before a restart) is told there is a gap and should re-sync from the database.
+    Every API process has its own log, so consumers read from one process.
+    """
+
+    def __init__(self, max_events):
+        self.feed_id = uuid.uuid4().hex[:12]
+        self._events = deque(maxlen=max_events)
+        self._seq = 0
+        self._published = asyncio.Event()
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, event_type, **fields):
+        self._seq += 1
+        self._events.append(dict(fields, seq=self._seq, type=event_type, published_at=datetime.now().isoformat(timespec="seconds")))
+        # Wake every waiting reader, then start a new round
+        self._published.set()
+        self._published = asyncio.Event()
+
+    def read(self, after, limit):
+        """(events after `after`, gap) from what is still buffered."""
+        first_seq = self._seq - len(self._events) + 1
+        gap = after < first_seq - 1 or after > self._seq
+        start = max(after - first_seq + 1, 0)
+        return [self._events[i] for i in range(start, min(start + limit, len(self._events)))], gap
+
+    async def wait(self, after, limit, timeout):
+        """Like read(), but waits up to timeout seconds for an event when none is available yet."""
+        if after == self._seq and timeout > 0:
+            try:
+                await asyncio.wait_for(self._published.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.read(after, limit)
+
+
+class OrderChangeDetector:
+    """
+    Publishes an "order" event for every new row in Sales.SalesOrderHeader.
+
+    Orders are written outside this API, so new ones are found by polling for SalesOrderIDs
+    above the last one seen; that is a range scan on the primary key, a few rows per poll.
+    Modified orders are not detected (ModifiedDate has no index); consumers keep a
+    low-frequency sweep for them. Polling starts with the first reader (ensure_started),
+    from the newest order at that time.
+    """
+
+    def __init__(self, log, interval, batch_size):
+        self.log = log
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_order_id = None
+        self.last_error = None
+        self._task = None
+
+    def ensure_started(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def poll(self):
+        """Publish the orders added since the last poll; returns how many."""
+        if self.last_order_id is None:
+            self.last_order_id = await execute_scalar(Settings.GET_ORDERS_WATERMARK) or 0
+            return 0
+        query = Settings.GET_ORDERS_PAGE.format(filters="")
+        published = 0
+        while True:
+            rows = await execute_query(query, (self.batch_size, self.last_order_id))
+            for row in rows:
+                self.log.publish(
+                    "order",
+                    CustomerID=row["CustomerID"],
+                    SalesOrderID=row["SalesOrderID"],
+                    OrderDate=str(row["OrderDate"])[:10],
+                    TotalDue=float(row["TotalDue"]),
+                )
+                self.last_order_id = row["SalesOrderID"]
+            published += len(rows)
+            if len(rows) < self.batch_size:
+                return published
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.poll()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.warning("Order change poll failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+
+event_log = EventLog(Settings.EVENTS_BUFFER_SIZE)
+order_detector = OrderChangeDetector(event_log, interval=Settings.EVENTS_POLL_INTERVAL, batch_size=Settings.PAGE_SIZE_MAX)
@@ -0,0 +1,229 @@
+import csv
+import io
+import zlib
+from datetime import date, datetime
+from fastapi import HTTPException
+from app.config import Settings
+from app.database import iter_batches
+
+# Columns of each export in their default order, with the type values are normalized to.
+# The first column is the key that after= resumes from.
+# The backends return dates as datetime, date or text, and money as Decimal or float.
+ORDER_COLUMNS = {"SalesOrderID": "int", "CustomerID": "int", "OrderDate": "timestamp", "TotalDue": "float", "ModifiedDate": "timestamp"}
+CUSTOMER_COLUMNS = {"CustomerID": "int", "FirstName": "str", "LastName": "str", "EmailAddress": "str", "LeadStatus": "str"}
+TASK_COLUMNS = {"TaskID": "int", "CustomerID": "int", "TaskDescription": "str", "AssignedTo": "str", "DueDate": "date"}
+
+# format -> (media type, file extension, allowed compressions; the first is the default)
+FORMATS = {
+    "csv": ("text/csv", "csv", ("none", "gzip")),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows", ("none", "lz4", "zstd")),
+    "parquet": ("application/vnd.apache.parquet", "parquet", ("snappy", "zstd", "gzip", "none")),
+}
+
+
+def load_pyarrow():
+    """pyarrow is optional; without it only CSV exports are available."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def resolve_format(export_format, compression):
+    """
+    (format, compression) after defaults and validation. Without a format, Arrow is used
+    when pyarrow is installed and CSV otherwise.
+    """
+    if export_format is None:
+        export_format = "arrow" if load_pyarrow() else "csv"
+    if export_format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    if export_format != "csv" and load_pyarrow() is None:
+        raise HTTPException(status_code=501, detail=f"{export_format} exports need pyarrow; use format=csv")
+    allowed = FORMATS[export_format][2]
+    compression = compression or allowed[0]
+    if compression not in allowed:
+        raise HTTPException(status_code=400, detail=f"compression for {export_format} must be one of {', '.join(allowed)}")
+    return export_format, compression
+
+
+def select_columns(column_types, requested):
+    """
+    Column names from a comma-separated projection, in the order given; all columns when empty.
+    The key column is always included (first, unless requested elsewhere) so an interrupted
+    export can be resumed with after=.
+    """
+    if not requested:
+        return list(column_types)
+    columns = [name.strip() for name in requested.split(",") if name.strip()]
+    unknown = [name for name in columns if name not in column_types]
+    if unknown or not columns:
+        raise HTTPException(status_code=400, detail=f"Unknown columns {unknown}; available: {', '.join(column_types)}")
+    key = next(iter(column_types))
+    if key not in columns:
+        columns.insert(0, key)
+    return list(dict.fromkeys(columns))
+
+
+def build_export_query(template, expressions, columns, after, filters):
+    """
+    Fill an EXPORT_* template from Settings.
+
+    Args:
+        template: Query with {columns}, a key > ? placeholder and {filters}
+        expressions: The matching EXPORT_*_COLUMNS mapping of column name to SQL expression
+        columns: Column names to select
+        after: Key to resume after, 0 for everything
+        filters: List of (sql_fragment, value) pairs as for build_page_query
+
+    Returns:
+        (query, params) for iter_batches
+    """
+    fragments = []
+    params = [after]
+    for fragment, value in filters:
+        if value is not None:
+            fragments.append(fragment)
+            params.extend(value if isinstance(value, tuple) else (value,))
+    select_list = ", ".join(expressions[name] for name in columns)
+    return template.format(columns=select_list, filters="".join(fragments)), tuple(params)
+
+
+def _to_date(value):
+    if value is None or type(value) is date:
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def _to_timestamp(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(str(value))
+
+
+_NORMALIZERS = {
+    "int": lambda value: value if value is None else int(value),
+    "float": lambda value: value if value is None else float(value),
+    "str": lambda value: value if value is None or isinstance(value, str) else str(value),
+    "date": _to_date,
+    "timestamp": _to_timestamp,
+}
+
+
+def _column_batches(query, params, types):
+    """Each fetchmany batch as one list of normalized values per column."""
+    normalizers = [_NORMALIZERS[kind] for kind in types]
+    for _, rows in iter_batches(query, params, batch_size=Settings.STREAM_FETCH_SIZE, timeout=Settings.DB_QUERY_TIMEOUT or None):
+        yield [[normalize(row[i]) for row in rows] for i, normalize in enumerate(normalizers)]
+
+
+class _ChunkSink:
+    """Write-only file object whose contents are taken out after every batch."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _csv_chunks(batches, columns, compression):
+    compressor = zlib.compressobj(wbits=31) if compression == "gzip" else None  # wbits=31 writes a gzip header
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for values in batches:
+        writer.writerows(zip(*values))
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        yield compressor.compress(data) if compressor else data
+    data = buffer.getvalue().encode("utf-8")
+    yield compressor.compress(data) + compressor.flush() if compressor else data
+
+
+def _arrow_schema(pa, columns, types):
+    arrow_types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "date": pa.date32(), "timestamp": pa.timestamp("ms")}
+    return pa.schema([(name, arrow_types[kind]) for name, kind in zip(columns, types)])
+
+
+def _arrow_chunks(batches, columns, types, compression):
+    """Arrow IPC stream: one record batch per fetchmany batch."""
+    pa = load_pyarrow()
+    schema = _arrow_schema(pa, columns, types)
+    sink = _ChunkSink()
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    with pa.ipc.new_stream(sink, schema, options=options) as writer:
+        for values in batches:
+            writer.write_batch(pa.record_batch(values, schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+
+def _parquet_chunks(batches, columns, types, compression):
+    """Parquet file: rows are buffered up to one row group, which bounds memory; the footer comes last."""
+    pa = load_pyarrow()
+    schema = _arrow_schema(pa, columns, types)
+    sink = _ChunkSink()
+    pending, pending_rows = [], 0
+    with pa.parquet.ParquetWriter(sink, schema, compression=compression) as writer:
+        for values in batches:
+            pending.append(pa.record_batch(values, schema=schema))
+            pending_rows += len(values[0])
+            if pending_rows >= Settings.EXPORT_PARQUET_ROW_GROUP_SIZE:
+                writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=pending_rows)
+                pending, pending_rows = [], 0
+                yield sink.take()
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=pending_rows)
+    yield sink.take()
+
+
+def stream_export(query, params, columns, column_types, export_format, compression):
+    """
+    Encoded export as a generator of byte chunks. Rows are read STREAM_FETCH_SIZE at a
+    time, so memory stays bounded by one batch (one row group for Parquet). Blocking;
+    routes drive it through stream_in_db_executor.
+    """
+    types = [column_types[name] for name in columns]
+    batches = _column_batches(query, params, types)
+    if export_format == "csv":
+        chunks = _csv_chunks(batches, columns, compression)
+    elif export_format == "arrow":
+        chunks = _arrow_chunks(batches, columns, types, compression)
+    else:
+        chunks = _parquet_chunks(batches, columns, types, compression)
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+
+
+def export_filename(name, export_format, compression):
+    extension = FORMATS[export_format][1]
+    return f"{name}.{extension}.gz" if export_format == "csv" and compression == "gzip" else f"{name}.{extension}"
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.config import Settings
+
+
+class CacheEntry:
+    def __init__(self, body, etag, ttl, tags):
+        self.body = body
+        self.etag = etag
+        self.ttl = ttl
+        self.expires_at = time.monotonic() + ttl
+        self.tags = tags
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of serialized JSON responses.
+
+    Entries carry tags (e.g. "customers", "customer:42") so write handlers
+    can drop exactly the responses their change affects. Every invalidation
+    bumps the generation of its tags, so a response computed before a write
+    is not stored after it (see generations/put).
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}  # tag -> number of invalidations
+        self._cleared = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def generations(self, tags):
+        """Snapshot to pass to put, taken before the response is computed."""
+        return (self._cleared, tuple(self._generations.get(tag, 0) for tag in tags))
+
+    def put(self, key, body, ttl, tags, generations=None):
+        """Store an entry; returns it uncached when one of its tags was invalidated since the snapshot."""
+        entry = CacheEntry(body, _etag(body), ttl, frozenset(tags))
+        if generations is not None and generations != self.generations(tags):
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of the given tags."""
+        tags = set(tags)
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        for key in [key for key, entry in self._entries.items() if entry.tags & tags]:
+            del self._entries[key]
+
+    def clear(self):
+        self._cleared += 1
+        self._entries.clear()
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache(Settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def _etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in [value[2:] if value.startswith("W/") else value for value in candidates]
+
+
+async def cached_json(request: Request, ttl, tags, produce):
+    """
+    Serve a GET endpoint from the response cache.
+
+    Args:
+        request: Incoming request; path and sorted query string form the cache key
+        ttl: Seconds the entry stays valid
+        tags: Invalidation tags for the entry
+        produce: Coroutine function returning response model instance(s) or encoded JSON bytes
+
+    Returns a 304 when If-None-Match matches the entry's ETag, otherwise the JSON body.
+    Exceptions from produce (e.g. a 404) propagate and are not cached, and neither is a
+    result whose tags were invalidated by a write while produce was running.
+    """
+    key = request.url.path + "?" + "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    entry = response_cache.get(key)
+    if entry is None:
+        generations = response_cache.generations(tags)
+        data = await produce()
+        # Routes on the fast serialization path hand over encoded JSON already
+        body = data if isinstance(data, bytes) else json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+        entry = response_cache.put(key, body, ttl, tags, generations)
+
+    # Clients may keep the body but must revalidate every reuse, so a write shows up at once; the 304 keeps that cheap
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -1,14 +1,48 @@
-from fastapi import FastAPI
-from app.routes import customers, orders, tasks, reports, health
+import time
+_import_started = time.perf_counter()
 
-app = FastAPI(title="Smart CRM Hub API")
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.async_db import DatabaseTimeoutError
+from app.pool import PoolTimeoutError
+from app.metrics import metrics_middleware
+from app.routes import customers, orders, tasks, reports, rfm, exports, agent_runs, events, health, metrics
+from app.startup import lifespan, startup_stats
+
+app = FastAPI(title="Smart CRM Hub API", lifespan=lifespan)
+app.middleware("http")(metrics_middleware)
 
 app.include_router(customers.router, prefix="/api", tags=["customers"])
 app.include_router(orders.router, prefix="/api", tags=["orders"])
 app.include_router(tasks.router, prefix="/api", tags=["tasks"])
 app.include_router(reports.router, prefix="/api", tags=["reports"])
+app.include_router(rfm.router, prefix="/api", tags=["rfm"])
+app.include_router(exports.router, prefix="/api", tags=["exports"])
+app.include_router(agent_runs.router, prefix="/api", tags=["agent"])
+app.include_router(events.router, prefix="/api", tags=["events"])
 app.include_router(health.router, prefix="/api", tags=["health"])
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])
+
+@app.exception_handler(DatabaseTimeoutError)
+async def database_timeout_handler(request: Request, exc: DatabaseTimeoutError):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+# Time to import the app and everything it pulls in (Azure SDKs excluded, they load on first use)
+startup_stats["import_seconds"] = round(time.perf_counter() - _import_started, 3)
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    from app.config import settings
+    parser = argparse.ArgumentParser(description="Smart CRM Hub API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the startup warm-up, for fast local iteration")
+    args = parser.parse_args()
+    if args.no_warmup:
+        settings.STARTUP_WARMUP = False
+    uvicorn.run(app, host=args.host, port=args.port)
\ No newline at end of file
@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from app.config import Settings
+
+logger = logging.getLogger("app.metrics")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(names, labels + (bound,))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + ('+Inf',))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+db_phase_latency = Histogram("db_query_phase_seconds", "Time spent per query phase (connect, execute, fetch).", ("query", "phase"))
+db_query_latency = Histogram("db_query_duration_seconds", "Total time per query, checkout included.", ("query",))
+db_rows = Counter("db_query_rows_total", "Rows fetched per query.", ("query",))
+db_errors = Counter("db_query_errors_total", "Queries that raised.", ("query",))
+
+REGISTRY = [http_requests, http_latency, http_in_flight, db_phase_latency, db_query_latency, db_rows, db_errors]
+
+
+# Query labels
+
+_labels = None
+_templates = None
+_label_cache = {}
+
+
+def _template_parts(template):
+    """(text before {columns} or {filters}, text between {columns} and {filters})"""
+    head = template.split("{filters}")[0]
+    if "{columns}" in head:
+        prefix, middle = head.split("{columns}", 1)
+        return prefix, middle
+    return head, ""
+
+
+def query_label(query):
+    """
+    Name of the Settings attribute a query string came from, e.g. "GET_CUSTOMER_BY_ID".
+    Page templates match on the text before their {filters} placeholder, export
+    templates on the text around their {columns} placeholder.
+    """
+    global _labels, _templates
+    label = _label_cache.get(query)
+    if label is not None:
+        return label
+    if _labels is None:
+        constants = {name: value for name, value in vars(Settings).items() if isinstance(value, str) and not name.startswith("_")}
+        _labels = {value: name for name, value in constants.items()}
+        # Longest match first so a template never shadows a more specific one
+        _templates = sorted(
+            (_template_parts(value) + (name,) for name, value in constants.items() if "{filters}" in value),
+            key=lambda item: -len(item[0]) - len(item[1]),
+        )
+    label = _labels.get(query)
+    if label is None:
+        label = next((name for prefix, middle, name in _templates if query.startswith(prefix) and middle in query), "other")
+    # Bounded: one entry per query constant and filter combination
+    if len(_label_cache) < 1024:
+        _label_cache[query] = label
+    return label
+
+
+class QueryTimer:
+    """Accumulates per-phase times for one query and records them when it finishes."""
+
+    def __init__(self, label):
+        self.label = label
+        self.started = time.perf_counter()
+        self.rows = 0
+
+    def record(self, phase, seconds):
+        db_phase_latency.observe((self.label, phase), seconds)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def finish(self, failed=False):
+        elapsed = time.perf_counter() - self.started
+        db_query_latency.observe((self.label,), elapsed)
+        db_rows.inc((self.label,), self.rows)
+        if failed:
+            db_errors.inc((self.label,))
+        if Settings.SLOW_QUERY_LOG_MS and elapsed * 1000 >= Settings.SLOW_QUERY_LOG_MS:
+            logger.warning("Slow query %s: %.1f ms, %d rows", self.label, elapsed * 1000, self.rows)
+
+
+def render(snapshot=None):
+    """
+    Prometheus text exposition of every registered metric, plus values read
+    at scrape time, given as {name: (type, documentation, value)}.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for name, (kind, documentation, value) in (snapshot or {}).items():
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {value}"])
+    return "\n".join(lines) + "\n"
+
+
+async def metrics_middleware(request, call_next):
+    """Records latency, status code and in-flight count per route template."""
+    started = time.perf_counter()
+    http_in_flight.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        http_in_flight.dec()
+        # Route templates (e.g. /api/customers/{customer_id}/) keep label cardinality bounded
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        http_requests.inc((request.method, path, str(status)))
+        http_latency.observe((request.method, path), time.perf_counter() - started)
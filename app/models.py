@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from datetime import date
+from pydantic import BaseModel, Field
+from datetime import date, datetime
 from typing import Optional
 from pydantic import BaseModel
 from typing import Union
@@ -23,6 +23,16 @@ class Order(BaseModel):
     class Config:
         orm_mode = True
 
+class OrderWatermark(BaseModel):
+    LastSalesOrderID: int
+    LastModifiedDate: Optional[datetime] = None
+
+class ChangedCustomer(OrderWatermark):
+    CustomerID: int
+
+class OrderBatchRequest(BaseModel):
+    customer_ids: list[int]
+
 class TaskCreate(BaseModel):
     CustomerID: int
     TaskDescription: str
@@ -35,9 +45,111 @@ class Task(TaskCreate):
     class Config:
         orm_mode = True
 
+class LeadStatusUpdate(BaseModel):
+    CustomerID: int
+    LeadStatus: str
+
+class BulkLeadStatusRequest(BaseModel):
+    updates: list[LeadStatusUpdate]
+
+class BulkLeadStatusResult(BaseModel):
+    CustomerID: int
+    status: str  # "updated" or "not_found"
+
+class BulkTaskRequest(BaseModel):
+    tasks: list[TaskCreate]
+
+class CustomerPage(BaseModel):
+    items: list[Customer]
+    next: Optional[str] = None
+
+class OrderPage(BaseModel):
+    items: list[Order]
+    next: Optional[str] = None
+
+class ChangedCustomerPage(BaseModel):
+    items: list[ChangedCustomer]
+    next: Optional[str] = None
+
+class TaskPage(BaseModel):
+    items: list[Task]
+    next: Optional[str] = None
+
 class Report(BaseModel):
     leads: int
     tasks: int
+    customers_by_lead_status: dict[str, int] = {}
+    tasks_by_assignee: dict[str, int] = {}
+    tasks_by_due_date: dict[str, int] = {}
+    generated_at: Optional[datetime] = None
 
 class ErrorResponse(BaseModel):
-    error: str
\ No newline at end of file
+    error: str
+
+class RfmCustomer(BaseModel):
+    CustomerID: int
+    Recency: int  # days since the last order
+    Frequency: int
+    Monetary: float
+    RScore: int  # quintile scores, 5 = best
+    FScore: int
+    MScore: int
+    Segment: str
+
+class RfmPage(BaseModel):
+    items: list[RfmCustomer]
+    next: Optional[str] = None
+
+class RfmSegmentStats(BaseModel):
+    customers: int
+    avg_recency: float
+    avg_frequency: float
+    avg_monetary: float
+    total_monetary: float
+
+class RfmSegmentReport(BaseModel):
+    reference_date: date
+    customers: int
+    segments: dict[str, RfmSegmentStats]
+    generated_at: datetime
+
+class AgentRunCreate(BaseModel):
+    run_id: str
+    chunk_size: int = Field(1000, gt=0)  # customers per leased chunk
+
+class AgentLease(BaseModel):
+    RunID: str
+    ChunkID: int
+    FirstCustomerID: int
+    LastCustomerID: int
+    CheckpointCustomerID: Optional[int] = None  # last customer finished in this chunk
+    Owner: Optional[str] = None
+    LeaseExpires: Optional[datetime] = None  # UTC
+    Status: str  # pending, leased, expired or done
+    Attempts: int
+
+class AgentRun(BaseModel):
+    run_id: str
+    chunks: int
+    chunks_by_status: dict[str, int]
+    done: bool
+    leases: list[AgentLease]
+
+# Leases must be positive (one expired on arrival lets a second worker claim the same chunk) and at most a day
+MAX_LEASE_SECONDS = 24 * 3600
+
+class LeaseClaim(BaseModel):
+    worker_id: str
+    lease_seconds: int = Field(300, gt=0, le=MAX_LEASE_SECONDS)
+
+class LeaseRenewal(BaseModel):
+    worker_id: str
+    lease_seconds: int = Field(300, gt=0, le=MAX_LEASE_SECONDS)
+    checkpoint_customer_id: Optional[int] = None
+    done: bool = False
+
+class EventPage(BaseModel):
+    feed: str  # changes when the API restarts
+    next: int  # pass back as after
+    gap: bool  # events were missed; re-sync from the database
+    events: list[dict]
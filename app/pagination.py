@@ -0,0 +1,52 @@
+import base64
+import json
+from fastapi import HTTPException
+
+
+def encode_cursor(last_key) -> str:
+    """Opaque token pointing just after last_key."""
+    raw = json.dumps({"after": last_key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor) -> int:
+    """Return the key to resume after, or 0 to start from the beginning."""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["after"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def build_page_query(template, limit, cursor, filters):
+    """
+    Fill a keyset page template from Settings.
+
+    Args:
+        template: Query with a TOP (?) placeholder, a key > ? placeholder and {filters}
+        limit: Page size requested by the client
+        cursor: Opaque token from a previous page, or None
+        filters: List of (sql_fragment, value) pairs; pairs whose value is None are skipped.
+            A tuple value supplies several parameters to one fragment.
+
+    Returns:
+        (query, params) ready for execute_query. One extra row is requested so
+        the caller can tell whether another page exists.
+    """
+    fragments = []
+    params = [limit + 1, decode_cursor(cursor)]
+    for fragment, value in filters:
+        if value is not None:
+            fragments.append(fragment)
+            params.extend(value if isinstance(value, tuple) else (value,))
+    return template.format(filters="".join(fragments)), tuple(params)
+
+
+def paginate(rows, limit, key):
+    """Trim the look-ahead row and attach the next cursor if there is more data."""
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1][key]) if has_more and items else None
+    return {"items": items, "next": next_cursor}
@@ -0,0 +1,256 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class PooledConnection:
+    """A raw DB-API connection plus the bookkeeping the pool needs."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections.
+
+    Args:
+        connect: Zero-argument callable returning a new connection
+        min_size: Connections kept open even when idle
+        max_size: Upper bound on open connections (idle + checked out)
+        idle_timeout: Seconds an idle connection may sit in the pool before it is closed
+        max_lifetime: Seconds after which a connection is retired, whatever its state
+        checkout_timeout: Seconds to wait for a free connection before giving up
+        validate_on_checkout: Run validation_query before handing out an idle connection
+        validation_query: Cheap statement used to check a connection is still alive
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, idle_timeout=300.0,
+                 max_lifetime=1800.0, checkout_timeout=30.0,
+                 validate_on_checkout=True, validation_query="SELECT 1"):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.validate_on_checkout = validate_on_checkout
+        self.validation_query = validation_query
+
+        self._idle = []  # LIFO stack so hot connections are reused first
+        self._open = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "closed": 0,
+            "validation_failures": 0,
+        }
+
+    # Public API
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the duration of the with-block.
+
+        If the block raises, the connection is rolled back before being returned;
+        a connection that cannot even be rolled back is discarded.
+        """
+        item = self.acquire()
+        try:
+            yield item.conn
+        except BaseException:
+            self.release(item, discard=not self._rollback(item.conn))
+            raise
+        else:
+            self.release(item)
+
+    def acquire(self):
+        """Check out a PooledConnection, opening a new one if the pool has room."""
+        deadline = None
+        waited = False
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                self._prune_locked()
+                if self._idle:
+                    item = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._open < self.max_size:
+                    # Reserve the slot now and connect outside the lock
+                    self._open += 1
+                    self._in_use += 1
+                    item = None
+                    break
+                if deadline is None:
+                    deadline = started + self.checkout_timeout
+                    waited = True
+                    self._stats["waits"] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.checkout_timeout}s "
+                        f"(max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["wait_time_total"] += time.monotonic() - started
+
+        if item is None:
+            return self._open_new()
+
+        if self.validate_on_checkout and not self._validate(item.conn):
+            # Keep the reserved slot and reconnect in place of the dead connection
+            self._safe_close(item.conn)
+            with self._cond:
+                self._stats["validation_failures"] += 1
+                self._stats["closed"] += 1
+            return self._open_new()
+        return item
+
+    def release(self, item, discard=False):
+        """Return a connection to the pool, or close it if discarded or past its lifetime."""
+        now = time.monotonic()
+        expired = now - item.created_at >= self.max_lifetime
+        if discard or expired or self._closed:
+            self._close_item(item)
+            return
+        item.last_used = now
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append(item)
+            self._cond.notify()
+
+    def warm(self):
+        """Open connections until min_size are available. Returns how many were opened."""
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._open >= self.min_size:
+                    return opened
+                self._open += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["created"] += 1
+                self._idle.append(PooledConnection(conn))
+                self._cond.notify()
+            opened += 1
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for item in idle:
+            self._safe_close(item.conn)
+            with self._cond:
+                self._open -= 1
+                self._stats["closed"] += 1
+
+    def stats(self):
+        """Snapshot of pool counters and current sizes."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+        return snapshot
+
+    # Internals
+
+    def _open_new(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["created"] += 1
+        return PooledConnection(conn)
+
+    def _close_item(self, item):
+        self._safe_close(item.conn)
+        with self._cond:
+            self._open -= 1
+            self._in_use -= 1
+            self._stats["closed"] += 1
+            self._cond.notify()
+
+    def _prune_locked(self):
+        """Drop idle connections past idle_timeout or max_lifetime. Caller holds the lock."""
+        if not self._idle:
+            return
+        now = time.monotonic()
+        keep = []
+        # Oldest idle connections sit at the bottom of the stack
+        for item in self._idle:
+            too_old = now - item.created_at >= self.max_lifetime
+            too_idle = now - item.last_used >= self.idle_timeout and self._open > self.min_size
+            if too_old or too_idle:
+                self._safe_close(item.conn)
+                self._open -= 1
+                self._stats["closed"] += 1
+            else:
+                keep.append(item)
+        self._idle = keep
+
+    def _validate(self, conn):
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.validation_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _rollback(conn):
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _safe_close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
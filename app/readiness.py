@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from app.config import settings
+from app.database import backend, execute_scalar
+
+
+class DependencyStatus:
+    """Outcome of the latest check of one dependency."""
+
+    def __init__(self):
+        self.ok = None  # None until the first check has run
+        self.latency = None
+        self.checked_at = None
+        self.last_error = None
+        self.last_error_at = None
+
+    def as_dict(self, now):
+        return {
+            "status": "unknown" if self.ok is None else "ok" if self.ok else "error",
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "checked_seconds_ago": round(now - self.checked_at, 1) if self.checked_at else None,
+            "last_error": self.last_error,
+            "last_error_seconds_ago": round(now - self.last_error_at, 1) if self.last_error_at else None,
+        }
+
+
+class ReadinessMonitor:
+    """
+    Runs dependency checks in one background thread and serves their cached results,
+    so probes never touch the database or the secret store themselves.
+
+    - A daemon thread re-runs every check each interval seconds, started on first use.
+    - Only one round of checks runs at a time; refresh() returns False instead of
+      starting a second one.
+    - Results older than stale_after seconds count as not ready, in case checks hang.
+
+    Args:
+        checks: Mapping of dependency name to a zero-argument callable that raises on failure
+        interval: Seconds between check rounds
+        stale_after: Seconds after which a result no longer counts
+    """
+
+    def __init__(self, checks, interval=10.0, stale_after=30.0):
+        self.checks = dict(checks)
+        self.interval = interval
+        self.stale_after = stale_after
+        self._status = {name: DependencyStatus() for name in self.checks}
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+        self._first_round = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Run every check once. Returns False if a round is already in progress."""
+        if not self._running.acquire(blocking=False):
+            return False
+        try:
+            for name, check in self.checks.items():
+                started = time.monotonic()
+                error = None
+                try:
+                    check()
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    logging.warning(f"Readiness check '{name}' failed: {error}")
+                finished = time.monotonic()
+                with self._lock:
+                    status = self._status[name]
+                    status.ok = error is None
+                    status.latency = finished - started
+                    status.checked_at = finished
+                    if error:
+                        status.last_error = error
+                        status.last_error_at = finished
+        finally:
+            self._running.release()
+            self._first_round.set()
+        return True
+
+    def ensure_started(self):
+        if self._thread is not None or self._stop.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="readiness-checks", daemon=True)
+                self._thread.start()
+
+    def wait_first_round(self, timeout):
+        """Block until the first round of checks has finished (or timeout). Returns whether it has."""
+        return self._first_round.wait(timeout)
+
+    def snapshot(self):
+        """{"ready": bool, "checks": {name: status}} from the cached results."""
+        now = time.monotonic()
+        with self._lock:
+            checks = {name: status.as_dict(now) for name, status in self._status.items()}
+            ready = all(
+                status.ok and now - status.checked_at <= self.stale_after
+                for status in self._status.values()
+            )
+        return {"ready": ready, "checks": checks}
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+
+def _check_database():
+    # Goes through the pool, so a healthy replica reuses an idle connection
+    execute_scalar(backend.validation_query, timeout=settings.HEALTH_CHECK_TIMEOUT)
+
+
+def _check_secrets():
+    # Served from the secret cache unless an entry is due; a failed refresh raises only if no value was ever fetched
+    settings.db_user
+    settings.db_password
+
+
+def _build_checks():
+    checks = {"database": _check_database}
+    # The SQLite backend does not use the database credentials
+    if backend.name != "sqlite":
+        checks["secrets"] = _check_secrets
+    return checks
+
+
+readiness_monitor = ReadinessMonitor(
+    _build_checks(),
+    interval=settings.HEALTH_CHECK_INTERVAL,
+    stale_after=settings.HEALTH_CHECK_STALE_AFTER,
+)
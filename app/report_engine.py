@@ -0,0 +1,103 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from app.async_db import execute_multi_query
+from app.config import Settings
+
+HIGH_PRIORITY = "High Priority"
+
+
+def due_bucket(due_date, today=None):
+    """Python twin of the CASE expression in Settings.LEAD_REPORT_QUERY."""
+    today = today or date.today()
+    if due_date < today:
+        return "overdue"
+    if due_date == today:
+        return "today"
+    if due_date <= today + timedelta(days=7):
+        return "next_7_days"
+    if due_date <= today + timedelta(days=30):
+        return "next_30_days"
+    return "later"
+
+
+class LeadReportEngine:
+    """
+    Keeps the lead report in memory so reads never touch the database.
+
+    The report is computed with one multi-result-set query and then kept
+    current by the write endpoints: task inserts are applied in place,
+    other writes invalidate it. A TTL and a change of calendar day also
+    force a recompute, covering writes made outside this API and the
+    due-date buckets shifting at midnight.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._report = None
+        self._computed_at = 0.0
+        self._computed_on = None
+        self._version = 0
+        self._lock = None
+
+    async def get(self):
+        if self._is_fresh():
+            return self._report
+        # Single flight: concurrent readers wait for one recompute instead of each running the query
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._is_fresh():
+                return self._report
+            return await self._recompute()
+
+    def invalidate(self):
+        self._version += 1
+        self._report = None
+
+    def add_task(self, task):
+        """Count a newly created task without recomputing the whole report."""
+        if self._report is None:
+            return
+        self._version += 1
+        report = self._report
+        report["tasks"] += 1
+        _increment(report["tasks_by_assignee"], task.AssignedTo)
+        _increment(report["tasks_by_due_date"], due_bucket(task.DueDate, self._computed_on))
+
+    def _is_fresh(self):
+        return (
+            self._report is not None
+            and time.monotonic() - self._computed_at < self.ttl
+            and self._computed_on == date.today()
+        )
+
+    async def _recompute(self):
+        version = self._version
+        started_on = date.today()
+        lead_rows, assignee_rows, due_rows = await execute_multi_query(Settings.LEAD_REPORT_QUERY)
+        lead_status = {row["LeadStatus"]: row["Total"] for row in lead_rows}
+        tasks_by_assignee = {row["AssignedTo"]: row["Total"] for row in assignee_rows}
+        report = {
+            "leads": lead_status.get(HIGH_PRIORITY, 0),
+            "tasks": sum(tasks_by_assignee.values()),
+            "customers_by_lead_status": lead_status,
+            "tasks_by_assignee": tasks_by_assignee,
+            "tasks_by_due_date": {row["Bucket"]: row["Total"] for row in due_rows},
+            "generated_at": datetime.now(),
+        }
+        # A write that landed while the query ran makes this result stale; serve it but don't keep it
+        if version == self._version:
+            self._report = report
+            self._computed_at = time.monotonic()
+            self._computed_on = started_on
+        else:
+            self._report = None
+        return report
+
+
+def _increment(counts, key):
+    counts[key] = counts.get(key, 0) + 1
+
+
+report_engine = LeadReportEngine(ttl=Settings.REPORT_CACHE_TTL)
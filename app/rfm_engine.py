@@ -0,0 +1,157 @@
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from app.async_db import execute_query_columns
+from app.config import Settings
+
+# Column order of RfmTable.rows, matching the RfmCustomer model
+RFM_COLUMNS = ("CustomerID", "Recency", "Frequency", "Monetary", "RScore", "FScore", "MScore", "Segment")
+
+
+def quantile_scores(values, buckets=5):
+    """
+    Map each value to a 1..buckets score by its rank; tied values share their average rank.
+    Same rule as quantile_scores in agent/rfm.py, so both sides agree on the scores.
+    """
+    if not values:
+        return []
+    ordered = sorted(values)
+    n = len(values)
+    scores = []
+    for value in values:
+        rank = (bisect_left(ordered, value) + bisect_right(ordered, value) - 1) / 2
+        scores.append(1 + int(rank * buckets // n))
+    return scores
+
+
+def segment(r_score, f_score):
+    """Segment name from the recency and frequency scores."""
+    if r_score >= 4 and f_score >= 4:
+        return "champions"
+    if r_score >= 3 and f_score >= 3:
+        return "loyal"
+    if r_score >= 4:
+        return "new"
+    if f_score >= 3:
+        return "at_risk"
+    if r_score <= 2:
+        return "hibernating"
+    return "needs_attention"
+
+
+class RfmTable:
+    """Scored RFM rows for one reference date, sorted by CustomerID."""
+
+    def __init__(self, reference_date, customer_rows):
+        self.reference_date = reference_date
+        self.generated_at = datetime.now()
+        customer_ids = [row[0] for row in customer_rows]
+        recency = [int(row[1]) for row in customer_rows]
+        frequency = [int(row[2]) for row in customer_rows]
+        monetary = [round(float(row[3]), 2) for row in customer_rows]
+        # Lower recency is better, so its ranking is reversed
+        r_scores = quantile_scores([-value for value in recency])
+        f_scores = quantile_scores(frequency)
+        m_scores = quantile_scores(monetary)
+        self.rows = [
+            (customer_ids[i], recency[i], frequency[i], monetary[i], r_scores[i], f_scores[i], m_scores[i],
+             segment(r_scores[i], f_scores[i]))
+            for i in range(len(customer_ids))
+        ]
+        self._ids = customer_ids
+
+    def get(self, customer_id):
+        index = bisect_left(self._ids, customer_id)
+        if index < len(self._ids) and self._ids[index] == customer_id:
+            return self.rows[index]
+        return None
+
+    def page(self, after, limit, predicate=None):
+        """Up to limit + 1 rows with CustomerID > after that satisfy predicate (the extra row signals another page)."""
+        items = []
+        for row in self.rows[bisect_right(self._ids, after):]:
+            if predicate is None or predicate(row):
+                items.append(row)
+                if len(items) > limit:
+                    break
+        return items
+
+    def segments(self):
+        stats = {}
+        for row in self.rows:
+            entry = stats.setdefault(row[7], [0, 0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += row[1]
+            entry[2] += row[2]
+            entry[3] += row[3]
+        return {
+            name: {
+                "customers": count,
+                "avg_recency": round(recency / count, 1),
+                "avg_frequency": round(frequency / count, 2),
+                "avg_monetary": round(monetary / count, 2),
+                "total_monetary": round(monetary, 2),
+            }
+            for name, (count, recency, frequency, monetary) in sorted(stats.items())
+        }
+
+
+class RfmEngine:
+    """
+    Computes RFM for every customer with one GROUP BY over the order headers and
+    keeps the scored table in memory per reference date, so paging and filtering
+    never go back to the database.
+
+    Tables expire after ttl seconds (orders are written outside this API) and at
+    most max_dates reference dates are kept, least recently used first out.
+    Concurrent readers of the same date wait for a single computation.
+    """
+
+    def __init__(self, ttl, max_dates):
+        self.ttl = ttl
+        self.max_dates = max_dates
+        self._tables = OrderedDict()  # reference date -> (computed_at, RfmTable)
+        self._locks = {}
+
+    async def get(self, reference_date):
+        table = self._fresh(reference_date)
+        if table:
+            return table
+        lock = self._locks.setdefault(reference_date, asyncio.Lock())
+        try:
+            async with lock:
+                table = self._fresh(reference_date)
+                if table:
+                    return table
+                table = await self._compute(reference_date)
+                self._tables[reference_date] = (time.monotonic(), table)
+                self._tables.move_to_end(reference_date)
+                while len(self._tables) > self.max_dates:
+                    evicted, _ = self._tables.popitem(last=False)
+                    self._locks.pop(evicted, None)
+                return table
+        finally:
+            # Only dates with a stored table keep their lock (e.g. not when _compute failed)
+            if reference_date not in self._tables:
+                self._locks.pop(reference_date, None)
+
+    def invalidate(self):
+        self._tables.clear()
+        self._locks.clear()
+
+    def _fresh(self, reference_date):
+        entry = self._tables.get(reference_date)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            self._tables.move_to_end(reference_date)
+            return entry[1]
+        return None
+
+    async def _compute(self, reference_date):
+        # Orders placed after the reference date are left out
+        _, rows = await execute_query_columns(Settings.GET_RFM, (reference_date, reference_date + timedelta(days=1)))
+        return RfmTable(reference_date, rows)
+
+
+rfm_engine = RfmEngine(ttl=Settings.RFM_CACHE_TTL, max_dates=Settings.RFM_CACHE_DATES)
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, HTTPException
+from app.async_db import execute_query, execute_query_columns, execute_command, execute_returning
+from app.models import AgentLease, AgentRun, AgentRunCreate, LeaseClaim, LeaseRenewal
+from app.config import Settings
+from typing import Optional
+import json
+import logging
+
+router = APIRouter()
+
+# Upper bound of the last chunk, so customers added after the run was created still belong to a chunk
+_LAST_CUSTOMER_ID = 2 ** 31 - 1
+
+def _chunks(customer_ids, chunk_size):
+    """Contiguous CustomerID ranges of chunk_size customers each."""
+    firsts = customer_ids[::chunk_size]
+    return [
+        {
+            "ChunkID": index,
+            "FirstCustomerID": first,
+            "LastCustomerID": firsts[index + 1] - 1 if index + 1 < len(firsts) else _LAST_CUSTOMER_ID,
+        }
+        for index, first in enumerate(firsts)
+    ]
+
+def _run_status(run_id, rows):
+    leases = [AgentLease(**row) for row in rows]
+    by_status = {}
+    for lease in leases:
+        by_status[lease.Status] = by_status.get(lease.Status, 0) + 1
+    return AgentRun(
+        run_id=run_id,
+        chunks=len(leases),
+        chunks_by_status=by_status,
+        done=all(lease.Status == "done" for lease in leases),
+        leases=leases,
+    )
+
+# Create a run, or join it if another worker already has; every worker of a pass posts the same run_id
+@router.post("/agent/runs/", response_model=AgentRun)
+async def create_agent_run(run: AgentRunCreate):
+    rows = await execute_query(Settings.GET_AGENT_RUN, (run.run_id,))
+    if rows:
+        return _run_status(run.run_id, rows)
+
+    _, id_rows = await execute_query_columns(Settings.GET_CUSTOMER_IDS)
+    chunks = _chunks([row[0] for row in id_rows], run.chunk_size)
+    if chunks:
+        try:
+            await execute_command(Settings.CREATE_AGENT_RUN, (run.run_id, json.dumps(chunks)))
+        except Exception as e:
+            # Two workers created the run at once; the primary key lets only one of them insert it
+            rows = await execute_query(Settings.GET_AGENT_RUN, (run.run_id,))
+            if not rows:
+                raise
+            logging.info(f"Agent run {run.run_id} was created concurrently: {e}")
+    rows = await execute_query(Settings.GET_AGENT_RUN, (run.run_id,))
+    return _run_status(run.run_id, rows)
+
+@router.get("/agent/runs/{run_id}/", response_model=AgentRun)
+async def get_agent_run(run_id: str):
+    rows = await execute_query(Settings.GET_AGENT_RUN, (run_id,))
+    if not rows:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return _run_status(run_id, rows)
+
+# Lease the next pending or expired chunk; null when every chunk is done or leased by a live worker
+@router.post("/agent/runs/{run_id}/claim/", response_model=Optional[AgentLease])
+async def claim_agent_lease(run_id: str, claim: LeaseClaim):
+    rows = await execute_returning(Settings.CLAIM_AGENT_LEASE, (claim.worker_id, claim.lease_seconds, run_id))
+    return AgentLease(**rows[0]) if rows else None
+
+# Heartbeat: extends the lease, optionally saves the checkpoint and marks the chunk done
+@router.put("/agent/runs/{run_id}/leases/{chunk_id}/")
+async def renew_agent_lease(run_id: str, chunk_id: int, renewal: LeaseRenewal):
+    status = "done" if renewal.done else "leased"
+    affected_rows = await execute_command(
+        Settings.RENEW_AGENT_LEASE,
+        (renewal.checkpoint_customer_id, renewal.lease_seconds, status, run_id, chunk_id, renewal.worker_id),
+    )
+    if affected_rows == 0:
+        raise HTTPException(status_code=409, detail="Lease is not held by this worker")
+    return {"status": status}
+
+# Customers of one chunk after its checkpoint: CustomerID > after and <= through
+@router.get("/agent/customer-ids/", response_model=list[int])
+async def get_customer_ids(after: int, through: int):
+    _, rows = await execute_query_columns(Settings.GET_CUSTOMER_IDS_RANGE, (after, through))
+    return [row[0] for row in rows]
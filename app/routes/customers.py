@@ -1,42 +1,105 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.database import execute_query, execute_command
-from app.models import Customer
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.async_db import execute_query, execute_query_columns, execute_command, execute_returning, DatabaseTimeoutError
+from app.pool import PoolTimeoutError
+from app.models import Customer, CustomerPage, ChangedCustomerPage, BulkLeadStatusRequest, BulkLeadStatusResult
 from app.config import Settings
+from app.pagination import build_page_query, paginate
+from app.serialization import encode_page
+from app.report_engine import report_engine
+from app.http_cache import cached_json, response_cache
+from datetime import datetime
+from typing import Optional
+import json
 import logging
 
 router = APIRouter()
 
-# Get all Customers
-@router.get("/customers/", response_model=list[Customer])
-async def get_customers():
-    try:
-        query = Settings.GET_ALL_CUSTOMERS
-        raw_data = execute_query(query)  # Now returns list of dictionaries
-        customers = [Customer(**customer_dict) for customer_dict in raw_data]
-        return customers
-    except Exception as e:
-        logging.error(f"Error retrieving customers: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+# Get Customers one keyset page at a time, optionally filtered by LeadStatus
+@router.get("/customers/", response_model=CustomerPage)
+async def get_customers(
+    request: Request,
+    limit: int = Query(Settings.PAGE_SIZE_DEFAULT, ge=1, le=Settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    lead_status: Optional[str] = None,
+):
+    async def produce():
+        try:
+            query, params = build_page_query(Settings.GET_CUSTOMERS_PAGE, limit, cursor, [
+                (Settings.FILTER_CUSTOMERS_LEAD_STATUS, lead_status),
+            ])
+            columns, rows = await execute_query_columns(query, params)
+            return encode_page(columns, rows, limit, "CustomerID", Customer)
+        except (DatabaseTimeoutError, PoolTimeoutError, HTTPException):
+            raise
+        except Exception as e:
+            logging.error(f"Error retrieving customers: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await cached_json(request, Settings.RESPONSE_CACHE_TTL_CUSTOMERS, ["customers"], produce)
+
+# Get Customers with new orders after since_order_id (or orders modified after modified_since),
+# optionally only counting orders up to until_order_id so paging sees one consistent snapshot
+# Declared before /customers/{customer_id}/ so "changed" is not parsed as an ID
+@router.get("/customers/changed/", response_model=ChangedCustomerPage)
+async def get_changed_customers(
+    since_order_id: int = Query(0, ge=0),
+    until_order_id: Optional[int] = Query(None, ge=0),
+    modified_since: Optional[datetime] = None,
+    limit: int = Query(Settings.PAGE_SIZE_DEFAULT, ge=1, le=Settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+):
+    if modified_since is None:
+        since_filter = (Settings.FILTER_CHANGED_SINCE_ORDER, since_order_id)
+    else:
+        since_filter = (Settings.FILTER_CHANGED_SINCE_ORDER_OR_MODIFIED, (since_order_id, modified_since))
+    query, params = build_page_query(Settings.GET_CHANGED_CUSTOMERS_PAGE, limit, cursor, [
+        since_filter,
+        (Settings.FILTER_CHANGED_UNTIL_ORDER, until_order_id),
+    ])
+    return paginate(await execute_query(query, params), limit, "CustomerID")
 
 # Get Customer by CustomerID
 @router.get("/customers/{customer_id}/", response_model=Customer)
-async def get_customer(customer_id: int):
-    query = Settings.GET_CUSTOMER_BY_ID
-    result = execute_query(query, (customer_id,))
-    if not result:
-        raise HTTPException(status_code=404, detail="Customer not found")
-    return Customer(**result[0])
+async def get_customer(request: Request, customer_id: int):
+    async def produce():
+        query = Settings.GET_CUSTOMER_BY_ID
+        result = await execute_query(query, (customer_id,))
+        if not result:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return Customer(**result[0])
+
+    return await cached_json(request, Settings.RESPONSE_CACHE_TTL_CUSTOMERS, [f"customer:{customer_id}"], produce)
 
 # Update LeadStatus column in the Sales.Customer table
 @router.put("/customers/{customer_id}/", response_model=Customer)
 async def update_customer(customer_id: int, lead_status: str):
     update_query = Settings.UPDATE_LeadStatus
-    affected_rows = execute_command(update_query, (lead_status, customer_id))
+    affected_rows = await execute_command(update_query, (lead_status, customer_id))
     
     if affected_rows == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
+    report_engine.invalidate()
+    response_cache.invalidate("customers", f"customer:{customer_id}")
     
     # Get the updated customer
     select_query = Settings.GET_CUSTOMER_BY_ID
-    result = execute_query(select_query, (customer_id,))
+    result = await execute_query(select_query, (customer_id,))
     return Customer(**result[0])
+
+# Update LeadStatus for many customers in a single statement and transaction
+@router.put("/customers/bulk/lead-status/", response_model=list[BulkLeadStatusResult])
+async def bulk_update_lead_status(request: BulkLeadStatusRequest):
+    if len(request.updates) > Settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {Settings.BULK_MAX_ITEMS} updates per request")
+    if not request.updates:
+        return []
+    query = Settings.BULK_UPDATE_LeadStatus
+    payload = json.dumps([update.dict() for update in request.updates])
+    updated = {row["CustomerID"] for row in await execute_returning(query, (payload,))}
+    if updated:
+        report_engine.invalidate()
+        response_cache.invalidate("customers", *(f"customer:{customer_id}" for customer_id in updated))
+    return [
+        {"CustomerID": update.CustomerID, "status": "updated" if update.CustomerID in updated else "not_found"}
+        for update in request.updates
+    ]
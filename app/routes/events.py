@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Query
+from app.models import EventPage
+from app.config import Settings
+from app.events import event_log, order_detector
+from typing import Optional
+
+router = APIRouter()
+
+# Long-poll for change events after sequence number `after`; without `after` only the current position is returned.
+# Pass back `feed` from the previous page so a restarted API (new feed, sequence from 1) is reported as a gap.
+@router.get("/events/", response_model=EventPage)
+async def get_events(
+    after: Optional[int] = Query(None, ge=0),
+    feed: Optional[str] = None,
+    wait: float = Query(0, ge=0),
+    limit: int = Query(Settings.PAGE_SIZE_MAX, ge=1, le=Settings.PAGE_SIZE_MAX),
+):
+    order_detector.ensure_started()
+    if after is None:
+        return EventPage(feed=event_log.feed_id, next=event_log.last_seq, gap=False, events=[])
+    if feed is not None and feed != event_log.feed_id:
+        return EventPage(feed=event_log.feed_id, next=event_log.last_seq, gap=True, events=[])
+    events, gap = await event_log.wait(after, limit, min(wait, Settings.EVENTS_MAX_WAIT))
+    if gap:
+        return EventPage(feed=event_log.feed_id, next=event_log.last_seq, gap=True, events=[])
+    return EventPage(feed=event_log.feed_id, next=events[-1]["seq"] if events else after, gap=False, events=events)
+
+@router.get("/events/status/")
+async def get_events_status():
+    return {
+        "feed": event_log.feed_id,
+        "last_seq": event_log.last_seq,
+        "detector_running": order_detector._task is not None,
+        "last_order_id": order_detector.last_order_id,
+        "last_error": order_detector.last_error,
+    }
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from app.async_db import check_stream_slot, stream_in_db_executor
+from app.config import Settings
+from app.export import (
+    CUSTOMER_COLUMNS, FORMATS, ORDER_COLUMNS, TASK_COLUMNS,
+    build_export_query, export_filename, resolve_format, select_columns, stream_export,
+)
+from datetime import date
+from typing import Optional
+
+router = APIRouter()
+
+_EXPORT_RESPONSES = {200: {"description": "The whole table (or the selected rows) as one file", "content": {
+    "text/csv": {}, "application/gzip": {}, "application/vnd.apache.arrow.stream": {}, "application/vnd.apache.parquet": {},
+}}}
+
+def _export_response(name, template, expressions, column_types, columns, after, filters, export_format, compression):
+    export_format, compression = resolve_format(export_format, compression)
+    selected = select_columns(column_types, columns)
+    query, params = build_export_query(template, expressions, selected, after, filters)
+    media_type = "application/gzip" if export_format == "csv" and compression == "gzip" else FORMATS[export_format][0]
+    check_stream_slot()
+    return StreamingResponse(
+        stream_in_db_executor(stream_export(query, params, selected, column_types, export_format, compression)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(name, export_format, compression)}"'},
+    )
+
+# Streamed exports for analytics pulls. format is csv, arrow (IPC stream) or parquet; arrow and parquet need pyarrow.
+# columns picks a comma-separated subset (the key column is always included); after resumes an interrupted
+# export after the last key received. Exports share the DB_STREAM_MAX_CONCURRENT slots with other streams.
+@router.get("/export/orders/", response_class=StreamingResponse, responses=_EXPORT_RESPONSES)
+async def export_orders(
+    format: Optional[str] = None,
+    compression: Optional[str] = None,
+    columns: Optional[str] = None,
+    after: int = Query(0, ge=0),
+    order_date_from: Optional[date] = None,
+    order_date_to: Optional[date] = None,
+):
+    return _export_response("orders", Settings.EXPORT_ORDERS, Settings.EXPORT_ORDERS_COLUMNS, ORDER_COLUMNS, columns, after, [
+        (Settings.FILTER_ORDERS_DATE_FROM, order_date_from),
+        (Settings.FILTER_ORDERS_DATE_TO, order_date_to),
+    ], format, compression)
+
+@router.get("/export/customers/", response_class=StreamingResponse, responses=_EXPORT_RESPONSES)
+async def export_customers(
+    format: Optional[str] = None,
+    compression: Optional[str] = None,
+    columns: Optional[str] = None,
+    after: int = Query(0, ge=0),
+    lead_status: Optional[str] = None,
+):
+    return _export_response("customers", Settings.EXPORT_CUSTOMERS, Settings.EXPORT_CUSTOMERS_COLUMNS, CUSTOMER_COLUMNS, columns, after, [
+        (Settings.FILTER_CUSTOMERS_LEAD_STATUS, lead_status),
+    ], format, compression)
+
+@router.get("/export/tasks/", response_class=StreamingResponse, responses=_EXPORT_RESPONSES)
+async def export_tasks(
+    format: Optional[str] = None,
+    compression: Optional[str] = None,
+    columns: Optional[str] = None,
+    after: int = Query(0, ge=0),
+    assigned_to: Optional[str] = None,
+    due_date_from: Optional[date] = None,
+    due_date_to: Optional[date] = None,
+):
+    return _export_response("tasks", Settings.EXPORT_TASKS, Settings.EXPORT_TASKS_COLUMNS, TASK_COLUMNS, columns, after, [
+        (Settings.FILTER_TASKS_ASSIGNED_TO, assigned_to),
+        (Settings.FILTER_TASKS_DUE_FROM, due_date_from),
+        (Settings.FILTER_TASKS_DUE_TO, due_date_to),
+    ], format, compression)
@@ -1,12 +1,40 @@
+import asyncio
 from fastapi import APIRouter
-from app.database import get_db_connection
+from fastapi.responses import JSONResponse
+from app.config import secret_provider, settings
+from app.database import get_pool_stats
+from app.readiness import readiness_monitor
 
 router = APIRouter()
 
+async def _readiness():
+    """Cached check results; the first call after startup waits for the first round of checks."""
+    readiness_monitor.ensure_started()
+    await asyncio.to_thread(readiness_monitor.wait_first_round, settings.HEALTH_CHECK_TIMEOUT)
+    return readiness_monitor.snapshot()
+
+# Liveness: the process is up and serving requests; never touches the database or the secret store
+@router.get("/health/live/")
+async def liveness():
+    return {"status": "alive"}
+
+# Readiness: dependency status from the background checks, 503 while any of them fails
+@router.get("/health/ready/")
+async def readiness():
+    snapshot = await _readiness()
+    content = {
+        "status": "ready" if snapshot["ready"] else "not_ready",
+        "checks": snapshot["checks"],
+        "pool": get_pool_stats(),
+        "secrets": secret_provider.stats(),
+    }
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=content)
+
 @router.get("/health/")
 async def health_check():
-    try:
-        with get_db_connection():
-            return {"status": "healthy"}
-    except Exception:
-        return {"status": "unhealthy"}
\ No newline at end of file
+    snapshot = await _readiness()
+    return {"status": "healthy" if snapshot["ready"] else "unhealthy"}
+
+@router.get("/health/pool/")
+async def pool_stats():
+    return get_pool_stats()
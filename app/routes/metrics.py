@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app import metrics
+from app.database import get_pool_stats
+from app.startup import startup_stats
+
+router = APIRouter()
+
+# Prometheus scrape target
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    pool = get_pool_stats()
+    snapshot = {
+        "db_pool_open_connections": ("gauge", "Open pooled connections.", pool["open"]),
+        "db_pool_in_use_connections": ("gauge", "Pooled connections checked out.", pool["in_use"]),
+        "db_pool_checkouts_total": ("counter", "Connection checkouts.", pool["checkouts"]),
+        "db_pool_checkout_waits_total": ("counter", "Checkouts that had to wait for a connection.", pool["waits"]),
+        "db_pool_checkout_timeouts_total": ("counter", "Checkouts that timed out.", pool["timeouts"]),
+        "app_import_seconds": ("gauge", "Time to import the application modules.", startup_stats["import_seconds"] or 0),
+        "app_warmup_seconds": ("gauge", "Time spent in the startup warm-up; 0 when it was skipped.", startup_stats["warmup_seconds"] or 0),
+        "app_warmup_errors": ("gauge", "Warm-up steps that failed.", len(startup_stats["warmup_errors"])),
+    }
+    return PlainTextResponse(metrics.render(snapshot), media_type="text/plain; version=0.0.4")
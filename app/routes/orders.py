@@ -1,22 +1,110 @@
-from fastapi import APIRouter, HTTPException
-from app.database import execute_query
-from app.models import Customer, Order
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.async_db import execute_query, execute_query_columns, check_stream_slot, stream_in_db_executor
+from app.database import iter_batches
+from app.models import Customer, Order, OrderPage, OrderBatchRequest, OrderWatermark
 from app.config import Settings
+from app.pagination import build_page_query
+from app.serialization import encode_page, encode_rows
+from app.http_cache import cached_json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+import json
 import logging
 
 
 router = APIRouter()
 
-# Get all Orders
-@router.get("/orders/", response_model=list[Order])
-async def get_orders():
-    query = Settings.GET_ALL_ORDERS
-    return execute_query(query)
+# Get Orders one keyset page at a time, optionally within an OrderDate range
+@router.get("/orders/", response_model=OrderPage)
+async def get_orders(
+    request: Request,
+    limit: int = Query(Settings.PAGE_SIZE_DEFAULT, ge=1, le=Settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    order_date_from: Optional[date] = None,
+    order_date_to: Optional[date] = None,
+):
+    async def produce():
+        query, params = build_page_query(Settings.GET_ORDERS_PAGE, limit, cursor, [
+            (Settings.FILTER_ORDERS_DATE_FROM, order_date_from),
+            (Settings.FILTER_ORDERS_DATE_TO, order_date_to),
+        ])
+        columns, rows = await execute_query_columns(query, params)
+        return encode_page(columns, rows, limit, "SalesOrderID", Order)
+
+    return await cached_json(request, Settings.RESPONSE_CACHE_TTL_ORDERS, ["orders"], produce)
+
+# Get the newest SalesOrderID and ModifiedDate, used as the starting watermark for incremental agent runs
+@router.get("/orders/watermark/", response_model=OrderWatermark)
+async def get_orders_watermark():
+    query = Settings.GET_ORDERS_WATERMARK
+    result = await execute_query(query)
+    return result[0]
 
 # Get Orders by CustomerID
 @router.get("/orders/customer/{customer_id}/", response_model=list[Order])
-async def get_customer_orders(customer_id: int):
-    query = Settings.GET_ORDERS_BY_CUSTOMERID
-    return execute_query(query, (customer_id,))
+async def get_customer_orders(request: Request, customer_id: int):
+    async def produce():
+        query = Settings.GET_ORDERS_BY_CUSTOMERID
+        columns, rows = await execute_query_columns(query, (customer_id,))
+        return encode_rows(columns, rows, Order)
+
+    return await cached_json(request, Settings.RESPONSE_CACHE_TTL_ORDERS, ["orders", f"customer-orders:{customer_id}"], produce)
+
+def _json_default(value):
+    # datetime is a date subclass; OrderDate is a date in the Order model, whatever the backend returns
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _order_line(customer_id, orders):
+    return json.dumps({"CustomerID": customer_id, "orders": orders}, default=_json_default) + "\n"
 
+def _stream_order_histories(customer_ids):
+    """Group the CustomerID-ordered rows into one NDJSON line per customer, one chunk per fetched batch."""
+    query = Settings.GET_ORDERS_FOR_CUSTOMERS
+    batches = iter_batches(query, (json.dumps(customer_ids),), batch_size=Settings.STREAM_FETCH_SIZE, timeout=Settings.DB_QUERY_TIMEOUT or None)
+    pending = set(customer_ids)
+    current_id, current_orders = None, []
+    try:
+        for columns, rows in batches:
+            lines = []
+            for values in rows:
+                row = dict(zip(columns, values))
+                if row["CustomerID"] != current_id:
+                    if current_id is not None:
+                        lines.append(_order_line(current_id, current_orders))
+                        pending.discard(current_id)
+                    current_id, current_orders = row["CustomerID"], []
+                current_orders.append(row)
+            if lines:
+                yield "".join(lines)
+    finally:
+        batches.close()
+    lines = []
+    if current_id is not None:
+        lines.append(_order_line(current_id, current_orders))
+        pending.discard(current_id)
+    # Customers without orders still get a line so clients can tell them from missing data
+    lines.extend(_order_line(customer_id, []) for customer_id in sorted(pending))
+    if lines:
+        yield "".join(lines)
 
+# Get Orders for many CustomerIDs in one set-based query, streamed as one NDJSON line per customer.
+# Fetching runs on the DB executor and concurrent streams are capped (see stream_in_db_executor).
+@router.post(
+    "/orders/batch/",
+    response_class=StreamingResponse,
+    responses={200: {"description": "One {\"CustomerID\": int, \"orders\": [Order, ...]} object per line", "content": {"application/x-ndjson": {}}}},
+)
+async def get_order_histories(request: OrderBatchRequest):
+    customer_ids = sorted(set(request.customer_ids))
+    if len(customer_ids) > Settings.ORDERS_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {Settings.ORDERS_BATCH_MAX_IDS} customer_ids per request")
+    check_stream_slot()
+    return StreamingResponse(stream_in_db_executor(_stream_order_histories(customer_ids)), media_type="application/x-ndjson")
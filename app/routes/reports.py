@@ -1,20 +1,9 @@
-from fastapi import APIRouter, HTTPException
-from app.database import execute_query
+from fastapi import APIRouter
 from app.models import Report
-from app.config import Settings
-import logging
+from app.report_engine import report_engine
 
 router = APIRouter()
 
 @router.get("/report/leads/", response_model=Report)
 async def get_leads_report():
-    lead_query = Settings.LEAD_QUERY
-    task_query = Settings.TASK_QUERY
-
-    leads_result = execute_query(lead_query)
-    tasks_result = execute_query(task_query)
-
-    leads  = list(leads_result[0].values())[0] if leads_result else 0
-    tasks =list(tasks_result[0].values())[0] if tasks_result else 0
-    
-    return {"leads": leads, "tasks": tasks}
\ No newline at end of file
+    return await report_engine.get()
\ No newline at end of file
@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.models import RfmCustomer, RfmPage, RfmSegmentReport
+from app.config import Settings
+from app.pagination import decode_cursor
+from app.serialization import encode_page
+from app.http_cache import cached_json
+from app.rfm_engine import RFM_COLUMNS, rfm_engine
+from datetime import date, timedelta
+from typing import Optional
+
+
+router = APIRouter()
+
+def _predicate(recency_lt, recency_gte, frequency_gte, frequency_lt, monetary_gt, monetary_lte, segment):
+    """Row filter for the given thresholds; None when no filter is set."""
+    checks = []
+    if recency_lt is not None:
+        checks.append(lambda row: row[1] < recency_lt)
+    if recency_gte is not None:
+        checks.append(lambda row: row[1] >= recency_gte)
+    if frequency_gte is not None:
+        checks.append(lambda row: row[2] >= frequency_gte)
+    if frequency_lt is not None:
+        checks.append(lambda row: row[2] < frequency_lt)
+    if monetary_gt is not None:
+        checks.append(lambda row: row[3] > monetary_gt)
+    if monetary_lte is not None:
+        checks.append(lambda row: row[3] <= monetary_lte)
+    if segment is not None:
+        checks.append(lambda row: row[7] == segment)
+    if not checks:
+        return None
+    return lambda row: all(check(row) for check in checks)
+
+def _reference_date(reference_date):
+    """Today when not given; every new date costs a full scan, so only past dates within RFM_MAX_LOOKBACK_DAYS are accepted."""
+    today = date.today()
+    if reference_date is None:
+        return today
+    if reference_date > today:
+        raise HTTPException(status_code=400, detail="reference_date cannot be in the future")
+    if reference_date < today - timedelta(days=Settings.RFM_MAX_LOOKBACK_DAYS):
+        raise HTTPException(status_code=400, detail=f"reference_date must be within {Settings.RFM_MAX_LOOKBACK_DAYS} days of today")
+    return reference_date
+
+# RFM values, quintile scores and segment of every customer with orders, one keyset page at a time
+@router.get("/rfm/", response_model=RfmPage)
+async def get_rfm(
+    request: Request,
+    reference_date: Optional[date] = None,
+    limit: int = Query(Settings.PAGE_SIZE_DEFAULT, ge=1, le=Settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    recency_lt: Optional[int] = None,
+    recency_gte: Optional[int] = None,
+    frequency_gte: Optional[int] = None,
+    frequency_lt: Optional[int] = None,
+    monetary_gt: Optional[float] = None,
+    monetary_lte: Optional[float] = None,
+    segment: Optional[str] = None,
+):
+    reference_date = _reference_date(reference_date)
+
+    async def produce():
+        table = await rfm_engine.get(reference_date)
+        predicate = _predicate(recency_lt, recency_gte, frequency_gte, frequency_lt, monetary_gt, monetary_lte, segment)
+        rows = table.page(decode_cursor(cursor), limit, predicate)
+        return encode_page(RFM_COLUMNS, rows, limit, "CustomerID", RfmCustomer)
+
+    return await cached_json(request, Settings.RFM_CACHE_TTL, ["rfm"], produce)
+
+# Customer count and average R/F/M per segment
+@router.get("/rfm/segments/", response_model=RfmSegmentReport)
+async def get_rfm_segments(request: Request, reference_date: Optional[date] = None):
+    reference_date = _reference_date(reference_date)
+
+    async def produce():
+        table = await rfm_engine.get(reference_date)
+        return RfmSegmentReport(
+            reference_date=table.reference_date,
+            customers=len(table.rows),
+            segments=table.segments(),
+            generated_at=table.generated_at,
+        )
+
+    return await cached_json(request, Settings.RFM_CACHE_TTL, ["rfm"], produce)
+
+# One customer's RFM values and segment
+@router.get("/rfm/{customer_id}/", response_model=RfmCustomer)
+async def get_customer_rfm(customer_id: int, reference_date: Optional[date] = None):
+    reference_date = _reference_date(reference_date)
+    table = await rfm_engine.get(reference_date)
+    row = table.get(customer_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Customer has no orders")
+    return RfmCustomer(**dict(zip(RFM_COLUMNS, row)))
@@ -1,31 +1,58 @@
-from fastapi import APIRouter, HTTPException
-from app.database import execute_query, execute_command, execute_insert_get_id
-from app.models import Task, TaskCreate
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.async_db import execute_query, execute_query_columns, execute_command, execute_insert_get_id, execute_returning
+from app.models import Task, TaskCreate, TaskPage, BulkTaskRequest
 from app.config import Settings
+from app.pagination import build_page_query
+from app.serialization import encode_page
+from app.report_engine import report_engine
+from app.http_cache import cached_json, response_cache
+from datetime import date
+from typing import Optional
+import json
 import logging
 
 router = APIRouter()
 
-@router.get("/tasks/", response_model=list[Task])
-async def get_tasks():
-    query = Settings.GET_ALL_TASKS
-    return execute_query(query)
+@router.get("/tasks/", response_model=TaskPage)
+async def get_tasks(
+    request: Request,
+    limit: int = Query(Settings.PAGE_SIZE_DEFAULT, ge=1, le=Settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    due_date_from: Optional[date] = None,
+    due_date_to: Optional[date] = None,
+):
+    async def produce():
+        query, params = build_page_query(Settings.GET_TASKS_PAGE, limit, cursor, [
+            (Settings.FILTER_TASKS_ASSIGNED_TO, assigned_to),
+            (Settings.FILTER_TASKS_DUE_FROM, due_date_from),
+            (Settings.FILTER_TASKS_DUE_TO, due_date_to),
+        ])
+        columns, rows = await execute_query_columns(query, params)
+        return encode_page(columns, rows, limit, "TaskID", Task)
+
+    return await cached_json(request, Settings.RESPONSE_CACHE_TTL_TASKS, ["tasks"], produce)
 
 @router.get("/tasks/{task_id}/", response_model=Task)
-async def get_task(task_id: int):
-    query = Settings.GET_TASK_BY_ID
-    result = execute_query(query, (task_id,))
-    if not result:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return result[0]
+async def get_task(request: Request, task_id: int):
+    async def produce():
+        query = Settings.GET_TASK_BY_ID
+        result = await execute_query(query, (task_id,))
+        if not result:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return Task(**result[0])
+
+    return await cached_json(request, Settings.RESPONSE_CACHE_TTL_TASKS, [f"task:{task_id}"], produce)
 
 @router.post("/tasks/", response_model=Task)
 async def create_task(task: TaskCreate):
     query = Settings.CREATE_TASK
-    task_id = execute_insert_get_id(query, (task.CustomerID, task.TaskDescription, task.AssignedTo, task.DueDate))
+    task_id = await execute_insert_get_id(query, (task.CustomerID, task.TaskDescription, task.AssignedTo, task.DueDate))
 
     if not task_id:
         raise HTTPException(status_code=500, detail="Failed to create task")
+    report_engine.add_task(task)
+    response_cache.invalidate("tasks")
     
     return Task(
         TaskID=task_id,
@@ -35,24 +62,49 @@ async def create_task(task: TaskCreate):
         DueDate=task.DueDate
     )
 
+# Create many tasks in a single statement and transaction; results keep the request order
+@router.post("/tasks/bulk/", response_model=list[Task])
+async def bulk_create_tasks(request: BulkTaskRequest):
+    if len(request.tasks) > Settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {Settings.BULK_MAX_ITEMS} tasks per request")
+    if not request.tasks:
+        return []
+    query = Settings.BULK_CREATE_TASKS
+    payload = json.dumps([task.dict() for task in request.tasks], default=str)
+    rows = await execute_returning(query, (payload,))
+    if rows and "ItemIndex" not in rows[0]:
+        # RETURNING has no array index (PostgreSQL, SQLite); the rows are inserted in array order, so the IDs ascend with it
+        rows = [{"ItemIndex": index, "TaskID": task_id} for index, task_id in enumerate(sorted(row["TaskID"] for row in rows))]
+    task_ids = {row["ItemIndex"]: row["TaskID"] for row in rows}
+    if len(task_ids) != len(request.tasks):
+        raise HTTPException(status_code=500, detail="Failed to create tasks")
+    for task in request.tasks:
+        report_engine.add_task(task)
+    response_cache.invalidate("tasks")
+    return [Task(TaskID=task_ids[index], **task.dict()) for index, task in enumerate(request.tasks)]
+
 @router.put("/tasks/{task_id}/", response_model=Task)
 async def update_task(task_id: int, task: TaskCreate):
     update_query = Settings.UPDATE_TASK
-    affected_rows = execute_command(update_query, (task.CustomerID, task.TaskDescription, task.AssignedTo, task.DueDate, task_id))
+    affected_rows = await execute_command(update_query, (task.CustomerID, task.TaskDescription, task.AssignedTo, task.DueDate, task_id))
 
     if affected_rows == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
+    report_engine.invalidate()
+    response_cache.invalidate("tasks", f"task:{task_id}")
 
     # Get the updated task
     select_query = Settings.GET_TASK_BY_ID
-    result = execute_query(select_query, (task_id,))
+    result = await execute_query(select_query, (task_id,))
     return Task(**result[0])
 
 
 @router.delete("/tasks/{task_id}/")
 async def delete_task(task_id: int):
     query = Settings.DELETE_TASK
-    result = execute_command(query, (task_id,))
+    result = await execute_command(query, (task_id,))
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
+    report_engine.invalidate()
+    response_cache.invalidate("tasks", f"task:{task_id}")
     return {"message": "Task deleted"}
\ No newline at end of file
@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+import time
+
+
+class KeyVaultSecretBackend:
+    """Reads secrets from Azure Key Vault through a single, reused credential and client."""
+
+    def __init__(self, vault_url, tenant_id, client_id, client_secret):
+        self.vault_url = vault_url
+        self._tenant_id = tenant_id
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        # The credential caches its access token, so building it once also
+        # saves a token acquisition per secret fetch
+        with self._lock:
+            if self._client is None:
+                # Imported on first use: the Azure SDKs are slow to import and unused with the stub backend
+                from azure.identity import ClientSecretCredential
+                from azure.keyvault.secrets import SecretClient
+                credential = ClientSecretCredential(
+                    tenant_id=self._tenant_id,
+                    client_id=self._client_id,
+                    client_secret=self._client_secret
+                )
+                self._client = SecretClient(vault_url=self.vault_url, credential=credential)
+            return self._client
+
+    def get(self, name):
+        return self._get_client().get_secret(name).value
+
+
+class StubSecretBackend:
+    """
+    Offline backend for local runs and tests.
+
+    Looks secrets up in the mapping it was given, then in environment
+    variables named SECRET_<NAME> (e.g. SECRET_SQLPASSWORD).
+    """
+
+    def __init__(self, secrets=None):
+        self.secrets = dict(secrets or {})
+
+    def get(self, name):
+        if name in self.secrets:
+            return self.secrets[name]
+        env_name = "SECRET_" + name.upper().replace("-", "_")
+        if env_name in os.environ:
+            return os.environ[env_name]
+        raise KeyError(f"Secret '{name}' is not defined")
+
+
+class _CachedSecret:
+    def __init__(self, value):
+        self.value = value
+        self.fetched_at = time.monotonic()
+        self.last_error = None
+        self.retry_after = 0.0
+
+
+class SecretProvider:
+    """
+    TTL cache in front of a secret backend.
+
+    - get() serves cached values while they are younger than ttl.
+    - A daemon thread re-fetches entries refresh_ahead seconds before they
+      expire, so callers normally never wait on the backend.
+    - If a refresh fails, the last known value keeps being served and the
+      error is recorded in stats(). Only a secret that was never fetched
+      successfully raises.
+    """
+
+    def __init__(self, backend, ttl=900.0, refresh_ahead=120.0, retry_backoff=30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.retry_backoff = retry_backoff
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0}
+
+    def get(self, name):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(name)
+            # Stale values keep being served for a short while after a failed refresh
+            # so an unavailable vault is not hammered by every request
+            if entry is not None and (now - entry.fetched_at < self.ttl or now < entry.retry_after):
+                self._stats["hits"] += 1
+                return entry.value
+            self._stats["misses"] += 1
+        self._ensure_refresher()
+        return self._fetch(name, fallback=entry)
+
+    def prefetch(self, *names):
+        """Load secrets into the cache ahead of the first request."""
+        for name in names:
+            self.get(name)
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["secrets"] = {
+                name: {
+                    "age_seconds": round(now - entry.fetched_at, 1),
+                    "last_error": entry.last_error,
+                }
+                for name, entry in self._cache.items()
+            }
+        return snapshot
+
+    def stop(self):
+        self._stop.set()
+
+    def _fetch(self, name, fallback=None):
+        try:
+            value = self.backend.get(name)
+        except Exception as e:
+            with self._lock:
+                self._stats["refresh_failures"] += 1
+                if fallback is not None:
+                    fallback.last_error = str(e)
+                    fallback.retry_after = time.monotonic() + self.retry_backoff
+            if fallback is None:
+                raise
+            logging.warning(f"Secret refresh for '{name}' failed, using last known value: {e}")
+            return fallback.value
+        with self._lock:
+            self._cache[name] = _CachedSecret(value)
+            self._stats["refreshes"] += 1
+        return value
+
+    def _ensure_refresher(self):
+        if self._thread is not None or self._stop.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refresh_loop, name="secret-refresher", daemon=True)
+                self._thread.start()
+
+    def _refresh_loop(self):
+        # Wake up often enough to catch every entry inside its refresh window
+        interval = max(1.0, self.refresh_ahead / 2)
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    (name, entry) for name, entry in self._cache.items()
+                    if now - entry.fetched_at >= self.ttl - self.refresh_ahead
+                ]
+            for name, entry in due:
+                try:
+                    self._fetch(name, fallback=entry)
+                except Exception:
+                    pass
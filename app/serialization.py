@@ -0,0 +1,102 @@
+import json
+import typing
+from datetime import date, datetime
+from decimal import Decimal
+import orjson
+from fastapi.encoders import jsonable_encoder
+from app.config import Settings
+from app.pagination import encode_cursor
+
+
+def _to_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _to_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _unwrap_optional(annotation):
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    return args[0] if typing.get_origin(annotation) is typing.Union and len(args) == 1 else annotation
+
+
+class RowEncoder:
+    """
+    Turns raw cursor rows into the JSON a response model would produce,
+    without building model instances.
+
+    Only the conversions the model would apply to database values are kept:
+    DATETIME columns declared as date are truncated and DECIMAL columns
+    declared as float are converted. Everything else is passed through.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        hints = typing.get_type_hints(model)
+        fields = getattr(model, "model_fields", None) or model.__fields__
+        self.converters = {}
+        for name in fields:
+            annotation = _unwrap_optional(hints[name])
+            if annotation is date:
+                self.converters[name] = _to_date
+            elif annotation is float:
+                self.converters[name] = _to_float
+            else:
+                self.converters[name] = None
+        self._mappings = {}
+
+    def mapping(self, columns):
+        """(field, column index, converter) for every model field, computed once per column layout."""
+        columns = tuple(columns)
+        mapping = self._mappings.get(columns)
+        if mapping is None:
+            mapping = [(name, columns.index(name), converter) for name, converter in self.converters.items()]
+            self._mappings[columns] = mapping
+        return mapping
+
+    def rows(self, columns, rows):
+        mapping = self.mapping(columns)
+        return [
+            {name: converter(row[index]) if converter else row[index] for name, index, converter in mapping}
+            for row in rows
+        ]
+
+
+_encoders = {}
+
+
+def row_encoder(model):
+    encoder = _encoders.get(model)
+    if encoder is None:
+        encoder = _encoders[model] = RowEncoder(model)
+    return encoder
+
+
+def _validated(columns, rows, model):
+    # Reference path: every row goes through the response model, as FastAPI would do it
+    return [model(**dict(zip(columns, row))) for row in rows]
+
+
+def encode_rows(columns, rows, model, fast=None):
+    """Serialize rows as a JSON array of model objects."""
+    fast = Settings.FAST_JSON_RESPONSES if fast is None else fast
+    if fast:
+        return orjson.dumps(row_encoder(model).rows(columns, rows))
+    return json.dumps(jsonable_encoder(_validated(columns, rows, model)), separators=(",", ":")).encode()
+
+
+def encode_page(columns, rows, limit, key, model, fast=None):
+    """
+    JSON twin of paginate(): trims the look-ahead row and serializes
+    {"items": [...], "next": cursor} straight from the cursor rows.
+    """
+    fast = Settings.FAST_JSON_RESPONSES if fast is None else fast
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(items[-1][list(columns).index(key)])
+    if fast:
+        return orjson.dumps({"items": row_encoder(model).rows(columns, items), "next": next_cursor})
+    page = {"items": _validated(columns, items, model), "next": next_cursor}
+    return json.dumps(jsonable_encoder(page), separators=(",", ":")).encode()
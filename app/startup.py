@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from app import async_db
+from app.config import Settings, secret_provider, settings
+from app.database import backend, execute_query, pool
+from app.events import order_detector
+from app.readiness import readiness_monitor
+from app.report_engine import report_engine
+
+logger = logging.getLogger("app.startup")
+
+# Filled in by app/main.py (import) and lifespan() (warm-up); exported on /api/metrics
+startup_stats = {
+    "import_seconds": None,
+    "warmup_seconds": None,
+    "warmup_steps": {},
+    "warmup_errors": [],
+}
+
+# Every read query a route runs, with parameters that match no rows. Running them once
+# caches their plans on the server (pyodbc prepares parameterized statements) so the
+# first real request does not pay for compilation. The keyset pages use their unfiltered form.
+_NO_ROW_KEY = 2 ** 31 - 1
+
+def _warmup_queries():
+    return [
+        (Settings.GET_CUSTOMERS_PAGE.format(filters=""), (1, _NO_ROW_KEY)),
+        (Settings.GET_CUSTOMER_BY_ID, (0,)),
+        (Settings.GET_CHANGED_CUSTOMERS_PAGE.format(filters=Settings.FILTER_CHANGED_SINCE_ORDER), (1, _NO_ROW_KEY, _NO_ROW_KEY)),
+        (Settings.GET_ORDERS_PAGE.format(filters=""), (1, _NO_ROW_KEY)),
+        (Settings.GET_ORDERS_WATERMARK, ()),
+        (Settings.GET_ORDERS_BY_CUSTOMERID, (0,)),
+        (Settings.GET_ORDERS_FOR_CUSTOMERS, ("[]",)),
+        (Settings.GET_TASKS_PAGE.format(filters=""), (1, _NO_ROW_KEY)),
+        (Settings.GET_TASK_BY_ID, (0,)),
+    ]
+
+def _prefetch_secrets():
+    # The SQLite backend does not use the database credentials
+    if backend.name != "sqlite":
+        secret_provider.prefetch("sqluseradmin", "sqlpassword")
+
+def _prepare_queries():
+    for query, params in _warmup_queries():
+        execute_query(query, params, timeout=settings.DB_QUERY_TIMEOUT or None)
+
+def _timed_step(name, func):
+    """Run one warm-up step; failures are logged and recorded, never raised."""
+    started = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        startup_stats["warmup_errors"].append(f"{name}: {type(e).__name__}: {e}")
+        logger.warning("Warm-up step %s failed: %s", name, e)
+    startup_stats["warmup_steps"][name] = round(time.perf_counter() - started, 3)
+
+def warm_up():
+    """
+    Blocking warm-up run before the app takes traffic: fetch the secrets, open
+    DB_POOL_MIN_SIZE connections and run every read query once. Failures only
+    cost warmth; readiness reports the dependency until it recovers.
+    """
+    _timed_step("secrets", _prefetch_secrets)
+    _timed_step("pool", pool.warm)
+    _timed_step("queries", _prepare_queries)
+
+@asynccontextmanager
+async def lifespan(app):
+    if settings.STARTUP_WARMUP:
+        started = time.perf_counter()
+        await asyncio.to_thread(warm_up)
+        # The report is served from memory; computing it now spares the first reader the heaviest query
+        report_started = time.perf_counter()
+        try:
+            await report_engine.get()
+        except Exception as e:
+            startup_stats["warmup_errors"].append(f"report: {type(e).__name__}: {e}")
+            logger.warning("Warm-up step report failed: %s", e)
+        startup_stats["warmup_steps"]["report"] = round(time.perf_counter() - report_started, 3)
+        startup_stats["warmup_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(
+            "Warm-up finished in %.2fs (%s), app import took %.2fs",
+            startup_stats["warmup_seconds"], startup_stats["warmup_steps"], startup_stats["import_seconds"] or 0,
+        )
+    readiness_monitor.ensure_started()
+    yield
+    await order_detector.stop()
+    readiness_monitor.stop()
+    secret_provider.stop()
+    pool.close()
+    async_db.shutdown()
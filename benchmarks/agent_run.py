@@ -0,0 +1,62 @@
+# Times MCPAgent.run end to end with the offline FakeClaude client
+# Usage: python -m benchmarks.agent_run [--runs 3] [--claude-latency 0.8] [--output agent.json]
+#
+# Starts app.main:app against the stand-in database from benchmarks/seed.py unless --url is given.
+# Note that the agent writes LeadStatus and follow-up tasks, so re-seed between comparisons.
+import argparse
+import os
+import time
+
+from benchmarks.common import BENCH_ENV, api_server, metadata, write_results
+
+
+def run(base_url, runs, claude_latency, claude_error_rate, use_cache):
+    # AgentSettings reads the environment when agent.config is first imported
+    os.environ.update(
+        FASTAPI_URL=base_url,
+        CLAUDE_FAKE="true",
+        CLAUDE_FAKE_LATENCY=str(claude_latency),
+        ANALYSIS_CACHE_ENABLED="true" if use_cache else "false",
+    )
+    from agent.aiagent import MCPAgent
+    from agent.http_client import endpoint_stats
+
+    results = []
+    agent = MCPAgent()
+    agent.claude.error_rate = claude_error_rate
+    for index in range(runs):
+        calls_before = agent.claude.calls
+        started = time.perf_counter()
+        summary = agent.run()
+        elapsed = time.perf_counter() - started
+        results.append({
+            "run": index + 1,
+            "seconds": round(elapsed, 3),
+            "customers": summary["processed"],
+            "customers_per_second": round(summary["processed"] / elapsed, 2) if elapsed else None,
+            "high_priority": summary["high_priority"],
+            "claude_requests": agent.claude.calls - calls_before,
+            "prompt_tokens_saved": summary["prompt_tokens_saved"],
+            "errors": len(summary["errors"]),
+        })
+    return {"runs": results, "api_endpoints": endpoint_stats.snapshot()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end agent benchmark with a fake Claude client")
+    parser.add_argument("--runs", type=int, default=1, help="Consecutive MCPAgent.run() calls on one agent")
+    parser.add_argument("--claude-latency", type=float, default=0.8, help="Simulated seconds per Claude request")
+    parser.add_argument("--claude-error-rate", type=float, default=0.0, help="Fraction of Claude requests failing with a retryable 529")
+    parser.add_argument("--cache", action="store_true", help="Keep the persistent analysis cache on (later runs then reuse it)")
+    parser.add_argument("--url", help="Use an already running API (e.g. http://localhost:8000/api) instead of starting one")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    params = vars(args)
+    if args.url:
+        results = run(args.url.rstrip("/"), args.runs, args.claude_latency, args.claude_error_rate, args.cache)
+    else:
+        with api_server(args.port, env=BENCH_ENV) as base_url:
+            results = run(base_url, args.runs, args.claude_latency, args.claude_error_rate, args.cache)
+    write_results(dict(metadata("agent_run", params), **results), args.output)
@@ -0,0 +1,88 @@
+# Runs several `python -m agent.aiagent --worker` processes on one run with the offline FakeClaude client
+# Usage: python -m benchmarks.agent_workers [--workers 4] [--kill-after 5] [--output workers.json]
+#
+# Starts app.main:app against the stand-in database from benchmarks/seed.py unless --url is given.
+# --kill-after kills the first worker mid-run; its chunk is reclaimed once the lease (--lease-seconds) expires
+# and finished from its checkpoint. Like agent_run, the workers write LeadStatus and tasks, so re-seed between comparisons.
+import argparse
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import requests
+
+from benchmarks.common import BENCH_ENV, REPO_ROOT, api_server, metadata, write_results
+
+
+def run(base_url, workers, run_id, chunk_size, checkpoint_size, lease_seconds, claude_latency, kill_after, verbose):
+    env = dict(
+        os.environ,
+        FASTAPI_URL=base_url,
+        CLAUDE_FAKE="true",
+        CLAUDE_FAKE_LATENCY=str(claude_latency),
+        # One on-disk cache per machine is shared by its workers; keep runs independent of it
+        ANALYSIS_CACHE_ENABLED="false",
+        AGENT_LEASE_SECONDS=str(lease_seconds),
+        AGENT_LEASE_CHUNK_SIZE=str(chunk_size),
+        AGENT_CHECKPOINT_SIZE=str(checkpoint_size),
+        AGENT_LEASE_POLL_SECONDS=str(max(1, lease_seconds / 5)),
+    )
+    output = None if verbose else subprocess.DEVNULL
+    started = time.perf_counter()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "agent.aiagent", "--worker", "--run-id", run_id, "--worker-id", f"bench-{index}"],
+            cwd=REPO_ROOT, env=env, stdout=output, stderr=output
+        )
+        for index in range(workers)
+    ]
+    killed = None
+    if kill_after is not None:
+        time.sleep(kill_after)
+        if processes[0].poll() is None:
+            processes[0].kill()
+            killed = "bench-0"
+    exit_codes = [process.wait() for process in processes]
+    elapsed = time.perf_counter() - started
+
+    status = requests.get(f"{base_url}/agent/runs/{run_id}/", timeout=30).json()
+    leases = status["leases"]
+    return {
+        "seconds": round(elapsed, 3),
+        "run_id": run_id,
+        "done": status["done"],
+        "chunks": status["chunks"],
+        "chunks_by_status": status["chunks_by_status"],
+        "chunks_by_worker": {owner: sum(1 for lease in leases if lease["Owner"] == owner) for owner in sorted({lease["Owner"] for lease in leases if lease["Owner"]})},
+        "reclaimed_chunks": sum(1 for lease in leases if lease["Attempts"] > 1),
+        "killed_worker": killed,
+        "exit_codes": exit_codes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded agent workers sharing one run through leases")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--run-id", help="Run to create or join (default: a new one)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Customers per leased chunk")
+    parser.add_argument("--checkpoint-size", type=int, default=100, help="Customers between checkpoints")
+    parser.add_argument("--lease-seconds", type=int, default=10, help="Lease length; a killed worker's chunk is reclaimed after it")
+    parser.add_argument("--claude-latency", type=float, default=0.0, help="Simulated seconds per Claude request")
+    parser.add_argument("--kill-after", type=float, help="Kill the first worker after this many seconds")
+    parser.add_argument("--verbose", action="store_true", help="Show the workers' output")
+    parser.add_argument("--url", help="Use an already running API (e.g. http://localhost:8000/api) instead of starting one")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    params = vars(args)
+    run_id = args.run_id or f"bench-{uuid.uuid4().hex[:8]}"
+    run_args = (run_id, args.chunk_size, args.checkpoint_size, args.lease_seconds, args.claude_latency, args.kill_after, args.verbose)
+    if args.url:
+        results = run(args.url.rstrip("/"), args.workers, *run_args)
+    else:
+        with api_server(args.port, env=BENCH_ENV) as base_url:
+            results = run(base_url, args.workers, *run_args)
+    write_results(dict(metadata("agent_workers", params), **results), args.output)
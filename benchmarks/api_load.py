@@ -0,0 +1,119 @@
+# Drives each API route at a fixed concurrency and reports latency percentiles and throughput
+# Usage: python -m benchmarks.api_load [--concurrency 32] [--duration 20] [--scenarios customers_page,orders_batch] [--output api.json]
+#
+# Starts app.main:app against the stand-in database from benchmarks/seed.py (DB_NAME and SQLITE_PATH
+# are set from BENCH_ENV) unless --url points at a server that is already running.
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.pagination import encode_cursor
+from benchmarks.common import BENCH_ENV, api_server, latency_summary, metadata, write_results
+
+
+def _scenarios(ids):
+    """name -> callable(rng) returning (method, path, json body)"""
+    customers, tasks, max_order = ids["customers"], ids["tasks"], ids["max_order"]
+    return {
+        "customers_page": lambda rng: ("GET", f"customers/?limit=100&cursor={encode_cursor(rng.choice(customers))}", None),
+        "customer_by_id": lambda rng: ("GET", f"customers/{rng.choice(customers)}/", None),
+        "changed_customers": lambda rng: ("GET", f"customers/changed/?since_order_id={max(0, max_order - 1000)}", None),
+        "orders_page": lambda rng: ("GET", f"orders/?limit=100&cursor={encode_cursor(rng.randint(0, max_order))}", None),
+        "customer_orders": lambda rng: ("GET", f"orders/customer/{rng.choice(customers)}/", None),
+        "orders_batch": lambda rng: ("POST", "orders/batch/", {"customer_ids": rng.sample(customers, min(500, len(customers)))}),
+        "tasks_page": lambda rng: ("GET", f"tasks/?limit=100&cursor={encode_cursor(rng.choice(tasks) if tasks else 0)}", None),
+        "task_by_id": lambda rng: ("GET", f"tasks/{rng.choice(tasks) if tasks else 1}/", None),
+        "lead_report": lambda rng: ("GET", "report/leads/", None),
+        "rfm_page": lambda rng: ("GET", f"rfm/?limit=100&frequency_gte=3&cursor={encode_cursor(rng.choice(customers))}", None),
+        "rfm_segments": lambda rng: ("GET", "rfm/segments/", None),
+    }
+
+
+async def _sample_ids(client):
+    """Real IDs to request, so lookups hit existing rows"""
+    customers = [c["CustomerID"] for c in (await client.get("customers/", params={"limit": 1000})).json()["items"]]
+    tasks = [t["TaskID"] for t in (await client.get("tasks/", params={"limit": 1000})).json()["items"]]
+    watermark = (await client.get("orders/watermark/")).json()
+    return {"customers": customers, "tasks": tasks, "max_order": watermark["LastSalesOrderID"]}
+
+
+async def _drive(client, make_request, concurrency, duration, seed):
+    latencies, statuses = [], {}
+
+    async def worker(index):
+        rng = random.Random(seed + index)
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            method, path, body = make_request(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+async def run(base_url, scenario_names, concurrency, duration, warmup, seed):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url + "/", limits=limits, timeout=60) as client:
+        scenarios = _scenarios(await _sample_ids(client))
+        results = []
+        for name in scenario_names:
+            make_request = scenarios[name]
+            if warmup:
+                await _drive(client, make_request, concurrency, warmup, seed)
+            latencies, statuses, elapsed = await _drive(client, make_request, concurrency, duration, seed)
+            errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+            results.append(dict(
+                scenario=name,
+                requests=len(latencies),
+                errors=errors,
+                statuses=statuses,
+                rps=round(len(latencies) / elapsed, 2),
+                **latency_summary(latencies)
+            ))
+            print(f"{name}: {results[-1]['rps']} req/s, p95 {results[-1]['p95_ms']} ms, {errors} errors", flush=True)
+        return results
+
+
+if __name__ == "__main__":
+    all_scenarios = list(_scenarios({"customers": [1], "tasks": [1], "max_order": 1}))
+    parser = argparse.ArgumentParser(description="API load benchmark")
+    parser.add_argument("--scenarios", default=",".join(all_scenarios), help=f"Comma-separated subset of: {', '.join(all_scenarios)}")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds per scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="Benchmark an already running API (e.g. http://localhost:8000/api) instead of starting one")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--no-response-cache", action="store_true", help="Set the response-cache TTLs to 0 so every request reaches the database")
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(all_scenarios)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    env = dict(BENCH_ENV)
+    if args.no_response_cache:
+        env.update(RESPONSE_CACHE_TTL_CUSTOMERS="0", RESPONSE_CACHE_TTL_ORDERS="0", RESPONSE_CACHE_TTL_TASKS="0")
+    params = dict(vars(args), scenarios=names, env=env if not args.url else None)
+
+    if args.url:
+        results = asyncio.run(run(args.url.rstrip("/"), names, args.concurrency, args.duration, args.warmup, args.seed))
+    else:
+        with api_server(args.port, args.workers, env) as base_url:
+            results = asyncio.run(run(base_url, names, args.concurrency, args.duration, args.warmup, args.seed))
+    write_results(dict(metadata("api_load", params), results=results), args.output)
@@ -0,0 +1,99 @@
+# Shared helpers for the benchmark scripts: result metadata, percentiles and a throwaway API server
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Database created by benchmarks/seed.py; the benchmarked API server is pointed at it.
+# DB_BACKEND picks the server as for the API; with sqlite the database is the BENCH_SQLITE_PATH file.
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "crm_bench")
+BENCH_SQLITE_PATH = os.getenv("BENCH_SQLITE_PATH", os.path.join(REPO_ROOT, f"{BENCH_DB_NAME}.sqlite3"))
+BENCH_ENV = {"DB_NAME": BENCH_DB_NAME, "SQLITE_PATH": BENCH_SQLITE_PATH}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(benchmark, params):
+    """Header written with every result so runs from different commits can be compared"""
+    return {
+        "benchmark": benchmark,
+        "commit": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies):
+    values = sorted(latencies)
+    return {
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(values[-1] if values else None),
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def write_results(results, output=None):
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+@contextmanager
+def api_server(port=8800, workers=1, env=None, startup_timeout=60):
+    """
+    Runs `uvicorn app.main:app` in a subprocess for the duration of the block and
+    yields its base URL once /api/health/ reports healthy.
+    """
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=dict(os.environ, **(env or {})))
+    base_url = f"http://127.0.0.1:{port}/api"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"API server exited with code {process.returncode}")
+            try:
+                if requests.get(f"{base_url}/health/", timeout=2).json().get("status") == "healthy":
+                    break
+            except requests.RequestException:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("API server did not become healthy in time")
+            time.sleep(0.5)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
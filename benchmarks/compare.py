@@ -0,0 +1,52 @@
+# Compares two benchmark result files, e.g. from the base branch and from a change
+# Usage: python -m benchmarks.compare baseline.json candidate.json [--threshold 10]
+# Exits with status 1 when any metric regressed by more than the threshold (percent).
+import argparse
+import json
+
+# Metrics where a higher value is better; every other compared metric is a latency or duration
+HIGHER_IS_BETTER = {"rps", "customers_per_second", "speedup"}
+COMPARED = {"p50_ms", "p95_ms", "p99_ms", "rps", "seconds", "customers_per_second", "fast_path_ms", "speedup"}
+
+
+def _rows(results):
+    """(row name, metrics) pairs for api_load, agent_run and serialization result files"""
+    if "results" in results:
+        return [(row.get("scenario") or row.get("endpoint"), row) for row in results["results"]]
+    return [(f"run {row['run']}", row) for row in results.get("runs", [])]
+
+
+def compare(baseline, candidate, threshold):
+    regressions = []
+    base_rows = dict(_rows(baseline))
+    for name, row in _rows(candidate):
+        base = base_rows.get(name)
+        if base is None:
+            continue
+        for metric in sorted(COMPARED & row.keys() & base.keys()):
+            old, new = base[metric], row[metric]
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "REGRESSION" if worse > threshold else ""
+            print(f"{name:24} {metric:22} {old:>12} -> {new:>12} {change:+8.1f}% {flag}")
+            if flag:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change counted as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    regressions = compare(baseline, candidate, args.threshold)
+    print(f"{len(regressions)} regression(s) above {args.threshold}%")
+    raise SystemExit(1 if regressions else 0)
@@ -0,0 +1,147 @@
+# Creates and fills a stand-in database with the tables and columns the API queries use
+# Usage: python -m benchmarks.seed --customers 100000 --orders-per-customer 5 --tasks 20000 [--reset]
+#
+# DB_BACKEND selects the server as for the API (see app/backends/). The data goes into a separate
+# database (BENCH_DB_NAME, default crm_bench) on the server from DB_HOST, or into the BENCH_SQLITE_PATH
+# file for sqlite, so the real CRM database is never touched. A local container is enough:
+#   docker run -e ACCEPT_EULA=Y -e MSSQL_SA_PASSWORD=<password> -p 1433:1433 mcr.microsoft.com/mssql/server:2022-latest
+#   docker run -e POSTGRES_PASSWORD=<password> -p 5432:5432 postgres:16   (with DB_BACKEND=postgres DB_PORT=5432)
+import argparse
+import os
+import random
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.backends import create_backend
+from app.config import Settings, settings
+from app.dialects import SCHEMAS, insert_statement
+from benchmarks.common import BENCH_DB_NAME, BENCH_SQLITE_PATH
+
+
+class _BenchSettings(Settings):
+    DB_NAME = BENCH_DB_NAME
+    SQLITE_PATH = BENCH_SQLITE_PATH
+
+
+# Same driver and credentials as the API, pointed at the benchmark database
+backend = create_backend(_BenchSettings())
+
+
+def _server_connection():
+    """Autocommit connection to the server's maintenance database, for CREATE/DROP DATABASE."""
+    if backend.name == "postgres":
+        import psycopg2
+        conn = psycopg2.connect(host=settings.DB_HOST, port=settings.DB_PORT, dbname="postgres",
+                                user=settings.db_user, password=settings.db_password)
+        conn.autocommit = True
+        return conn
+    import pyodbc
+    conn_str = (
+        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        f"SERVER={settings.DB_HOST};"
+        f"DATABASE=master;"
+        f"UID={settings.db_user};"
+        f"PWD={settings.db_password};"
+        f"PORT={settings.DB_PORT}"
+    )
+    return pyodbc.connect(conn_str, autocommit=True)
+
+
+def _create_server_database(reset):
+    with closing(_server_connection()) as conn, closing(conn.cursor()) as cursor:
+        if backend.name == "postgres":
+            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (BENCH_DB_NAME,))
+            exists = cursor.fetchone() is not None
+            if exists and reset:
+                cursor.execute(f'DROP DATABASE "{BENCH_DB_NAME}" WITH (FORCE)')
+                exists = False
+            if not exists:
+                cursor.execute(f'CREATE DATABASE "{BENCH_DB_NAME}"')
+            return not exists
+        exists = cursor.execute("SELECT DB_ID(?)", BENCH_DB_NAME).fetchone()[0] is not None
+        if exists and reset:
+            cursor.execute(f"ALTER DATABASE [{BENCH_DB_NAME}] SET SINGLE_USER WITH ROLLBACK IMMEDIATE")
+            cursor.execute(f"DROP DATABASE [{BENCH_DB_NAME}]")
+            exists = False
+        if not exists:
+            cursor.execute(f"CREATE DATABASE [{BENCH_DB_NAME}]")
+        return not exists
+
+
+def create_database(reset):
+    if backend.name == "sqlite":
+        exists = os.path.exists(BENCH_SQLITE_PATH)
+        if exists and reset:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(BENCH_SQLITE_PATH + suffix):
+                    os.remove(BENCH_SQLITE_PATH + suffix)
+            exists = False
+        if exists:
+            return False
+    elif not _create_server_database(reset):
+        return False
+    with closing(backend.connect()) as conn:
+        with closing(conn.cursor()) as cursor:
+            for statement in SCHEMAS[backend.name]:
+                cursor.execute(statement)
+        conn.commit()
+    return True
+
+
+def _batches(rows, size=10000):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _insert(conn, table, rows):
+    # fast_executemany on SQL Server, execute_values on PostgreSQL
+    statement = insert_statement(backend.name, table)
+    with closing(conn.cursor()) as cursor:
+        for batch in _batches(rows):
+            backend.execute_many(cursor, statement, batch)
+    conn.commit()
+
+
+def seed(customers, orders_per_customer, tasks, seed_value):
+    rng = random.Random(seed_value)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    with closing(backend.connect()) as conn:
+        _insert(conn, "person", [(i, f"First{i}", f"Last{i}") for i in range(1, customers + 1)])
+        _insert(conn, "email", [(i, f"customer{i}@example.com") for i in range(1, customers + 1)])
+        _insert(conn, "customer", [(i, i, None, None) for i in range(1, customers + 1)])
+
+        # Order counts vary around the mean so the RFM scores spread over both priorities
+        orders = []
+        for customer_id in range(1, customers + 1):
+            for _ in range(rng.randint(0, 2 * orders_per_customer)):
+                order_date = today - timedelta(days=rng.randint(0, 3 * 365))
+                total_due = Decimal(rng.randint(500, 500000)) / 100
+                orders.append((customer_id, order_date, total_due, order_date))
+        orders.sort(key=lambda order: order[1])
+        _insert(conn, "order", orders)
+
+        assignees = [f"SalesRep{i}" for i in range(1, 11)]
+        _insert(conn, "task", [
+            (rng.randint(1, customers), f"Follow up #{i}", rng.choice(assignees), (today + timedelta(days=rng.randint(-30, 60))).date())
+            for i in range(1, tasks + 1)
+        ])
+    return {"customers": customers, "orders": len(orders), "tasks": tasks}
+
+
+if __name__ == "__main__":
+    target = BENCH_SQLITE_PATH if backend.name == "sqlite" else BENCH_DB_NAME
+    parser = argparse.ArgumentParser(description="Seed the benchmark stand-in database")
+    parser.add_argument("--customers", type=int, default=100000)
+    parser.add_argument("--orders-per-customer", type=int, default=5, help="Mean; each customer gets 0 to twice this many")
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, so every run gets the same data")
+    parser.add_argument("--reset", action="store_true", help=f"Drop and recreate {target} first")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if not create_database(args.reset):
+        raise SystemExit(f"{target} already exists; pass --reset to recreate it")
+    counts = seed(args.customers, args.orders_per_customer, args.tasks, args.seed)
+    print(f"Seeded {target} ({backend.name}): {counts} in {time.perf_counter() - started:.1f}s")
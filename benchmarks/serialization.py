@@ -0,0 +1,66 @@
+# Compares the fast row encoder with the response-model path used before it
+# Usage: python -m benchmarks.serialization [--rows 1000] [--repeat 20] [--output serialization.json]
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.models import Customer, Order
+from app.serialization import encode_page
+from benchmarks.common import metadata, write_results
+
+
+def _customer_rows(count):
+    columns = ["CustomerID", "FirstName", "LastName", "EmailAddress", "LeadStatus"]
+    rows = [(i, f"First{i}", f"Last{i}", f"customer{i}@example.com", "High Priority" if i % 7 == 0 else None) for i in range(1, count + 1)]
+    return columns, rows
+
+
+def _order_rows(count):
+    # Shaped like pyodbc output: DATETIME columns arrive as datetime, MONEY as Decimal
+    columns = ["SalesOrderID", "CustomerID", "OrderDate", "TotalDue"]
+    start = datetime(2024, 1, 1)
+    rows = [(43659 + i, 1 + i % 500, start + timedelta(days=i % 1000), Decimal("1234.5678") + i) for i in range(count)]
+    return columns, rows
+
+
+def _time(func, repeat):
+    # Best of N, the usual way to filter out scheduler noise
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(rows, repeat):
+    results = []
+    for name, model, (columns, data), key in (
+        ("customers", Customer, _customer_rows(rows), "CustomerID"),
+        ("orders", Order, _order_rows(rows), "SalesOrderID"),
+    ):
+        fast_body = encode_page(columns, data, rows, key, model, fast=True)
+        model_body = encode_page(columns, data, rows, key, model, fast=False)
+        if json.loads(fast_body) != json.loads(model_body):
+            raise AssertionError(f"{name}: fast path output differs from the response-model path")
+        fast = _time(lambda: encode_page(columns, data, rows, key, model, fast=True), repeat)
+        validated = _time(lambda: encode_page(columns, data, rows, key, model, fast=False), repeat)
+        results.append({
+            "endpoint": name,
+            "rows": rows,
+            "model_path_ms": round(validated * 1000, 3),
+            "fast_path_ms": round(fast * 1000, 3),
+            "speedup": round(validated / fast, 2),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serialization benchmark for the list endpoints")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page (PAGE_SIZE_MAX by default)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+    write_results(dict(metadata("serialization", vars(args)), results=run(args.rows, args.repeat)), args.output)